@@ -0,0 +1,224 @@
+"""
+Non-interactive batch runner for pyqmmm commands across many job directories.
+
+Most tools ask for file names and parameters with input() and work on the
+current directory. The batch runner changes into each directory matching a
+glob, answers the prompts from a config file or the command line, and runs
+the selected command, with the directories spread over a process pool.
+Everything a tool prints goes to a log in its directory, and a summary of
+every directory is printed and written to a CSV at the end.
+
+The config is a JSON file, for example::
+
+    {
+        "command": "qm --plot_energy",
+        "directories": "replicates/*/",
+        "answers": {"dimensions": "5,4", "trajectories": "scan_optim"},
+        "workers": 8
+    }
+
+Answers are either a list used in order or a mapping from a piece of the
+prompt text to the answer. A prompt without an answer fails that directory
+instead of waiting for input.
+"""
+
+import builtins
+import contextlib
+import csv
+import glob
+import json
+import os
+import shlex
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from pyqmmm.io.sharding import worker_count
+
+LOG_NAME = "pyqmmm_batch.log"
+SUMMARY_NAME = "batch_summary.csv"
+
+
+class BatchResult(NamedTuple):
+    """Outcome of running a command in one directory."""
+
+    directory: str
+    status: str
+    seconds: float
+    message: str
+
+
+class ScriptedInput:
+    """
+    Replacement for input() that answers prompts from a list or mapping.
+
+    Parameters
+    ----------
+    answers : list or dict
+        Answers in prompt order, or answers keyed by a piece of the prompt text.
+    log : file object
+        Prompts and answers are echoed here.
+    """
+
+    def __init__(self, answers, log):
+        self.answers = answers
+        self.log = log
+        self._position = 0
+
+    def __call__(self, prompt=""):
+        if isinstance(self.answers, dict):
+            matches = [answer for key, answer in self.answers.items() if key.lower() in prompt.lower()]
+            if not matches:
+                raise EOFError(f"No answer configured for the prompt: {prompt.strip()}")
+            answer = matches[0]
+        else:
+            if self._position >= len(self.answers):
+                raise EOFError(f"Ran out of answers at the prompt: {prompt.strip()}")
+            answer = self.answers[self._position]
+            self._position += 1
+        answer = str(answer)
+        self.log.write(f"{prompt}{answer}\n")
+        return answer
+
+
+def load_config(path):
+    """
+    Read the batch settings from a JSON file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the config file.
+
+    Returns
+    -------
+    dict
+        Settings with the keys command, directories, answers, and workers.
+    """
+    with open(path, "r") as f:
+        config = json.load(f)
+    unknown = set(config) - {"command", "directories", "answers", "workers"}
+    if unknown:
+        raise ValueError(f"Unknown settings in {path}: {sorted(unknown)}")
+    return config
+
+
+def run_directory(directory, command, answers, threads=None):
+    """
+    Run a pyqmmm command inside one directory without user interaction.
+
+    Parameters
+    ----------
+    directory : str
+        The job directory to run in.
+    command : list of str
+        Command-line arguments, e.g., ["qm", "--plot_energy"].
+    answers : list or dict
+        Answers to the prompts of the command, see ScriptedInput.
+    threads : int, optional
+        Processes the command itself may use, exported as NSLOTS.
+
+    Returns
+    -------
+    BatchResult
+    """
+    from pyqmmm.cli import cli
+
+    start_time = time.time()
+    cwd = os.getcwd()
+    saved_input = builtins.input
+    saved_environment = {key: os.environ.get(key) for key in ("NSLOTS", "MPLBACKEND")}
+    # Plots are saved to files, never shown, and nested pools get their share of the CPUs
+    os.environ["MPLBACKEND"] = "Agg"
+    if threads is not None:
+        os.environ["NSLOTS"] = str(threads)
+    status, message = "ok", ""
+    try:
+        os.chdir(directory)
+        with open(LOG_NAME, "w") as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            builtins.input = ScriptedInput(answers, log)
+            try:
+                cli.main(args=list(command), prog_name="pyqmmm", standalone_mode=False)
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    status, message = "failed", f"exited with status {e.code}"
+            except Exception as e:
+                traceback.print_exc()
+                status, message = "failed", f"{type(e).__name__}: {e}"
+    except OSError as e:
+        status, message = "failed", str(e)
+    finally:
+        builtins.input = saved_input
+        os.chdir(cwd)
+        for key, value in saved_environment.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    return BatchResult(directory, status, round(time.time() - start_time, 3), message)
+
+
+def run_batch(command, directories, answers=(), n_workers=None, summary=SUMMARY_NAME):
+    """
+    Run a pyqmmm command in every directory matching a glob.
+
+    Parameters
+    ----------
+    command : str or list of str
+        The command, e.g., "qm --plot_energy".
+    directories : str or list of str
+        Glob pattern(s) of the job directories.
+    answers : list or dict
+        Answers to the prompts of the command, see ScriptedInput.
+    n_workers : int, optional
+        Number of directories processed at the same time, see worker_count.
+    summary : str, optional
+        Path of the CSV summary, None to skip writing it.
+
+    Returns
+    -------
+    results : list of BatchResult
+        One result per directory, in sorted directory order.
+    """
+    if isinstance(command, str):
+        command = shlex.split(command)
+    if isinstance(directories, str):
+        directories = [directories]
+    directories = sorted({path for pattern in directories for path in glob.glob(pattern) if os.path.isdir(path)})
+    if not directories:
+        print("> No directories matched, nothing to do.")
+        return []
+
+    total_workers = worker_count(n_workers)
+    n_workers = min(total_workers, len(directories))
+    threads = max(1, total_workers // n_workers)
+    print(f"> Running 'pyqmmm {' '.join(command)}' in {len(directories)} directories with {n_workers} workers")
+
+    results = []
+    arguments = (directories, [command] * len(directories), [answers] * len(directories), [threads] * len(directories))
+    with contextlib.ExitStack() as stack:
+        if n_workers == 1:
+            outcomes = map(run_directory, *arguments)
+        else:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=n_workers))
+            outcomes = executor.map(run_directory, *arguments)
+        for result in outcomes:
+            _report(result)
+            results.append(result)
+
+    failed = sum(result.status != "ok" for result in results)
+    print(f"> Finished {len(results)} directories: {len(results) - failed} succeeded, {failed} failed")
+    if summary is not None:
+        with open(summary, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(BatchResult._fields)
+            writer.writerows(results)
+        print(f"> Summary written to {summary}")
+    return results
+
+
+def _report(result):
+    detail = f" ({result.message})" if result.message else ""
+    print(f"   > {result.directory}: {result.status} in {result.seconds} s{detail}", flush=True)
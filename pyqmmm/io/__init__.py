@@ -0,0 +1,3 @@
+"""
+Shared readers, writers, and utilities for common trajectory file types.
+"""
@@ -0,0 +1,225 @@
+"""
+Streaming writers for binary DCD and AMBER NetCDF trajectories.
+
+Both formats hold only float32 coordinates, with the atom names, residues,
+and connectivity coming from a separate topology such as a PDB. This makes
+them several times smaller than multi-model PDB text and much faster for
+VMD and MDAnalysis to load. Frames are written as they arrive, so memory
+stays bounded by one block of frames.
+
+The NetCDF writer produces the 64-bit offset format defined by the AMBER
+trajectory convention without needing the netCDF4 library.
+"""
+
+import os
+import struct
+
+import numpy as np
+
+
+class DCDWriter:
+    """
+    Write a CHARMM/NAMD style DCD trajectory without unit cell information.
+
+    Parameters
+    ----------
+    path : str
+        Path of the output .dcd file.
+    n_atoms : int
+        Number of atoms in every frame.
+    timestep : float
+        Time between frames in AKMA units, only stored as metadata.
+    title : str
+        Remark stored in the header.
+    """
+
+    def __init__(self, path, n_atoms, timestep=1.0, title="Created by pyQMMM"):
+        self.n_atoms = n_atoms
+        self.frame_count = 0
+        self._file = open(path, "wb")
+        self._write_header(timestep, title)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _record(self, payload):
+        # Fortran unformatted records are framed by their length on both sides
+        marker = struct.pack("<i", len(payload))
+        return marker + payload + marker
+
+    def _write_header(self, timestep, title):
+        control = struct.pack(
+            "<4s9if10i",
+            b"CORD",
+            0, 0, 1, 0, 0, 0, 0, 0, 0,  # frame count, first step, step interval, total steps
+            timestep,
+            0, 0, 0, 0, 0, 0, 0, 0, 0, 24,  # no unit cell, CHARMM version 24
+        )
+        remark = title.encode()[:80].ljust(80)
+        self._file.write(self._record(control))
+        self._file.write(self._record(struct.pack("<i", 1) + remark))
+        self._file.write(self._record(struct.pack("<i", self.n_atoms)))
+
+    def write(self, coordinates):
+        """
+        Append frames.
+
+        Parameters
+        ----------
+        coordinates : np.ndarray
+            Coordinates in Angstrom with shape (n_frames, n_atoms, 3) or (n_atoms, 3).
+        """
+        coordinates = np.asarray(coordinates, dtype="<f4").reshape(-1, self.n_atoms, 3)
+        marker = np.array([self.n_atoms * 4], dtype="<i4").view("<f4")
+        # Each frame is three records (x, y, z), each framed by its byte length
+        records = np.empty((len(coordinates), 3, self.n_atoms + 2), dtype="<f4")
+        records[:, :, 0] = marker
+        records[:, :, -1] = marker
+        records[:, :, 1:-1] = coordinates.transpose(0, 2, 1)
+        self._file.write(records.tobytes())
+        self.frame_count += len(coordinates)
+
+    def close(self):
+        """Record the frame count in the header and close the file."""
+        if self._file.closed:
+            return
+        self._file.seek(8)
+        self._file.write(struct.pack("<i", self.frame_count))
+        self._file.seek(20)
+        self._file.write(struct.pack("<i", self.frame_count))
+        self._file.close()
+
+
+_NC_DIMENSION = 10
+_NC_VARIABLE = 11
+_NC_ATTRIBUTE = 12
+_NC_CHAR = 2
+_NC_FLOAT = 5
+
+
+def _nc_name(name):
+    data = name.encode()
+    return struct.pack(">i", len(data)) + data + b"\0" * (-len(data) % 4)
+
+
+def _nc_attributes(attributes):
+    if not attributes:
+        return struct.pack(">ii", 0, 0)
+    out = struct.pack(">ii", _NC_ATTRIBUTE, len(attributes))
+    for name, value in attributes.items():
+        data = value.encode()
+        out += _nc_name(name) + struct.pack(">ii", _NC_CHAR, len(data)) + data + b"\0" * (-len(data) % 4)
+    return out
+
+
+class NCDFWriter:
+    """
+    Write an AMBER NetCDF trajectory (.nc).
+
+    Parameters
+    ----------
+    path : str
+        Path of the output .nc file.
+    n_atoms : int
+        Number of atoms in every frame.
+    timestep : float
+        Time between frames in picoseconds.
+    """
+
+    def __init__(self, path, n_atoms, timestep=1.0):
+        self.n_atoms = n_atoms
+        self.timestep = timestep
+        self.frame_count = 0
+        self._file = open(path, "wb")
+        self._file.write(self._header())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _header(self):
+        dimensions = [("frame", 0), ("spatial", 3), ("atom", self.n_atoms)]
+        global_attributes = {
+            "Conventions": "AMBER",
+            "ConventionVersion": "1.0",
+            "program": "pyQMMM",
+            "programVersion": "1.0",
+        }
+        # (name, dimension ids, attributes, type, bytes per record or in total)
+        variables = [
+            ("spatial", [1], {}, _NC_CHAR, 4),
+            ("time", [0], {"units": "picosecond"}, _NC_FLOAT, 4),
+            ("coordinates", [0, 2, 1], {"units": "angstrom"}, _NC_FLOAT, self.n_atoms * 12),
+        ]
+
+        def build(begins):
+            out = b"CDF\x02" + struct.pack(">i", 0)
+            out += struct.pack(">ii", _NC_DIMENSION, len(dimensions))
+            for name, length in dimensions:
+                out += _nc_name(name) + struct.pack(">i", length)
+            out += _nc_attributes(global_attributes)
+            out += struct.pack(">ii", _NC_VARIABLE, len(variables))
+            for (name, dims, attributes, nc_type, vsize), begin in zip(variables, begins):
+                out += _nc_name(name) + struct.pack(">i", len(dims)) + struct.pack(f">{len(dims)}i", *dims)
+                out += _nc_attributes(attributes) + struct.pack(">iiq", nc_type, vsize, begin)
+            return out
+
+        # The header length does not depend on the offsets, so build it twice
+        size = len(build([0, 0, 0]))
+        # The fixed spatial variable comes first, then records of (time, coordinates)
+        self._record_start = size + 4
+        header = build([size, self._record_start, self._record_start + 4])
+        return header + b"xyz\0"
+
+    def write(self, coordinates):
+        """
+        Append frames.
+
+        Parameters
+        ----------
+        coordinates : np.ndarray
+            Coordinates in Angstrom with shape (n_frames, n_atoms, 3) or (n_atoms, 3).
+        """
+        coordinates = np.asarray(coordinates, dtype=">f4").reshape(-1, self.n_atoms, 3)
+        records = np.empty((len(coordinates), 1 + self.n_atoms * 3), dtype=">f4")
+        records[:, 0] = (self.frame_count + np.arange(len(coordinates))) * self.timestep
+        records[:, 1:] = coordinates.reshape(len(coordinates), -1)
+        self._file.write(records.tobytes())
+        self.frame_count += len(coordinates)
+
+    def close(self):
+        """Record the frame count in the header and close the file."""
+        if self._file.closed:
+            return
+        self._file.seek(4)
+        self._file.write(struct.pack(">i", self.frame_count))
+        self._file.close()
+
+
+WRITERS = {".dcd": DCDWriter, ".nc": NCDFWriter, ".ncdf": NCDFWriter}
+
+
+def open_writer(path, n_atoms):
+    """
+    Binary trajectory writer chosen by the file extension.
+
+    Parameters
+    ----------
+    path : str
+        Output path ending in .dcd, .nc, or .ncdf.
+    n_atoms : int
+        Number of atoms in every frame.
+
+    Returns
+    -------
+    DCDWriter or NCDFWriter
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError(f"Unsupported trajectory format '{extension}', use one of {sorted(WRITERS)}")
+    return WRITERS[extension](path, n_atoms)
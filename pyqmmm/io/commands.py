@@ -0,0 +1,92 @@
+"""
+Command-line tools of the pyqmmm io group, see pyqmmm.registry.
+"""
+
+import glob
+import sys
+
+import click
+
+from pyqmmm.registry import Tool, tool_group
+
+
+def _delete_in_files():
+    """The delete.in selection file in the current directory, exits with an example if missing."""
+    in_files = glob.glob("delete.in")
+    if len(in_files) == 0:
+        print("Error: There should be a delete.in in the current directory indicating which atoms to delete.\n")
+        print("As an example, its contents could look like this:")
+        print("  1-8,104-106,166 # Asn")
+        print("  9-16,107-109,168 # Asn")
+        print("  59-69,134,135   # Phe\n")
+        sys.exit(1)
+    return in_files
+
+
+def delete_xyz_atoms():
+    import pyqmmm.io.delete_xyz_trj_atoms
+    in_files = _delete_in_files()
+    xyz_name = input("What is the name of the XYZ file you want to delete atoms from without the extension? ")
+    xyz_input = f"{xyz_name}.xyz"
+    xyz_output = f"{xyz_name}_stripped.xyz"
+    pyqmmm.io.delete_xyz_trj_atoms.main(in_files, xyz_input, xyz_output)
+
+
+def delete_pdb_atoms():
+    import pyqmmm.io.delete_pdb_trj_atoms
+    in_files = _delete_in_files()
+    pdb_name = input("What is the name of the PDB file you want to delete atoms from without the extension? ")
+    pdb_input = f"{pdb_name}.pdb"
+    pdb_output = f"{pdb_name}_stripped.pdb"
+    pyqmmm.io.delete_pdb_trj_atoms.main(in_files, pdb_input, pdb_output)
+
+
+def translate_pdb_to_center(in_place, output):
+    import pyqmmm.io.translate_pdb_to_center
+    input_pdb = input("What is the name of the PDB you would like to center? ") + ".pdb"
+    # Indexed at 1
+    center_point = int(input("What atom would you like to make the new center of your trajectory (atom number)? "))
+    if in_place:
+        pyqmmm.io.translate_pdb_to_center.translate_pdb(input_pdb, output, center_point, in_place=True)
+    else:
+        output_pdb = output or "centered_pdb.pdb"
+        pyqmmm.io.translate_pdb_to_center.translate_pdb(input_pdb, output_pdb, center_point)
+
+
+def xyz2pdb(traj_format):
+    import pyqmmm.io.xyz2pdb
+    xyz_traj = input("What is the name or your xyz trajectory without the extension? ") + ".xyz"
+    template = input("What is the name or your PDB template without the extension? ") + ".pdb"
+    if traj_format == "pdb":
+        output_pdb = "pdb_trajectory.pdb"
+        pyqmmm.io.xyz2pdb.xyz2pdb_traj(xyz_traj, output_pdb, template)
+    else:
+        # Binary trajectories use the template once as the topology
+        pyqmmm.io.xyz2pdb.xyz2binary_traj(xyz_traj, f"trajectory.{traj_format}", template)
+
+
+TOOLS = (
+    Tool("ppm2png", "-p2p", "Converts PPM files to PNG.", "pyqmmm.io.ppm2png_converter:ppm2png_converter",
+         "Converting all PPM in current directory to PNGs:"),
+    Tool("delete_xyz_atoms", "-dxa", "Deletes atoms from XYZ trajectory.", delete_xyz_atoms,
+         "Deleting requested atoms from the xyz file:"),
+    Tool("delete_pdb_atoms", "-dpa", "Deletes atoms from PDB trajectory.", delete_pdb_atoms,
+         "Deleting requested atoms from the PDB file:"),
+    Tool("translate_pdb_to_center", "-tc", "Translates PDB traj to new center.", translate_pdb_to_center,
+         "Translates PDB traj to a new center", options=("in_place", "output")),
+    Tool("xyz2pdb", "-x2p", "Converts an xyz file or traj to a PDB.", xyz2pdb,
+         "Converts an xyz file to a PDB", options=("traj_format",)),
+    Tool("repo2markdown", "-r2m", "Converts python package to markdown file.", "pyqmmm.io.repo2markdown:main",
+         "Converts a Python package to a single markdown file"),
+    Tool("submit_clustering", "-sc", "Submits clustering jobs to queue.", "pyqmmm.io.submit_clustering:main",
+         "Submits clustering calculations to queue"),
+)
+
+OPTIONS = (
+    click.Option(["--in_place", "-ip"], is_flag=True, help="Rewrite PDB coordinates in place (with -tc)."),
+    click.Option(["--output", "-o"], default=None, help="Copy to this file and rewrite the copy (with -ip)."),
+    click.Option(["--traj_format", "-tf"], type=click.Choice(["pdb", "dcd", "nc"]), default="pdb",
+                 help="Output format for -x2p."),
+)
+
+command = tool_group("io", "Tools for useful manipulations of common file types.", TOOLS, OPTIONS)
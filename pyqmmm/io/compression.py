@@ -0,0 +1,243 @@
+"""
+Transparent handling of gzip, xz, bzip2, and zstd compressed files.
+
+Inputs are recognized by their magic bytes. Files read in one pass
+(hbond.gnu, GBSA results, templates, and the trajectories of xyz2pdb, the
+delete tools, and the energy plotter, see XYZStream and PDBStream) are
+decompressed on the fly without touching the disk. Only the random access
+of the indexed XYZ and PDB readers needs a scratch copy, see
+decompress_to_scratch.
+Outputs are compressed when their name ends in a compressed extension,
+in independent blocks spread over a thread pool (like pigz). The
+concatenated blocks are valid multi-member/multi-frame files that the
+standard tools and Python modules read as one stream.
+
+The zstd format needs the optional zstandard package.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"\xfd7zXZ\x00": "xz",
+    b"BZh": "bzip2",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+EXTENSIONS = {".gz": "gzip", ".xz": "xz", ".bz2": "bzip2", ".zst": "zstd"}
+BLOCK_BYTES = 1 << 22  # Uncompressed size of each independently compressed block
+COPY_BYTES = 1 << 24  # Bytes decompressed at a time
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Reading or writing .zst files requires the zstandard package (pip install zstandard)")
+    return zstandard
+
+
+def detect_compression(path):
+    """
+    Compression format of a file from its magic bytes.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    str or None
+        'gzip', 'xz', 'bzip2', or 'zstd', or None for uncompressed files.
+    """
+    with open(path, "rb") as f:
+        head = f.read(6)
+    for magic, name in MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def resolve_path(path):
+    """
+    The path itself if it exists, otherwise an existing compressed variant (e.g., scan.xyz.gz).
+
+    Parameters
+    ----------
+    path : str
+        Expected path of the uncompressed file.
+
+    Returns
+    -------
+    str
+    """
+    if os.path.exists(path):
+        return path
+    for extension in EXTENSIONS:
+        if os.path.exists(path + extension):
+            return path + extension
+    return path
+
+
+def open_input(path, mode="rb"):
+    """
+    Open a file for reading, decompressing it on the fly if needed.
+
+    Parameters
+    ----------
+    path : str
+        Path to a plain or compressed file.
+    mode : str
+        'rb' for bytes or 'r' for text.
+
+    Returns
+    -------
+    file object
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path, mode)
+    if compression == "zstd":
+        stream = _zstandard().ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True, read_across_frames=True)
+        stream = io.BufferedReader(stream)
+    else:
+        stream = {"gzip": gzip.open, "xz": lzma.open, "bzip2": bz2.open}[compression](path, "rb")
+    return stream if "b" in mode else io.TextIOWrapper(stream)
+
+
+def decompress_to_scratch(path):
+    """
+    Stream a compressed file into a temporary file that can be memory-mapped.
+
+    The copy lives in TMPDIR (node-local scratch on most clusters) and is
+    deleted when the returned file is closed, or right away if decompressing
+    fails. This is a full write and read of the decompressed data, which only
+    the random access of XYZReader and PDBReader needs, so point TMPDIR at
+    local disk rather than a network filesystem. Single-pass tools stream the
+    input with open_input instead.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    tempfile.NamedTemporaryFile or None
+        The decompressed copy, or None if the file is not compressed.
+    """
+    if detect_compression(path) is None:
+        return None
+    scratch = tempfile.NamedTemporaryFile(prefix="pyqmmm_", suffix=os.path.basename(path))
+    try:
+        with open_input(path) as source:
+            while True:
+                block = source.read(COPY_BYTES)
+                if not block:
+                    break
+                scratch.write(block)
+        scratch.flush()
+    except BaseException:
+        scratch.close()
+        raise
+    return scratch
+
+
+def _compress_block(compression, block):
+    if compression == "gzip":
+        return gzip.compress(block, compresslevel=6, mtime=0)
+    if compression == "xz":
+        return lzma.compress(block)
+    if compression == "bzip2":
+        return bz2.compress(block)
+    return _zstandard().ZstdCompressor().compress(block)
+
+
+class BlockCompressedWriter(io.RawIOBase):
+    """
+    Binary file object that compresses blocks in parallel threads.
+
+    zlib, lzma, bz2, and zstd release the GIL while compressing,
+    so the blocks are compressed concurrently and written in order.
+
+    Parameters
+    ----------
+    path : str
+        Path of the output file.
+    compression : str
+        'gzip', 'xz', 'bzip2', or 'zstd'.
+    threads : int, optional
+        Number of compression threads, defaults to NSLOTS or the CPU count.
+    """
+
+    def __init__(self, path, compression, threads=None):
+        super().__init__()
+        if compression == "zstd":
+            _zstandard()
+        if threads is None:
+            threads = int(os.getenv("NSLOTS", os.cpu_count() or 1))
+        self.compression = compression
+        self._file = open(path, "wb")
+        self._buffer = bytearray()
+        self._threads = max(1, threads)
+        self._executor = ThreadPoolExecutor(max_workers=self._threads)
+        self._pending = deque()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= BLOCK_BYTES:
+            self._submit(bytes(self._buffer[:BLOCK_BYTES]))
+            del self._buffer[:BLOCK_BYTES]
+        return len(data)
+
+    def _submit(self, block):
+        self._pending.append(self._executor.submit(_compress_block, self.compression, block))
+        # Bound memory by writing finished blocks once every thread is busy
+        while len(self._pending) > 2 * self._threads:
+            self._file.write(self._pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self._file.write(self._pending.popleft().result())
+        self._executor.shutdown()
+        self._file.close()
+        super().close()
+
+
+def open_output(path, mode="wb", threads=None):
+    """
+    Open a file for writing, compressing it if the name ends in .gz, .xz, .bz2, or .zst.
+
+    Parameters
+    ----------
+    path : str
+        Path of the output file.
+    mode : str
+        'wb' for bytes or 'w' for text.
+    threads : int, optional
+        Number of compression threads, see BlockCompressedWriter.
+
+    Returns
+    -------
+    file object
+    """
+    compression = EXTENSIONS.get(os.path.splitext(os.fspath(path))[1].lower())
+    if compression is None:
+        return open(path, mode)
+    writer = BlockCompressedWriter(path, compression, threads)
+    return writer if "b" in mode else io.TextIOWrapper(writer, encoding="utf-8")
@@ -6,43 +6,81 @@ Also allows the user to sample the trajectory with a stride option.
 import os
 import glob
 import sys
+import functools
+import itertools
+import numpy as np
+from pyqmmm.io.compression import detect_compression, open_output
+from pyqmmm.io.frame_selection import stride_indices, strided
+from pyqmmm.io.selection import read_selection, read_topology
+from pyqmmm.io.sharding import map_stream, write_sharded
+from pyqmmm.io.trajectory import Trajectory
+from pyqmmm.io.xyz_reader import XYZReader, XYZStream
 
-def parse_in_file(in_file_path):
+def parse_in_file(in_file_path, template=None):
     """
-    Parses the .in file and returns a set of atom indices to remove.
+    Parses the .in file and returns the 1-based indices of the atoms to remove.
     The .in file can contain ranges (e.g. "1-8") and single numbers,
     and any text after a '#' is ignored.
+    Residue, chain, element, and atom name selectors (see pyqmmm.io.selection)
+    are resolved against the PDB template.
     """
-    atoms_to_remove = set()
-    with open(in_file_path, 'r') as f:
-        for line in f:
-            # Remove comment (anything after '#') and trim whitespace.
-            line = line.split('#', 1)[0].strip()
-            if not line:
-                continue
-            # Split tokens by comma.
-            tokens = line.split(',')
-            for token in tokens:
-                token = token.strip()
-                if not token:
-                    continue
-                if '-' in token:
-                    try:
-                        start, end = token.split('-')
-                        start = int(start)
-                        end = int(end)
-                        # Add inclusive range.
-                        atoms_to_remove.update(range(start, end + 1))
-                    except ValueError:
-                        print(f"Warning: Could not parse token '{token}' in {in_file_path}")
-                else:
-                    try:
-                        atoms_to_remove.add(int(token))
-                    except ValueError:
-                        print(f"Warning: Could not parse token '{token}' in {in_file_path}")
-    return atoms_to_remove
-
-def remove_atoms_from_xyz(xyz_input, xyz_output, atoms_to_remove, stride=1):
+    topology = read_topology(template) if template else None
+    return np.flatnonzero(read_selection(in_file_path, topology=topology)) + 1
+
+@functools.lru_cache(maxsize=None)
+def _keep_mask(natoms, atoms_to_remove):
+    """Boolean mask of the atoms to keep, cached per atom count."""
+    keep = np.ones(natoms, dtype=bool)
+    remove = np.asarray(atoms_to_remove, dtype=np.int64)
+    keep[remove[(remove > 0) & (remove <= natoms)] - 1] = False
+    return keep
+
+def _keep_atoms(atoms_to_remove, frame, index):
+    """Frame transform for write_sharded that drops atom lines from one xyz frame."""
+    lines = frame.split(b"\n")
+    natoms = int(lines[0])
+    keep = _keep_mask(natoms, atoms_to_remove)
+    kept = b"\n".join(itertools.compress(lines[2:natoms + 2], keep))
+    return b"%d\n%s\n%s\n" % (np.count_nonzero(keep), lines[1], kept)
+
+def stream_atoms_from_xyz(xyz_input, xyz_output, atoms_to_remove, stride=1, n_workers=None):
+    """
+    Streaming version of remove_atoms_from_xyz.
+
+    Frames are read from the memory-mapped input in shards that are processed
+    in parallel (see pyqmmm.io.sharding), so memory stays bounded regardless of
+    the trajectory size. The kept atom lines are copied verbatim, without
+    reformatting the coordinates. Compressed inputs are decompressed on the
+    fly and their frames are sent to the workers in batches (see XYZStream
+    and map_stream), so no decompressed copy is written to disk.
+    The last frame is always kept.
+
+    Returns
+    -------
+    total_frames : int
+        Number of frames in the input trajectory.
+    sampled_frames : int
+        Number of frames written to the output trajectory.
+    """
+    transform = functools.partial(_keep_atoms, tuple(int(i) for i in atoms_to_remove))
+    if detect_compression(xyz_input) is not None:
+        sampled_frames = 0
+        with XYZStream(xyz_input) as stream, open_output(xyz_output) as f:
+            for data in map_stream(strided(stream, stride), transform, n_workers):
+                f.write(data)
+                sampled_frames += 1
+        return stream.count, sampled_frames
+
+    with XYZReader(xyz_input) as traj:
+        total_frames = len(traj)
+        frames = traj.take(stride_indices(total_frames, stride))
+        sampled_frames = write_sharded(
+            traj.data_path, traj.starts, traj.ends, xyz_output, transform, frames.indices, n_workers=n_workers
+        )
+
+    return total_frames, sampled_frames
+
+def remove_atoms_from_xyz(xyz_input, xyz_output, atoms_to_remove, stride=1, stream=True):
     """
     Reads an xyz trajectory from xyz_input, removes atoms whose 1-indexed order
     (in each frame) is in atoms_to_remove, updates the atom count per frame,
@@ -57,54 +95,44 @@ def remove_atoms_from_xyz(xyz_input, xyz_output, atoms_to_remove, stride=1):
       - The first frame,
       - Every stride-th frame from the trajectory,
       - And the last frame (if not already included).
-    """
-    with open(xyz_input, 'r') as f:
-        lines = f.readlines()
-
-    frames = []
-    index = 0
-    while index < len(lines):
-        try:
-            num_atoms = int(lines[index].strip())
-        except ValueError:
-            print(f"Error reading number of atoms at line {index + 1}")
-            sys.exit(1)
-        title_line = lines[index + 1]
-        atom_lines = lines[index + 2 : index + 2 + num_atoms]
-        remaining_atom_lines = []
-        # Assume atoms are ordered from 1 to num_atoms.
-        for i, atom_line in enumerate(atom_lines, start=1):
-            if i in atoms_to_remove:
-                continue  # Skip this atom.
-            remaining_atom_lines.append(atom_line)
-        new_num_atoms = len(remaining_atom_lines)
-        frame_lines = []
-        frame_lines.append(f"{new_num_atoms}\n")
-        frame_lines.append(title_line)
-        frame_lines.extend(remaining_atom_lines)
-        frames.append(frame_lines)
-        index += 2 + num_atoms
-
-    total_frames = len(frames)
-    # Apply stride sampling.
-    if stride <= 1:
-        sampled_frames = frames
-    else:
-        sampled_frames = frames[::stride]
-        if frames[-1] not in sampled_frames:
-            sampled_frames.append(frames[-1])
 
-    with open(xyz_output, 'w') as f:
-        for frame in sampled_frames:
-            f.writelines(frame)
+    By default the trajectory is streamed one frame at a time (see stream_atoms_from_xyz).
+    With stream=False the sampled frames are loaded into a Trajectory first.
+    """
+    try:
+        if stream:
+            total_frames, sampled_count = stream_atoms_from_xyz(xyz_input, xyz_output, atoms_to_remove, stride)
+        else:
+            with XYZReader(xyz_input) as traj:
+                total_frames = len(traj)
+                # Apply stride sampling, only the sampled frames are parsed.
+                sampled_view = traj.take(stride_indices(total_frames, stride))
+                sampled_frames = Trajectory.from_reader(traj, sampled_view.indices)
+            # Assume atoms are ordered from 1 to num_atoms.
+            sampled_frames = sampled_frames.delete_atoms(
+                i - 1 for i in atoms_to_remove if 0 < i <= sampled_frames.n_atoms
+            )
+            sampled_frames.write_xyz(xyz_output)
+            sampled_count = len(sampled_frames)
+    except ValueError as e:
+        print(f"Error reading {xyz_input}: {e}")
+        sys.exit(1)
 
-    print(f"> Process complete: Processed {total_frames} frames, sampled {len(sampled_frames)} frames, and removed specified atoms.")
+    print(
+        f"> Process complete: Processed {total_frames} frames, sampled {sampled_count} frames, "
+        "and removed specified atoms."
+    )
     print(f"> Output written to {xyz_output}")
 
-def main(in_files, xyz_input, xyz_output):
+def main(in_files, xyz_input, xyz_output, template=None):
     in_file = in_files[0]
-    atoms_to_remove = parse_in_file(in_file)
-    print(f"Atoms to remove: {sorted(atoms_to_remove)}")
+    try:
+        atoms_to_remove = parse_in_file(in_file, template)
+    except ValueError:
+        # Residue, chain, and element selectors need the atoms of a PDB template
+        template = input("What is the name of the PDB template for the selection without the extension? ") + ".pdb"
+        atoms_to_remove = parse_in_file(in_file, template)
+    print(f"Atoms to remove: {atoms_to_remove.tolist()}")
 
     if not os.path.exists(xyz_input):
         print(f"Error: The xyz input file '{xyz_input}' does not exist in the current directory.")
@@ -0,0 +1,168 @@
+"""
+Helpers for choosing which frames of a trajectory to process.
+"""
+
+import os
+
+import numpy as np
+
+from pyqmmm.io.compression import EXTENSIONS, open_output
+
+
+def stride_indices(n_frames, stride):
+    """
+    Frame indices for stride sampling that always keep the first and last frame.
+
+    Parameters
+    ----------
+    n_frames : int
+        Total number of frames in the trajectory.
+    stride : int
+        Keep every stride-th frame.
+
+    Returns
+    -------
+    indices : list
+        Zero-based indices of the sampled frames.
+    """
+    indices = list(range(0, n_frames, max(stride, 1)))
+    if n_frames and indices[-1] != n_frames - 1:
+        indices.append(n_frames - 1)
+    return indices
+
+
+def strided(frames, stride):
+    """
+    Stride sampling of a stream of frames whose length is not known in advance.
+
+    Selects the same frames as stride_indices, holding back one frame to
+    keep the last frame of the stream.
+
+    Parameters
+    ----------
+    frames : iterable of tuple
+        (index, frame) pairs in order, e.g., from XYZStream or PDBStream.
+    stride : int
+        Keep every stride-th frame.
+
+    Yields
+    ------
+    tuple
+        The (index, frame) pairs of the sampled frames.
+    """
+    stride = max(stride, 1)
+    last = None
+    for index, frame in frames:
+        if index % stride == 0:
+            yield index, frame
+            last = None
+        else:
+            last = (index, frame)
+    if last is not None:
+        yield last
+
+
+class FrameView:
+    """
+    Lazy selection of frames from an indexed XYZReader or PDBReader.
+
+    Only the frame indices are stored. Frames are read from the memory map
+    when they are iterated or written, so reversing or sub-sampling a large
+    trajectory costs one read of the selected frames.
+
+    Parameters
+    ----------
+    reader : XYZReader or PDBReader
+        The open, indexed trajectory.
+    indices : sequence of int
+        Zero-based frames of the reader, in view order.
+
+    Examples
+    --------
+    >>> with XYZReader("scan_optim.xyz") as traj:
+    ...     reversed(traj).write("scan_optim_reversed.xyz")
+    ...     traj[::10].write("every_tenth.xyz")
+    """
+
+    def __init__(self, reader, indices):
+        self.reader = reader
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __repr__(self):
+        return f"FrameView({self.reader.path!r}, {len(self)} frames)"
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FrameView(self.reader, self.indices[index])
+        return self.reader[int(self.indices[index])]
+
+    def __iter__(self):
+        for index in self.indices:
+            yield self.reader[int(index)]
+
+    def __reversed__(self):
+        return FrameView(self.reader, self.indices[::-1])
+
+    def take(self, frames):
+        """View of the given zero-based positions of this view, in the given order."""
+        return FrameView(self.reader, self.indices[np.asarray(frames, dtype=np.int64)])
+
+    def frame_bytes(self, index):
+        """Raw bytes of a frame of the view."""
+        return self.reader.frame_bytes(int(self.indices[index]))
+
+    def write(self, path):
+        """Copy the selected frames verbatim into a new trajectory file."""
+        write_views(path, [self])
+
+
+def is_allxyz(path):
+    """Whether a path names an ORCA allxyz file, optionally compressed."""
+    root, extension = os.path.splitext(os.fspath(path))
+    if extension.lower() in EXTENSIONS:
+        root, extension = os.path.splitext(root)
+    return extension.lower() == ".allxyz"
+
+
+def write_views(path, views):
+    """
+    Copy the frames of one or more views verbatim into a single trajectory file.
+
+    The header of the first reader (e.g., PDB REMARK records) and the footer
+    of the last one are kept. Frames written to an ORCA allxyz file (e.g.,
+    path.allxyz or path.allxyz.gz) are separated by a '>' line, as written
+    by XYZWriter.
+
+    Parameters
+    ----------
+    path : str
+        Path of the output trajectory.
+    views : sequence of FrameView
+        The frames to write, in order.
+
+    Returns
+    -------
+    frame_count : int
+        Number of frames written.
+    """
+    separator = b">\n" if is_allxyz(path) else b""
+    frame_count = 0
+    with open_output(path) as f:
+        if views:
+            f.write(getattr(views[0].reader, "header", b""))
+        for view in views:
+            for index in view.indices:
+                frame = view.reader.frame_bytes(int(index))
+                if frame_count:
+                    f.write(separator)
+                f.write(frame)
+                # The final frame of a file may lack its trailing newline
+                if not frame.endswith(b"\n"):
+                    f.write(b"\n")
+                frame_count += 1
+        if views:
+            f.write(getattr(views[-1].reader, "footer", b""))
+    return frame_count
@@ -0,0 +1,267 @@
+"""
+Transcoding of AMBER ASCII trajectories into a binary copy for fast analysis.
+
+ASCII trajectories (constP_prod.mdcrd, .crd) are slow to parse and cannot
+be read at random. The first analysis of a trajectory converts it once into
+a hidden AMBER NetCDF file, or a float32 .npy array for memory mapping,
+next to the original, and later analyses read the binary copy instead.
+
+Coordinates are written by AMBER as fixed-width %8.3f fields, ten per line,
+with an optional box line after every frame, so every frame has the same
+size and frames are parsed in parallel shards, see pyqmmm.io.sharding.
+The number of frames is checked against nstlim / ntwx of the AMBER output
+(constP_prod.out) next to the trajectory when it exists.
+
+A copy is only used while the size, modification time, and content hash of
+the original still match, see pyqmmm.io.traj_cache.file_signature.
+The periodic box is not transcoded. Set PYQMMM_TRANSCODE=0 to always read
+the ASCII trajectory.
+"""
+
+import functools
+import json
+import os
+import re
+
+import numpy as np
+
+from pyqmmm.io.binary_trajectory import NCDFWriter
+from pyqmmm.io.sharding import map_frames
+from pyqmmm.io.traj_cache import file_signature
+
+FIELD_WIDTH = 8
+FIELDS_PER_LINE = 10
+FRAMES_PER_WRITE = 500
+FORMATS = {"nc": "NCDF", "npy": "NPY"}
+
+
+def transcode_enabled():
+    """Whether ASCII trajectories are transcoded, see PYQMMM_TRANSCODE."""
+    return os.getenv("PYQMMM_TRANSCODE", "1") != "0"
+
+
+def copy_paths(trajectory, fmt="nc"):
+    """Paths of the hidden binary copy of a trajectory and of its manifest."""
+    directory, name = os.path.split(os.path.abspath(trajectory))
+    stem = os.path.join(directory, f".{name}.pyqmmm")
+    return f"{stem}.{fmt}", f"{stem}.json"
+
+
+def prmtop_atom_count(prmtop):
+    """
+    Number of atoms of an AMBER topology, the first value of its POINTERS section.
+
+    Parameters
+    ----------
+    prmtop : str
+        Path to the .prmtop file.
+
+    Returns
+    -------
+    int
+    """
+    with open(prmtop) as f:
+        for line in f:
+            if line.startswith("%FLAG POINTERS"):
+                next(f)  # %FORMAT line
+                return int(next(f).split()[0])
+    raise ValueError(f"No POINTERS section in {prmtop}")
+
+
+def mdout_settings(mdout):
+    """
+    nstlim, ntwx, and dt of the &cntrl namelist echoed in an AMBER output file.
+
+    Returns
+    -------
+    settings : dict
+        The values found, missing keys are left out.
+    """
+    settings = {}
+    patterns = {key: re.compile(rf"\b{key}\s*=\s*([-+\d.eE]+)") for key in ("nstlim", "ntwx", "dt")}
+    with open(mdout) as f:
+        for line in f:
+            for key, pattern in patterns.items():
+                match = pattern.search(line)
+                if match and key not in settings:
+                    settings[key] = float(match.group(1))
+            if len(settings) == len(patterns):
+                break
+    return settings
+
+
+def frame_layout(trajectory, n_atoms):
+    """
+    Byte layout of the fixed-size frames of an ASCII trajectory.
+
+    Parameters
+    ----------
+    trajectory : str
+        Path to the .mdcrd or .crd file.
+    n_atoms : int
+        Number of atoms in every frame.
+
+    Returns
+    -------
+    title_bytes : int
+        Size of the title line before the first frame.
+    frame_bytes : int
+        Size of every frame, including the box line if there is one.
+    box : bool
+        Whether every frame ends with a box line.
+    """
+    n_values = 3 * n_atoms
+    full_lines, last = divmod(n_values, FIELDS_PER_LINE)
+    coordinate_bytes = full_lines * (FIELDS_PER_LINE * FIELD_WIDTH + 1)
+    if last:
+        coordinate_bytes += last * FIELD_WIDTH + 1
+    with open(trajectory, "rb") as f:
+        title_bytes = len(f.readline())
+        f.seek(title_bytes + coordinate_bytes)
+        after = f.readline()
+    # A box line holds three fields, a coordinate line of the next frame holds more
+    box = len(after.rstrip(b"\r\n")) == 3 * FIELD_WIDTH and n_values > 3
+    frame_bytes = coordinate_bytes + (3 * FIELD_WIDTH + 1 if box else 0)
+    return title_bytes, frame_bytes, box
+
+
+def parse_frame(n_atoms, frame, index):
+    """
+    Coordinates of one frame of an ASCII trajectory, see map_frames.
+
+    Returns
+    -------
+    np.ndarray
+        Coordinates with shape (n_atoms, 3) in float32.
+    """
+    fields = frame.replace(b"\n", b"")
+    n_values = 3 * n_atoms
+    if len(fields) not in (n_values * FIELD_WIDTH, (n_values + 3) * FIELD_WIDTH):
+        raise ValueError(f"Frame {index + 1} is not a fixed-width AMBER frame.")
+    values = np.frombuffer(fields, dtype=f"S{FIELD_WIDTH}", count=n_values)
+    return values.astype(np.float32).reshape(n_atoms, 3)
+
+
+def transcode(trajectory, prmtop, fmt="nc", n_workers=None):
+    """
+    Convert an ASCII trajectory into its hidden binary copy.
+
+    Parameters
+    ----------
+    trajectory : str
+        Path to the .mdcrd or .crd file.
+    prmtop : str
+        Path to the AMBER topology, for the number of atoms.
+    fmt : str
+        'nc' for AMBER NetCDF or 'npy' for a float32 array.
+    n_workers : int, optional
+        Number of worker processes, see pyqmmm.io.sharding.worker_count.
+
+    Returns
+    -------
+    path : str
+        Path of the binary copy.
+
+    Raises
+    ------
+    ValueError
+        If the trajectory is not fixed-width or its frame count does not
+        match the AMBER output.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}', use one of {sorted(FORMATS)}")
+    n_atoms = prmtop_atom_count(prmtop)
+    title_bytes, frame_bytes, _ = frame_layout(trajectory, n_atoms)
+    n_frames, trailing = divmod(os.path.getsize(trajectory) - title_bytes, frame_bytes)
+    if trailing:
+        raise ValueError(f"{trajectory} ends with a partial frame or is not fixed-width.")
+
+    timestep = 1.0
+    mdout = os.path.splitext(trajectory)[0] + ".out"
+    if os.path.isfile(mdout):
+        settings = mdout_settings(mdout)
+        if settings.get("ntwx") and "nstlim" in settings:
+            expected = int(settings["nstlim"] // settings["ntwx"])
+            if n_frames != expected:
+                raise ValueError(f"{trajectory} has {n_frames} frames but {mdout} expects {expected}.")
+            timestep = settings.get("dt", 0.001) * settings["ntwx"]
+    else:
+        print(f"> No {mdout} found, the frame count of {trajectory} is not validated")
+
+    signature = file_signature(trajectory)
+    path, manifest = copy_paths(trajectory, fmt)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    starts = title_bytes + frame_bytes * np.arange(n_frames, dtype=np.int64)
+    parse = functools.partial(parse_frame, n_atoms)
+    frames = map_frames(trajectory, starts, starts + frame_bytes, parse, n_workers=n_workers)
+    try:
+        if fmt == "nc":
+            with NCDFWriter(temporary, n_atoms, timestep=timestep) as writer:
+                chunk = []
+                for coordinates in frames:
+                    chunk.append(coordinates)
+                    if len(chunk) == FRAMES_PER_WRITE:
+                        writer.write(np.stack(chunk))
+                        chunk = []
+                if chunk:
+                    writer.write(np.stack(chunk))
+        else:
+            array = np.lib.format.open_memmap(temporary, mode="w+", dtype=np.float32, shape=(n_frames, n_atoms, 3))
+            for index, coordinates in enumerate(frames):
+                array[index] = coordinates
+            array.flush()
+            del array
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    with open(manifest, "w") as f:
+        json.dump({"signature": signature.tolist(), "format": fmt, "frames": n_frames,
+                   "atoms": n_atoms, "timestep": timestep}, f)
+    return path
+
+
+def fast_trajectory(trajectory, prmtop, fmt="nc", n_workers=None):
+    """
+    Binary copy of an ASCII trajectory, transcoding it on first use.
+
+    Parameters
+    ----------
+    trajectory : str
+        Path to the trajectory.
+    prmtop : str
+        Path to the AMBER topology.
+    fmt : str
+        Format of a new copy, 'nc' or 'npy'.
+    n_workers : int, optional
+        Number of worker processes used to transcode.
+
+    Returns
+    -------
+    path : str
+        The binary copy, or trajectory itself if it is not an ASCII
+        trajectory or cannot be transcoded.
+    format : str
+        'NCDF' or 'TRJ', the MDAnalysis format of path, or 'NPY' for an
+        array to load with MDAnalysis' MemoryReader.
+    """
+    if not trajectory.endswith((".mdcrd", ".crd")) or not transcode_enabled():
+        return trajectory, "TRJ"
+    signature = file_signature(trajectory).tolist()
+    for existing in FORMATS:
+        path, manifest = copy_paths(trajectory, existing)
+        try:
+            with open(manifest) as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if recorded.get("signature") == signature and recorded.get("format") == existing and os.path.isfile(path):
+            return path, FORMATS[existing]
+
+    print(f"> Transcoding {trajectory} to a binary copy, a one-time conversion")
+    try:
+        return transcode(trajectory, prmtop, fmt, n_workers), FORMATS[fmt]
+    except (OSError, ValueError) as e:
+        print(f"> Reading {trajectory} as ASCII: {e}")
+        return trajectory, "TRJ"
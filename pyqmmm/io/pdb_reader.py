@@ -0,0 +1,407 @@
+"""
+Indexed, memory-mapped reader for MODEL-based PDB trajectories.
+
+The byte offsets of every MODEL/ENDMDL block are recorded in a single scan.
+Frames can then be streamed through transformations (atom deletion,
+translation) and written out with flat memory, sharded over worker processes.
+
+Compressed trajectories that are read once, in order, go through PDBStream
+instead, which decompresses them on the fly without a scratch copy.
+"""
+
+import functools
+import itertools
+import mmap
+import os
+
+import numpy as np
+
+from pyqmmm.io import traj_cache
+from pyqmmm.io.compression import decompress_to_scratch, detect_compression, open_input, open_output
+from pyqmmm.io.frame_selection import FrameView, stride_indices, strided
+from pyqmmm.io.sharding import line_transforms, map_stream, write_sharded
+
+_ATOM_RECORDS = (b"ATOM", b"HETATM")
+
+
+class PDBReader:
+    """
+    Random-access reader for multi-model PDB trajectories.
+
+    Parameters
+    ----------
+    path : str
+        Path to the PDB trajectory.
+    cache : bool, optional
+        Load and store the frame index in a binary sidecar,
+        see pyqmmm.io.traj_cache. Defaults to the PYQMMM_TRAJ_CACHE setting.
+    allow_truncated : bool
+        Ignore a final MODEL whose ENDMDL record has not been written yet,
+        e.g., while the trajectory is still being written, instead of raising a ValueError.
+
+    Attributes
+    ----------
+    starts : np.ndarray
+        Byte offset of the MODEL record of each frame.
+    ends : np.ndarray
+        Byte offset just past the ENDMDL record of each frame.
+    data_path : str
+        Path of the uncompressed bytes that the offsets refer to, a temporary
+        copy for gzip, xz, bzip2, or zstd compressed trajectories.
+    header : bytes
+        Everything before the first MODEL record (e.g., REMARK, CRYST1).
+    footer : bytes
+        Everything after the last ENDMDL record (e.g., END).
+    """
+
+    def __init__(self, path, cache=None, allow_truncated=False):
+        self.path = os.fspath(path)
+        self._file, self._mm = None, b""
+        # Compressed files are streamed once into a scratch copy that can be memory-mapped
+        self._scratch = decompress_to_scratch(self.path)
+        try:
+            self.data_path = self._scratch.name if self._scratch is not None else self.path
+            self._file = open(self.data_path, "rb")
+            size = os.fstat(self._file.fileno()).st_size
+            # Empty files cannot be memory-mapped
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            self.allow_truncated = allow_truncated
+
+            signature = traj_cache.file_signature(self.path) if traj_cache.cache_enabled(cache) else None
+            cached = signature is not None and traj_cache.load_sidecar(self.path, signature, ("starts", "ends"))
+            if cached:
+                self.starts, self.ends = cached["starts"], cached["ends"]
+            else:
+                self._build_index()
+                # An index that stopped at a truncated frame would hide the truncation from strict readers
+                if signature is not None and not self.truncated:
+                    traj_cache.update_sidecar(self.path, signature, starts=self.starts, ends=self.ends)
+            self._set_header_footer()
+        except BaseException:
+            # Remove the scratch copy of a compressed file that failed to index
+            self.close()
+            raise
+
+    def _build_index(self):
+        """Scan the file once and record the byte range of every MODEL block."""
+        mm = self._mm
+        size = len(mm)
+        starts, ends = [], []
+        self.truncated = False
+        pos = 0 if mm[:5] == b"MODEL" else mm.find(b"\nMODEL")
+        if pos > 0:
+            pos += 1
+        while pos != -1:
+            end = mm.find(b"\nENDMDL", pos)
+            if end == -1 or (self.allow_truncated and mm.find(b"\n", end + 1) == -1):
+                if self.allow_truncated:
+                    self.truncated = True
+                    break
+                raise ValueError(f"MODEL {len(starts) + 1} in {self.path} has no ENDMDL record")
+            end = mm.find(b"\n", end + 1)
+            end = size if end == -1 else end + 1
+            starts.append(pos)
+            ends.append(end)
+            pos = mm.find(b"\nMODEL", end - 1)
+            if pos != -1:
+                pos += 1
+
+        self.starts = np.array(starts, dtype=np.int64)
+        self.ends = np.array(ends, dtype=np.int64)
+
+    def _set_header_footer(self):
+        n_frames = len(self.starts)
+        self.header = self._mm[:self.starts[0]] if n_frames else self._mm[:]
+        self.footer = self._mm[self.ends[-1]:] if n_frames else b""
+        if self.allow_truncated and b"MODEL" in self.footer:
+            # The partial MODEL of a truncated trajectory is not a footer
+            self.footer = b""
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the memory map and the underlying file handle."""
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        if self._file is not None:
+            self._file.close()
+        if self._scratch is not None:
+            self._scratch.close()
+
+    def frame_bytes(self, index):
+        """
+        Raw bytes of a frame from its MODEL record through its ENDMDL record.
+
+        Parameters
+        ----------
+        index : int
+            Zero-based frame index, negative values count from the end.
+
+        Returns
+        -------
+        bytes
+        """
+        n_frames = len(self)
+        if index < 0:
+            index += n_frames
+        if not 0 <= index < n_frames:
+            raise IndexError(f"Frame {index} out of range for {self.path} with {n_frames} frames")
+        return self._mm[self.starts[index]:self.ends[index]]
+
+    def frame_lines(self, index):
+        """Lines of a frame, each keeping its line ending."""
+        return self.frame_bytes(index).splitlines(keepends=True)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FrameView(self, np.arange(len(self))[index])
+        return self.frame_lines(index)
+
+    def __reversed__(self):
+        return FrameView(self, np.arange(len(self))[::-1])
+
+    def take(self, frames):
+        """Lazy view of the given zero-based frames, in the given order."""
+        return FrameView(self, np.arange(len(self))[np.asarray(frames, dtype=np.int64)])
+
+
+class PDBStream:
+    """
+    Single pass over the MODEL blocks of a plain or compressed PDB trajectory.
+
+    Models are read in order straight from the decompressing stream (see
+    pyqmmm.io.compression.open_input). Use PDBReader for random access.
+
+    Parameters
+    ----------
+    path : str
+        Path to the PDB trajectory.
+
+    Attributes
+    ----------
+    header : bytes
+        Everything before the first MODEL record.
+    footer : bytes
+        Everything after the last ENDMDL record, once the stream is exhausted.
+    count : int
+        Number of models read so far.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.count = 0
+        self.footer = b""
+        self._file = open_input(self.path, "rb")
+        header = []
+        self._line = self._file.readline()
+        while self._line and not self._line.startswith(b"MODEL"):
+            header.append(self._line)
+            self._line = self._file.readline()
+        self.header = b"".join(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the underlying stream."""
+        self._file.close()
+
+    def __iter__(self):
+        """Yield (index, model) pairs with the raw bytes from each MODEL through its ENDMDL record."""
+        f = self._file
+        while self._line:
+            model = [self._line]
+            line = f.readline()
+            while line and not line.startswith(b"ENDMDL"):
+                model.append(line)
+                line = f.readline()
+            if not line:
+                raise ValueError(f"MODEL {self.count + 1} in {self.path} has no ENDMDL record")
+            model.append(line)
+            index = self.count
+            self.count += 1
+            yield index, b"".join(model)
+
+            # Records between models are dropped like in PDBReader, the rest after the last one is the footer
+            trailing = []
+            self._line = f.readline()
+            while self._line and not self._line.startswith(b"MODEL"):
+                trailing.append(self._line)
+                self._line = f.readline()
+            self.footer = b"".join(trailing)
+
+
+def _delete_atoms(remove, lines):
+    # Record names are compared for all lines at once, then atoms are numbered by order
+    is_atom = (np.array(lines, dtype="S4") == b"ATOM") | (np.array(lines, dtype="S6") == b"HETATM")
+    order = np.cumsum(is_atom)
+    order[order >= len(remove)] = 0
+    return list(itertools.compress(lines, ~(is_atom & remove[order])))
+
+
+def delete_atoms(atoms_to_remove):
+    """
+    Frame transform that removes atoms by their 1-indexed order within the frame.
+
+    Parameters
+    ----------
+    atoms_to_remove : iterable of int
+        1-indexed ATOM/HETATM records to remove, e.g., from pyqmmm.io.selection.
+
+    Returns
+    -------
+    transform : callable
+        Takes and returns the list of lines of one frame.
+    """
+    atoms_to_remove = np.asarray(list(atoms_to_remove), dtype=np.int64)
+    atoms_to_remove = atoms_to_remove[atoms_to_remove > 0]
+    # Indexed by atom order, with entry 0 standing for the non-atom records
+    remove = np.zeros(atoms_to_remove.max(initial=0) + 1, dtype=bool)
+    remove[atoms_to_remove] = True
+    return functools.partial(_delete_atoms, remove)
+
+
+def _translate(vector, lines):
+    dx, dy, dz = vector
+    translated = []
+    for line in lines:
+        if line.startswith(_ATOM_RECORDS):
+            try:
+                x = float(line[30:38]) + dx
+                y = float(line[38:46]) + dy
+                z = float(line[46:54]) + dz
+                line = b"%s%8.3f%8.3f%8.3f%s" % (line[:30], x, y, z, line[54:])
+            except ValueError:
+                pass
+        translated.append(line)
+    return translated
+
+
+def translate(vector):
+    """
+    Frame transform that shifts every ATOM/HETATM record by a vector.
+
+    Records with blank or unreadable coordinates are left unchanged.
+
+    Parameters
+    ----------
+    vector : tuple of float
+        The (x, y, z) translation in Angstrom.
+
+    Returns
+    -------
+    transform : callable
+        Takes and returns the list of lines of one frame.
+    """
+    return functools.partial(_translate, tuple(float(value) for value in vector))
+
+
+def find_atom_coordinates(lines, atom_serial):
+    """
+    Coordinates of the atom with a given serial number (columns 7-11).
+
+    Parameters
+    ----------
+    lines : list of bytes
+        Lines of one frame.
+    atom_serial : int
+        The PDB atom serial number.
+
+    Returns
+    -------
+    coordinates : tuple of float or None
+        The (x, y, z) coordinates, or None if the atom is not in the frame.
+    """
+    for line in lines:
+        if line.startswith(_ATOM_RECORDS):
+            try:
+                if int(line[6:11]) == atom_serial:
+                    return float(line[30:38]), float(line[38:46]), float(line[46:54])
+            except ValueError:
+                continue
+    return None
+
+
+def write_frames(reader, pdb_output, frames=None, transforms=(), n_workers=None):
+    """
+    Stream frames of a PDB trajectory through transforms into a new file.
+
+    Large trajectories are split into shards that are transformed in parallel,
+    see pyqmmm.io.sharding, so only a few shards are held in memory at a time.
+
+    Parameters
+    ----------
+    reader : PDBReader
+        The indexed input trajectory.
+    pdb_output : str
+        Path of the output PDB trajectory.
+    frames : list of int, optional
+        Zero-based frames to write, in order. Defaults to every frame.
+    transforms : sequence of callable
+        Applied in order to the lines of each frame. Must be picklable,
+        like the transforms returned by delete_atoms and translate.
+    n_workers : int, optional
+        Number of worker processes, defaults to NSLOTS or the CPU count.
+
+    Returns
+    -------
+    frame_count : int
+        Number of frames written.
+    """
+    return write_sharded(
+        reader.data_path, reader.starts, reader.ends, pdb_output, line_transforms(transforms),
+        frames=frames, header=reader.header, footer=reader.footer, n_workers=n_workers,
+    )
+
+
+def stream_frames(pdb_input, pdb_output, stride=1, transforms=(), n_workers=None):
+    """
+    Stream every stride-th frame of a PDB trajectory through transforms into a new file.
+
+    Compressed inputs are decompressed on the fly (see PDBStream), plain
+    inputs are indexed and sharded, see write_frames. The first and last
+    frames are always written, see stride_indices.
+
+    Parameters
+    ----------
+    pdb_input : str
+        Path of the input PDB trajectory.
+    pdb_output : str
+        Path of the output PDB trajectory.
+    stride : int
+        Keep every stride-th frame.
+    transforms : sequence of callable
+        Applied in order to the lines of each frame, see write_frames.
+    n_workers : int, optional
+        Number of worker processes, defaults to NSLOTS or the CPU count.
+
+    Returns
+    -------
+    total_frames : int
+        Number of frames in the input.
+    frame_count : int
+        Number of frames written.
+    """
+    if detect_compression(pdb_input) is None:
+        with PDBReader(pdb_input) as reader:
+            frames = stride_indices(len(reader), stride)
+            return len(reader), write_frames(reader, pdb_output, frames, transforms, n_workers)
+
+    frame_count = 0
+    with PDBStream(pdb_input) as stream, open_output(pdb_output) as f:
+        f.write(stream.header)
+        for data in map_stream(strided(stream, stride), line_transforms(transforms), n_workers):
+            f.write(data)
+            frame_count += 1
+        f.write(stream.footer)
+    return stream.count, frame_count
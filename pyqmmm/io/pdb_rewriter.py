@@ -0,0 +1,160 @@
+"""
+In-place rewriting of coordinates in fixed-width PDB trajectories.
+
+PDB coordinates live in columns 31-54 as three %8.3f fields, so a rigid
+transform never changes the length of a record. The coordinates can
+therefore be decoded, transformed, and re-encoded with vectorized NumPy
+directly in a writable memory map, without a second copy of the trajectory.
+"""
+
+import mmap
+import os
+import shutil
+
+import numpy as np
+
+from pyqmmm.io.compression import EXTENSIONS, detect_compression
+
+CHUNK_BYTES = 1 << 25  # Bytes of the file decoded per vectorized block
+_COORD_COLUMNS = np.arange(30, 54)
+_DIGITS = ord("0")
+
+
+def _atom_line_starts(buf, start, stop):
+    """
+    Byte offsets of the ATOM/HETATM records that start in buf[start:stop].
+
+    Parameters
+    ----------
+    buf : np.ndarray
+        uint8 view of the memory-mapped file.
+    start : int
+        Offset of the start of a line.
+    stop : int
+        Offset just past a newline (or the end of the file).
+
+    Returns
+    -------
+    np.ndarray
+        Offsets of the records with complete coordinate columns.
+    """
+    newlines = np.flatnonzero(buf[start:stop] == ord("\n")) + start
+    line_starts = np.concatenate(([start], newlines + 1))
+    line_ends = np.concatenate((newlines, [stop]))
+    long_enough = line_ends - line_starts >= 54
+    line_starts = line_starts[long_enough]
+
+    record = buf[line_starts[:, None] + np.arange(6)].view("S6").ravel()
+    is_atom = (record == b"ATOM  ") | (record == b"HETATM")
+    return line_starts[is_atom]
+
+
+def _format_coordinates(values):
+    """
+    Vectorized equivalent of '%8.3f' for an array of coordinates.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Coordinates of shape (n,).
+
+    Returns
+    -------
+    np.ndarray
+        uint8 array of shape (n, 8) with the right-aligned text of each value.
+    """
+    thousandths = values * 1000
+    scaled = np.rint(thousandths).astype(np.int64)
+    if (scaled > 9999999).any() or (scaled < -999999).any():
+        raise ValueError("Transformed coordinates do not fit in the fixed-width PDB columns.")
+    # '%8.3f' keeps the sign of values that round to zero, e.g. -0.000
+    negative = np.signbit(values)
+    magnitude = np.abs(scaled)
+
+    out = np.full((len(values), 8), ord(" "), dtype=np.uint8)
+    out[:, 7] = _DIGITS + magnitude % 10
+    out[:, 6] = _DIGITS + magnitude // 10 % 10
+    out[:, 5] = _DIGITS + magnitude // 100 % 10
+    out[:, 4] = ord(".")
+    integer = magnitude // 1000
+    out[:, 3] = _DIGITS + integer % 10
+    n_digits = np.ones(len(values), dtype=np.int64)
+    for position, power in ((2, 10), (1, 100), (0, 1000)):
+        has_digit = integer >= power
+        out[has_digit, position] = _DIGITS + integer[has_digit] // power % 10
+        n_digits += has_digit
+    rows = np.flatnonzero(negative)
+    out[rows, 3 - n_digits[rows]] = ord("-")
+
+    # Values within rounding error of a half thousandth are formatted exactly
+    ties = np.flatnonzero(np.abs(np.abs(thousandths) % 1 - 0.5) < 1e-6)
+    if len(ties):
+        text = b"".join(b"%8.3f" % value for value in values[ties])
+        out[ties] = np.frombuffer(text, dtype=np.uint8).reshape(-1, 8)
+    return out
+
+
+def rigid_transform_pdb(pdb_path, rotation=None, translation=None, output=None):
+    """
+    Apply x' = R x + t to every ATOM/HETATM record of a PDB in place.
+
+    Parameters
+    ----------
+    pdb_path : str
+        The PDB trajectory to modify.
+    rotation : np.ndarray, optional
+        3x3 rotation matrix, identity if omitted.
+    translation : sequence of float, optional
+        (x, y, z) translation in Angstrom, zero if omitted.
+    output : str, optional
+        If given, pdb_path is copied here first and only the copy is modified.
+
+    Notes
+    -----
+    The file is rewritten block by block. If a transformed coordinate does not
+    fit in its 8-column field a ValueError is raised and the blocks before it
+    have already been rewritten, so pass `output` unless the input is expendable.
+    Compressed inputs and outputs raise a ValueError, since their records
+    are not at fixed offsets.
+
+    Returns
+    -------
+    atom_count : int
+        Number of records that were rewritten.
+    """
+    compressed_output = output is not None and os.path.splitext(output)[1].lower() in EXTENSIONS
+    if detect_compression(pdb_path) or compressed_output:
+        raise ValueError("Compressed PDB files cannot be rewritten in place, stream them through write_frames instead")
+    if output is not None and os.path.abspath(output) != os.path.abspath(pdb_path):
+        shutil.copyfile(pdb_path, output)
+        pdb_path = output
+    rotation = np.eye(3) if rotation is None else np.asarray(rotation, dtype=np.float64)
+    translation = np.zeros(3) if translation is None else np.asarray(translation, dtype=np.float64)
+
+    atom_count = 0
+    with open(pdb_path, "r+b") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0
+        with mmap.mmap(f.fileno(), 0) as mm:
+            buf = np.frombuffer(mm, dtype=np.uint8)
+            try:
+                size = buf.size
+                start = 0
+                while start < size:
+                    # Blocks end on a line boundary so no record is split between blocks
+                    stop = min(start + CHUNK_BYTES, size)
+                    if stop < size:
+                        stop = mm.rfind(b"\n", start, stop) + 1 or size
+                    atom_starts = _atom_line_starts(buf, start, stop)
+                    if len(atom_starts):
+                        columns = atom_starts[:, None] + _COORD_COLUMNS
+                        coords = buf[columns].view("S8").astype(np.float64)
+                        coords = coords @ rotation.T + translation
+                        buf[columns] = _format_coordinates(coords.ravel()).reshape(columns.shape)
+                        atom_count += len(atom_starts)
+                    start = stop
+            finally:
+                # The memory map cannot be closed while NumPy still views it
+                del buf
+            mm.flush()
+    return atom_count
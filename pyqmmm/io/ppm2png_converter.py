@@ -1,27 +1,151 @@
 """Takes the PPM image output from VMD and converts them to PNGs."""
 
 import os
+import glob
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 
-def ppm2png_converter():
+from pyqmmm.io.sharding import worker_count
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+COMPRESSION_LEVEL = 6
+
+
+def read_ppm(ppm_file):
+    """
+    Decodes a binary (P6) or plain (P3) PPM image, or its PGM (P5, P2) grayscale variant.
+
+    Parameters
+    ----------
+    ppm_file : str
+        Path to the image.
+
+    Returns
+    -------
+    image : np.ndarray
+        Pixels with shape (height, width, channels) as uint8,
+        or big-endian uint16 if the maximum value is above 255.
+    """
+    with open(ppm_file, "rb") as f:
+        data = f.read()
+
+    # The header is four whitespace-separated fields, possibly with # comments
+    fields = []
+    pos = 0
+    while len(fields) < 4:
+        while data[pos:pos + 1].isspace():
+            pos += 1
+        if data[pos:pos + 1] == b"#":
+            pos = data.index(b"\n", pos)
+            continue
+        end = pos
+        while end < len(data) and not data[end:end + 1].isspace() and data[end:end + 1] != b"#":
+            end += 1
+        if end == pos:
+            raise ValueError(f"Incomplete PPM header in {ppm_file}")
+        fields.append(data[pos:end])
+        pos = end
+    magic, width, height, maxval = fields[0], int(fields[1]), int(fields[2]), int(fields[3])
+    if magic not in (b"P2", b"P3", b"P5", b"P6"):
+        raise ValueError(f"{ppm_file} is not a PPM or PGM image")
+
+    channels = 3 if magic in (b"P3", b"P6") else 1
+    dtype = np.dtype(">u2") if maxval > 255 else np.dtype(np.uint8)
+    shape = (height, width, channels)
+    if magic in (b"P5", b"P6"):
+        # Exactly one whitespace character separates the header from the raster
+        count = height * width * channels
+        image = np.frombuffer(data, dtype=dtype, count=count, offset=pos + 1).reshape(shape)
+    else:
+        image = np.array(data[pos:].split(), dtype=np.int64)[:height * width * channels]
+        image = image.astype(dtype).reshape(shape)
+
+    if maxval not in (255, 65535):
+        # PNG has no maximum value field, so rescale to the full range of the bit depth
+        full = 65535 if maxval > 255 else 255
+        image = (image.astype(np.float64) * full / maxval).round().astype(dtype)
+    return image
+
+
+def _png_chunk(tag, payload):
+    return struct.pack(">I", len(payload)) + tag + payload + struct.pack(">I", zlib.crc32(tag + payload))
+
+
+def write_png(png_file, image):
+    """
+    Encodes an image as PNG.
+
+    Every scanline uses the Up filter, which is computed for the whole image
+    at once and compresses the smooth backgrounds of VMD renders well.
+
+    Parameters
+    ----------
+    png_file : str
+        Path of the output PNG.
+    image : np.ndarray
+        Pixels with shape (height, width, channels) as returned by read_ppm.
+    """
+    height, width, channels = image.shape
+    bit_depth = 16 if image.dtype.itemsize == 2 else 8
+    color_type = 2 if channels == 3 else 0
+
+    rows = image.astype(image.dtype.newbyteorder(">"), copy=False).view(np.uint8).reshape(height, -1)
+    filtered = np.empty((height, rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 2  # Up filter
+    filtered[0, 1:] = rows[0]
+    np.subtract(rows[1:], rows[:-1], out=filtered[1:, 1:])
+
+    header = struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, 0)
+    with open(png_file, "wb") as f:
+        f.write(PNG_SIGNATURE)
+        f.write(_png_chunk(b"IHDR", header))
+        f.write(_png_chunk(b"IDAT", zlib.compress(filtered.tobytes(), COMPRESSION_LEVEL)))
+        f.write(_png_chunk(b"IEND", b""))
+
+
+def convert(ppm_file, png_file):
+    """Converts one PPM to a PNG, in a worker process."""
+    write_png(png_file, read_ppm(ppm_file))
+    return png_file
+
+
+def ppm2png_converter(directory="./", n_workers=None):
     """
     Converts a PPM to a PNG.
 
     When VMD is used to generate molecular movies,
     one common point of annoyance it that the output files are written as PPM.
     This script will convert the files to PNGs so they can be combined.
-    Pnmtopng from Netpbm must be installed to perform the conversion.
+    The images are decoded and encoded in-process, spread over a pool of workers.
+    Outputs are numbered 0.png, 1.png, ... in sorted order of the PPM names.
+
+    Parameters
+    ----------
+    directory : str
+        Folder containing the PPM files, the PNGs are written next to them.
+    n_workers : int, optional
+        Number of worker processes, defaults to NSLOTS or the CPU count.
     """
-    directory = "./"
-    # Loop through all images in the current directory
-    count = 0
-    for filename in sorted(os.listdir(directory)):
-        file = os.path.join(directory, filename)
-
-        # Checking if it is a file
-        if os.path.isfile(file):
-            os.system(f"pnmtopng {file} > {count}.png")
-            count += 1
+    ppm_files = sorted(glob.glob(os.path.join(directory, "*.ppm")))
+    if not ppm_files:
+        print(f"> No PPM files found in {directory}")
+        return
+    png_files = [os.path.join(directory, f"{count}.png") for count in range(len(ppm_files))]
+
+    n_workers = min(worker_count(n_workers), len(ppm_files))
+    if n_workers == 1:
+        for ppm_file, png_file in zip(ppm_files, png_files):
+            convert(ppm_file, png_file)
+    else:
+        chunksize = max(1, len(ppm_files) // (4 * n_workers))
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            for _ in executor.map(convert, ppm_files, png_files, chunksize=chunksize):
+                pass
+
+    print(f"> Converted {len(ppm_files)} PPM files to PNG")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+"""
+On-disk cache of analysis results keyed by input file contents.
+
+Decorating an expensive parser or analysis with cached() stores its return
+value under a key made of the function, a version number, a content hash
+of every input file, and the remaining arguments. Calling it again with
+unchanged inputs loads the stored result, and any change to an input file
+or argument computes and stores a new one. None results, which functions
+return on failure, are never stored.
+
+Results are pickled into one shared directory, by default
+~/.cache/pyqmmm/results, bounded to PYQMMM_CACHE_BYTES (1 GB by default).
+The least recently used results are evicted once the bound is exceeded.
+Set PYQMMM_CACHE_DIR to move the cache and PYQMMM_RESULT_CACHE=0 to
+disable it.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+
+HASH_BLOCK_BYTES = 1 << 24
+DEFAULT_MAX_BYTES = 1 << 30
+
+_file_hashes = {}  # (path, size, mtime) -> digest, so each file is hashed once per process
+
+
+def cache_enabled():
+    """Whether results are cached, see PYQMMM_RESULT_CACHE."""
+    return os.getenv("PYQMMM_RESULT_CACHE", "1") != "0"
+
+
+def cache_dir():
+    """Directory of the stored results."""
+    default = os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "pyqmmm", "results")
+    return os.getenv("PYQMMM_CACHE_DIR", default)
+
+
+def max_bytes():
+    """Size bound of the cache directory in bytes."""
+    return int(os.getenv("PYQMMM_CACHE_BYTES", DEFAULT_MAX_BYTES))
+
+
+def file_digest(path):
+    """
+    Content hash of a whole file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+
+    Returns
+    -------
+    str
+        Hex digest of the file contents.
+    """
+    stat = os.stat(path)
+    token = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if token not in _file_hashes:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+                digest.update(block)
+        _file_hashes[token] = digest.hexdigest()
+    return _file_hashes[token]
+
+
+def result_key(name, version, files, params):
+    """
+    Cache key of a result.
+
+    Parameters
+    ----------
+    name : str
+        Qualified name of the function producing the result.
+    version : int
+        Bumped when the function changes its output for the same inputs.
+    files : list of str
+        Input files, hashed by content so renames and copies still match.
+    params : dict
+        Remaining arguments, which must be picklable.
+
+    Returns
+    -------
+    str
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{name}:{version}".encode())
+    for path in files:
+        digest.update(file_digest(path).encode())
+    digest.update(pickle.dumps(sorted(params.items()), protocol=4))
+    return digest.hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(cache_dir(), f"{key}.pkl")
+
+
+def load(key):
+    """
+    Stored result of a key, marking it as recently used.
+
+    Returns
+    -------
+    object
+        The result, or None if the key is missing or unreadable.
+    """
+    path = _entry_path(key)
+    try:
+        with open(path, "rb") as f:
+            result = pickle.load(f)
+        os.utime(path)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+    return result
+
+
+def store(key, result):
+    """
+    Store a result and evict the least recently used ones beyond max_bytes().
+
+    Failures to write (e.g., a read-only or full disk) are silently ignored.
+    """
+    directory = cache_dir()
+    target = _entry_path(key)
+    temporary = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temporary, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, target)
+    except (OSError, pickle.PicklingError):
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        return
+    evict(max_bytes())
+
+
+def evict(limit):
+    """
+    Remove the least recently used results until the cache fits in limit bytes.
+
+    Parameters
+    ----------
+    limit : int
+        Size bound in bytes.
+    """
+    entries = []
+    with os.scandir(cache_dir()) as scan:
+        for entry in scan:
+            if entry.name.endswith(".pkl"):
+                try:
+                    stat = entry.stat()
+                except OSError:  # Removed by another process
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+
+
+def cached(files=(), ignore=(), version=1):
+    """
+    Cache the results of a function on disk, keyed by its input files and arguments.
+
+    Parameters
+    ----------
+    files : tuple of str
+        Names of the arguments holding an input path or a list of input paths.
+    ignore : tuple of str
+        Names of the arguments that do not change the result, e.g., thread counts.
+    version : int
+        Bump to invalidate the results stored by earlier versions of the function.
+
+    Examples
+    --------
+    >>> @cached(files=("file_path",))
+    ... def count_bonds(file_path, cutoff=3.5):
+    ...     ...
+    """
+
+    def decorator(function):
+        signature = inspect.signature(function)
+        name = f"{function.__module__}.{function.__qualname__}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not cache_enabled():
+                return function(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            paths = []
+            params = {}
+            for argument, value in bound.arguments.items():
+                if argument in files:
+                    paths.extend([value] if isinstance(value, (str, os.PathLike)) else value)
+                elif argument not in ignore:
+                    params[argument] = value
+            try:
+                key = result_key(name, version, paths, params)
+            except (OSError, TypeError, AttributeError, pickle.PicklingError):
+                # Missing inputs or unpicklable arguments, leave the errors to the function
+                return function(*args, **kwargs)
+            result = load(key)
+            if result is not None:
+                print(f"> Reusing the cached result of {function.__name__}")
+                return result
+            result = function(*args, **kwargs)
+            if result is not None:
+                store(key, result)
+            return result
+
+        return wrapper
+
+    return decorator
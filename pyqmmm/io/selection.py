@@ -0,0 +1,193 @@
+"""
+Atom selections compiled to NumPy masks.
+
+A selection is a comma-separated list of terms, and anything after a '#'
+is a comment, as in the delete.in files:
+
+    1-8,104-106,166      # atoms by their 1-based order in a frame
+    resid 45-50, resname HOH  # residues, resolved against a PDB template
+    chain B, element Fe, name CA
+
+Bare numbers and ranges select atoms by order. The keywords resid, resname,
+chain, element, and name take one or more space-separated values and
+require a PDB template. Terms are combined as a union. Once a selection
+is compiled, a frame is filtered with a single fancy-index.
+"""
+
+import numpy as np
+
+from pyqmmm.io.compression import open_input
+
+KEYWORDS = ("resid", "resname", "chain", "element", "name")
+
+
+def parse_ranges(text, separator=","):
+    """
+    Expand a list of numbers and inclusive ranges, e.g., "1-3,7" to [1, 2, 3, 7].
+
+    Parameters
+    ----------
+    text : str
+        The ranges, with optional '#' comments and one list per line.
+    separator : str
+        The character between terms.
+
+    Returns
+    -------
+    numbers : list of int
+        The numbers in the order they were given.
+    """
+    numbers = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0]
+        for token in line.split(separator):
+            token = token.strip()
+            if not token:
+                continue
+            try:
+                numbers.extend(_expand(token))
+            except ValueError:
+                print(f"Warning: Could not parse token '{token}'")
+    return numbers
+
+
+def _expand(token):
+    if "-" in token[1:]:
+        start, end = token.split("-", 1)
+        return range(int(start), int(end) + 1)
+    return [int(token)]
+
+
+def read_topology(pdb_template):
+    """
+    Atom names, residues, chains, and elements of the atoms in a PDB.
+
+    Only the ATOM/HETATM records before the first ENDMDL are read.
+
+    Parameters
+    ----------
+    pdb_template : str
+        Path to the PDB, optionally compressed.
+
+    Returns
+    -------
+    topology : dict of np.ndarray
+        Arrays with one entry per atom for each selection keyword.
+    """
+    records = []
+    with open_input(pdb_template, "r") as f:
+        for line in f:
+            if line.startswith("ENDMDL"):
+                break
+            if line.startswith(("ATOM", "HETATM")):
+                records.append(line.rstrip("\n").ljust(80))
+
+    name = [line[12:16].strip() for line in records]
+    element = [
+        line[76:78].strip() or "".join(c for c in atom_name if c.isalpha())[:1]
+        for line, atom_name in zip(records, name)
+    ]
+    return {
+        "name": np.array(name, dtype=str),
+        "resname": np.array([line[17:20].strip() for line in records], dtype=str),
+        "chain": np.array([line[21] for line in records], dtype=str),
+        "resid": _residue_numbers([line[22:27] for line in records]),
+        "element": np.char.capitalize(np.array(element, dtype=str)),
+    }
+
+
+def _residue_numbers(fields):
+    """
+    Residue numbers from the resSeq and iCode columns of ATOM records.
+
+    Fields that are not plain integers, e.g., overflowed or hybrid-36 numbers
+    of large systems, continue counting from the previous residue.
+    """
+    numbers = np.empty(len(fields), dtype=np.int64)
+    previous_field, number = None, 0
+    for i, field in enumerate(fields):
+        if field != previous_field:
+            try:
+                number = int(field[:4])
+            except ValueError:
+                number += 1
+            previous_field = field
+        numbers[i] = number
+    return numbers
+
+
+def compile_selection(text, n_atoms=None, topology=None):
+    """
+    Compile a selection into a boolean mask over the atoms of a frame.
+
+    Parameters
+    ----------
+    text : str
+        The selection, see the module documentation for the syntax.
+    n_atoms : int, optional
+        Atoms per frame. Defaults to the size of the topology, or the
+        largest selected index if there is none. Larger indices are ignored.
+    topology : dict, optional
+        Output of read_topology, required by the keyword selectors.
+
+    Returns
+    -------
+    mask : np.ndarray
+        True for every selected atom.
+    """
+    indices = []
+    selectors = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0]
+        for token in line.split(","):
+            words = token.split()
+            if not words:
+                continue
+            if words[0] in KEYWORDS:
+                if topology is None:
+                    raise ValueError(f"Selecting by '{words[0]}' requires a PDB template")
+                selectors.append(words)
+                continue
+            try:
+                indices.extend(_expand("".join(words)))
+            except ValueError:
+                print(f"Warning: Could not parse token '{token.strip()}'")
+
+    if n_atoms is None:
+        n_atoms = len(topology["name"]) if topology is not None else max(indices, default=0)
+    mask = np.zeros(n_atoms, dtype=bool)
+    indices = np.asarray(indices, dtype=np.int64)
+    mask[indices[(indices > 0) & (indices <= n_atoms)] - 1] = True
+
+    for keyword, *values in selectors:
+        column = topology[keyword][:n_atoms]
+        if keyword == "resid":
+            wanted = [number for value in values for number in _expand(value)]
+        elif keyword == "element":
+            wanted = [value.capitalize() for value in values]
+        else:
+            wanted = values
+        mask[:len(column)] |= np.isin(column, wanted)
+    return mask
+
+
+def read_selection(selection_file, n_atoms=None, topology=None):
+    """
+    Compile the selection in a file such as delete.in.
+
+    Parameters
+    ----------
+    selection_file : str
+        Path to the selection.
+    n_atoms : int, optional
+        Atoms per frame, see compile_selection.
+    topology : dict, optional
+        Output of read_topology, required by the keyword selectors.
+
+    Returns
+    -------
+    mask : np.ndarray
+        True for every selected atom.
+    """
+    with open_input(selection_file, "r") as f:
+        return compile_selection(f.read(), n_atoms, topology)
@@ -0,0 +1,276 @@
+"""
+Frame-sharded parallel processing of indexed trajectories.
+
+The byte offsets of the frames (see XYZReader and PDBReader) are split into
+contiguous shards of roughly equal size. Each shard is processed in a worker
+process that memory-maps the trajectory and applies a per-frame transform,
+and the shard outputs are returned or written in the original frame order.
+At most two shards per worker are in flight, so memory stays bounded by a
+few shards however large the trajectory is. Small inputs and single-worker
+runs are processed one frame at a time in the calling process. Streams
+that cannot be indexed, like compressed trajectories, are sent to the
+workers in batches of frames as they are read, see map_stream.
+
+Transforms are called as transform(frame, index) with the raw bytes of one
+frame and its zero-based index in the trajectory. They are sent to the
+worker processes, so they must be picklable: module-level functions or
+functools.partial objects wrapping them, not closures or lambdas.
+"""
+
+import functools
+import itertools
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pyqmmm.io.compression import open_output
+
+SHARD_BYTES = 1 << 26  # Target size of a shard
+PARALLEL_BYTES = 1 << 23  # Smaller selections are processed in the calling process
+SHARDS_PER_WORKER = 2  # Shards submitted ahead of the one being collected
+BATCH_BYTES = 1 << 22  # Target size of a batch of streamed frames
+
+
+def worker_count(n_workers=None):
+    """
+    Number of worker processes to use.
+
+    Parameters
+    ----------
+    n_workers : int, optional
+        Explicit number of workers. Defaults to the NSLOTS variable set by
+        the queueing system, or the number of CPUs.
+
+    Returns
+    -------
+    int
+    """
+    if n_workers is None:
+        n_workers = int(os.getenv("NSLOTS", os.cpu_count() or 1))
+    return max(1, n_workers)
+
+
+def shard_frames(sizes, n_shards):
+    """
+    Split consecutive frames into shards holding roughly the same number of bytes.
+
+    Parameters
+    ----------
+    sizes : np.ndarray
+        Size in bytes of each frame.
+    n_shards : int
+        Number of shards to create.
+
+    Returns
+    -------
+    bounds : list of tuple
+        (first, stop) positions into sizes for each non-empty shard.
+    """
+    cumulative = np.cumsum(sizes)
+    targets = cumulative[-1] * np.arange(1, n_shards) / n_shards
+    splits = np.searchsorted(cumulative, targets, side="right")
+    edges = np.unique(np.concatenate(([0], splits, [len(sizes)])))
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def _run_shard(path, indices, starts, ends, transform):
+    """Apply a transform to every frame of one shard, in a worker process."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return [transform(mm[start:end], index) for index, start, end in zip(indices, starts, ends)]
+
+
+def imap_ordered(function, calls, n_workers):
+    """
+    Run function(*args) for every call in worker processes and yield the results in order.
+
+    At most SHARDS_PER_WORKER calls per worker are submitted ahead of the
+    result being collected, so a lazy iterable of calls is only consumed
+    as fast as the results are, and memory stays bounded.
+
+    Parameters
+    ----------
+    function : callable
+        Picklable module-level function.
+    calls : iterable of tuple
+        Arguments of each call.
+    n_workers : int
+        Number of worker processes.
+
+    Yields
+    ------
+    result
+        The return value of each call, in the order of calls.
+    """
+    # Futures are collected in submission order, so results stay in order
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        pending = deque()
+        for args in calls:
+            pending.append(executor.submit(function, *args))
+            if len(pending) >= SHARDS_PER_WORKER * n_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def map_frames(path, starts, ends, transform, frames=None, n_workers=None):
+    """
+    Apply a transform to frames of a trajectory in parallel.
+
+    Parameters
+    ----------
+    path : str
+        Path to the trajectory.
+    starts, ends : np.ndarray
+        Byte range of every frame, e.g., from XYZReader or PDBReader.
+    transform : callable
+        Picklable transform(frame, index) applied to each frame.
+    frames : sequence of int, optional
+        Zero-based frames to process, in order. Defaults to every frame.
+    n_workers : int, optional
+        Number of worker processes, see worker_count.
+
+    Yields
+    ------
+    result
+        The return value of the transform for each frame, in order.
+    """
+    indices = np.arange(len(starts)) if frames is None else np.asarray(frames, dtype=np.int64)
+    if not len(indices):
+        return
+    starts, ends = np.asarray(starts)[indices], np.asarray(ends)[indices]
+    sizes = ends - starts
+    total = int(sizes.sum())
+
+    n_workers = worker_count(n_workers) if total >= PARALLEL_BYTES else 1
+    if n_workers == 1:
+        # One frame at a time, no shard results are held in memory
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for index, start, end in zip(indices.tolist(), starts.tolist(), ends.tolist()):
+                yield transform(mm[start:end], index)
+        return
+
+    n_shards = min(len(indices), max(n_workers, -(-total // SHARD_BYTES)))
+    shards = (
+        (path, indices[a:b].tolist(), starts[a:b].tolist(), ends[a:b].tolist(), transform)
+        for a, b in shard_frames(sizes, n_shards)
+    )
+    for results in imap_ordered(_run_shard, shards, min(n_workers, n_shards)):
+        yield from results
+
+
+def _run_batch(batch, transform):
+    """Apply a transform to a batch of streamed (index, frame) pairs, in a worker process."""
+    return [transform(frame, index) for index, frame in batch]
+
+
+def _batches(frames, batch_bytes):
+    batch, size = [], 0
+    for index, frame in frames:
+        batch.append((index, frame))
+        size += len(frame)
+        if size >= batch_bytes:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def map_stream(frames, transform, n_workers=None):
+    """
+    Apply a transform to a stream of frames in parallel, e.g., from a compressed file.
+
+    Frames are grouped into batches of about BATCH_BYTES that are sent to the
+    workers as they are read, with at most SHARDS_PER_WORKER batches per
+    worker in flight, see imap_ordered. A stream that fits into one batch is
+    transformed in the calling process.
+
+    Parameters
+    ----------
+    frames : iterable of tuple
+        (index, frame) pairs with the raw bytes of each frame, in order.
+    transform : callable
+        Picklable transform(frame, index) applied to each frame.
+    n_workers : int, optional
+        Number of worker processes, see worker_count.
+
+    Yields
+    ------
+    result
+        The return value of the transform for each frame, in order.
+    """
+    batches = _batches(frames, BATCH_BYTES)
+    first = next(batches, None)
+    if first is None:
+        return
+    second = next(batches, None)
+    n_workers = worker_count(n_workers)
+    if second is None or n_workers == 1:
+        for batch in itertools.chain([first], [] if second is None else [second], batches):
+            yield from _run_batch(batch, transform)
+        return
+    calls = ((batch, transform) for batch in itertools.chain([first, second], batches))
+    for results in imap_ordered(_run_batch, calls, n_workers):
+        yield from results
+
+
+def write_sharded(path, starts, ends, output, transform, frames=None, header=b"", footer=b"", n_workers=None):
+    """
+    Transform frames of a trajectory in parallel and write them to a new file in order.
+
+    Parameters
+    ----------
+    path : str
+        Path to the input trajectory.
+    starts, ends : np.ndarray
+        Byte range of every frame.
+    output : str
+        Path of the output file, compressed if it ends in .gz, .xz, .bz2, or .zst.
+    transform : callable
+        Picklable transform(frame, index) returning the bytes to write for a frame.
+    frames : sequence of int, optional
+        Zero-based frames to write, in order. Defaults to every frame.
+    header, footer : bytes
+        Written before the first and after the last frame.
+    n_workers : int, optional
+        Number of worker processes, see worker_count.
+
+    Returns
+    -------
+    frame_count : int
+        Number of frames written.
+    """
+    frame_count = 0
+    with open_output(output) as f:
+        f.write(header)
+        for data in map_frames(path, starts, ends, transform, frames, n_workers):
+            f.write(data)
+            frame_count += 1
+        f.write(footer)
+    return frame_count
+
+
+def _apply_line_transforms(transforms, frame, index):
+    lines = frame.splitlines(keepends=True)
+    for transform in transforms:
+        lines = transform(lines)
+    return b"".join(lines)
+
+
+def line_transforms(transforms):
+    """
+    Frame transform that applies line-based transforms (e.g., from pdb_reader) in order.
+
+    Parameters
+    ----------
+    transforms : sequence of callable
+        Each takes and returns the list of lines of one frame.
+
+    Returns
+    -------
+    transform : callable
+        Picklable transform(frame, index) returning the transformed frame bytes.
+    """
+    return functools.partial(_apply_line_transforms, tuple(transforms))
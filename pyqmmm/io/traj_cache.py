@@ -0,0 +1,140 @@
+"""
+Binary sidecar cache for parsed trajectories.
+
+The first parse of a trajectory writes a hidden sidecar directory next to
+it holding the frame index and, once parsed, the coordinates, elements, and
+titles, one .npy file per array. Later runs load the arrays from the sidecar
+instead of re-parsing the text, and storing an array never rewrites the
+others.
+
+A sidecar is only used if the size, modification time, and a content hash
+of the trajectory still match the values recorded when it was written.
+The cache is on by default. Set the environment variable
+PYQMMM_TRAJ_CACHE=0, or pass cache=False to the readers, to disable it.
+"""
+
+import hashlib
+import os
+import shutil
+
+import numpy as np
+
+CACHE_VERSION = 2
+SAMPLE_BYTES = 1 << 20  # Bytes hashed from each end of the trajectory
+
+
+def cache_enabled(cache=None):
+    """Resolve an explicit cache flag against the PYQMMM_TRAJ_CACHE default."""
+    if cache is None:
+        return os.getenv("PYQMMM_TRAJ_CACHE", "1") != "0"
+    return cache
+
+
+def sidecar_path(path):
+    """Path of the hidden sidecar directory for a trajectory."""
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, f".{name}.pyqmmm")
+
+
+def file_signature(path):
+    """
+    Fingerprint of a trajectory used to validate its sidecar.
+
+    The content hash covers the first and last SAMPLE_BYTES of the file,
+    which together with the size and mtime catches rewrites and appends
+    without reading multi-GB trajectories in full.
+
+    Parameters
+    ----------
+    path : str
+        Path to the trajectory.
+
+    Returns
+    -------
+    signature : np.ndarray
+        The cache version, size, mtime, and hash as a string array.
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(SAMPLE_BYTES))
+        if stat.st_size > SAMPLE_BYTES:
+            f.seek(max(SAMPLE_BYTES, stat.st_size - SAMPLE_BYTES))
+            digest.update(f.read())
+    return np.array([str(CACHE_VERSION), str(stat.st_size), str(stat.st_mtime_ns), digest.hexdigest()])
+
+
+def _valid(path, signature):
+    """Whether the sidecar of a trajectory was written for this signature."""
+    try:
+        recorded = np.load(os.path.join(sidecar_path(path), "signature.npy"), allow_pickle=False)
+    except (OSError, ValueError):
+        return False
+    return np.array_equal(recorded, signature)
+
+
+def load_sidecar(path, signature, keys, mmap_mode=None):
+    """
+    Load cached arrays for a trajectory.
+
+    Parameters
+    ----------
+    path : str
+        Path to the trajectory.
+    signature : np.ndarray
+        Current signature of the trajectory, see file_signature.
+    keys : tuple of str
+        Names of the arrays that must all be present.
+    mmap_mode : str, optional
+        'r' to memory-map the arrays instead of reading them, see np.load.
+
+    Returns
+    -------
+    arrays : dict or None
+        The requested arrays, or None if the sidecar is stale or incomplete.
+    """
+    if not _valid(path, signature):
+        return None
+    try:
+        return {
+            key: np.load(os.path.join(sidecar_path(path), f"{key}.npy"), mmap_mode=mmap_mode, allow_pickle=False)
+            for key in keys
+        }
+    except (OSError, ValueError):
+        return None
+
+
+def update_sidecar(path, signature, **arrays):
+    """
+    Add arrays to the sidecar of a trajectory, replacing it if it is stale.
+
+    Only the given arrays are written, the arrays already stored are left
+    alone. Failures to write (e.g., a read-only directory) are silently ignored.
+
+    Parameters
+    ----------
+    path : str
+        Path to the trajectory.
+    signature : np.ndarray
+        Signature of the trajectory the arrays were parsed from.
+    **arrays : np.ndarray
+        Arrays to store.
+    """
+    target = sidecar_path(path)
+    try:
+        if not _valid(path, signature):
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            os.makedirs(target, exist_ok=True)
+            arrays = {**arrays, "signature": signature}
+        for key, array in arrays.items():
+            temporary = os.path.join(target, f"{key}.{os.getpid()}.tmp")
+            try:
+                with open(temporary, "wb") as f:
+                    np.save(f, array, allow_pickle=False)
+                os.replace(temporary, os.path.join(target, f"{key}.npy"))
+            finally:
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+    except OSError:
+        pass
@@ -0,0 +1,273 @@
+"""
+NumPy-backed trajectory container for xyz-style QM trajectories.
+
+Coordinates are held in one contiguous (n_frames, n_atoms, 3) array.
+Element symbols are stored once for the whole trajectory and the comment
+line of each frame, which usually holds the energy, is stored once per frame.
+"""
+
+import numpy as np
+
+from pyqmmm.io.xyz_reader import XYZReader
+from pyqmmm.io.xyz_writer import ATOM_FORMAT, XYZWriter
+
+
+def parse_coordinates(block, natoms, out):
+    """
+    Parse the atom lines of one xyz frame into a preallocated array.
+
+    Parameters
+    ----------
+    block : bytes
+        The atom lines of a single frame.
+    natoms : int
+        Number of atom lines in the block.
+    out : np.ndarray
+        Array of shape (natoms, 3) that receives the coordinates.
+
+    Returns
+    -------
+    elements : list
+        Element symbols in the order of the atom lines.
+    """
+    tokens = block.split()
+    if len(tokens) == 4 * natoms:
+        elements = tokens[::4]
+        del tokens[::4]
+        out[:] = np.array(tokens, dtype=out.dtype).reshape(natoms, 3)
+    else:
+        # Some writers append extra columns (e.g., charges) to each atom line
+        rows = [line.split()[:4] for line in block.splitlines() if line.strip()]
+        if len(rows) != natoms or any(len(row) < 4 for row in rows):
+            raise ValueError("Malformed atom lines in xyz frame.")
+        elements = [row[0] for row in rows]
+        out[:] = np.array([row[1:] for row in rows], dtype=out.dtype)
+    return [element.decode() for element in elements]
+
+
+def parse_frame(frame, natoms, out):
+    """
+    Parse one complete xyz frame, including its atom-count and title lines.
+
+    Parameters
+    ----------
+    frame : bytes
+        The raw bytes of a single frame.
+    natoms : int
+        Number of atoms in the frame.
+    out : np.ndarray
+        Array of shape (natoms, 3) that receives the coordinates.
+
+    Returns
+    -------
+    title : str
+        The comment line of the frame.
+    elements : list
+        Element symbols in the order of the atom lines.
+    """
+    title_start = frame.index(b"\n") + 1
+    atom_start = frame.find(b"\n", title_start) + 1
+    title = frame[title_start:atom_start].decode().rstrip("\r\n")
+    return title, parse_coordinates(frame[atom_start:], natoms, out)
+
+
+class Trajectory:
+    """
+    A fixed-topology trajectory stored as a single coordinate array.
+
+    Parameters
+    ----------
+    elements : list of str
+        Element symbol of each atom.
+    coordinates : np.ndarray
+        Coordinates with shape (n_frames, n_atoms, 3).
+    titles : list of str, optional
+        Comment line of each frame, blank if not provided.
+
+    Examples
+    --------
+    >>> traj = Trajectory.from_xyz("scan_optim.xyz")
+    >>> traj[::-1].write_xyz("scan_optim_reversed.xyz")
+    """
+
+    __slots__ = ("elements", "coordinates", "titles")
+
+    def __init__(self, elements, coordinates, titles=None):
+        coordinates = np.ascontiguousarray(coordinates)
+        if coordinates.ndim != 3 or coordinates.shape[2] != 3:
+            raise ValueError(f"Expected coordinates of shape (n_frames, n_atoms, 3), got {coordinates.shape}")
+        if len(elements) != coordinates.shape[1]:
+            raise ValueError(f"Got {len(elements)} elements for {coordinates.shape[1]} atoms")
+        self.elements = np.asarray(elements, dtype=str)
+        self.coordinates = coordinates
+        self.titles = list(titles) if titles is not None else [""] * coordinates.shape[0]
+        if len(self.titles) != coordinates.shape[0]:
+            raise ValueError(f"Got {len(self.titles)} titles for {coordinates.shape[0]} frames")
+
+    @classmethod
+    def from_xyz(cls, path, dtype=np.float64, cache=None):
+        """
+        Read an xyz or allxyz trajectory.
+
+        Parameters
+        ----------
+        path : str
+            Path to the trajectory.
+        dtype : np.dtype
+            Float type of the coordinate array, float32 halves the memory.
+        cache : bool, optional
+            Load the parsed arrays from the binary sidecar if it is up to date,
+            otherwise parse the text and store them. See pyqmmm.io.traj_cache.
+
+        Returns
+        -------
+        Trajectory
+        """
+        with XYZReader(path, cache=cache) as reader:
+            cached = reader.load_cached(("coordinates", "elements", "titles"))
+            if cached and cached["coordinates"].dtype == np.dtype(dtype):
+                return cls(cached["elements"], cached["coordinates"], cached["titles"].tolist())
+            traj = cls.from_reader(reader, range(len(reader)), dtype)
+            reader.store_cached(
+                coordinates=traj.coordinates,
+                elements=traj.elements,
+                titles=np.array(traj.titles, dtype=str),
+            )
+        return traj
+
+    @classmethod
+    def from_reader(cls, reader, frames, dtype=np.float64):
+        """
+        Parse the requested frames of an open XYZReader.
+
+        Parameters
+        ----------
+        reader : XYZReader
+            An open, indexed xyz trajectory.
+        frames : iterable of int
+            Zero-based indices of the frames to parse, in output order.
+        dtype : np.dtype
+            Float type of the coordinate array.
+
+        Returns
+        -------
+        Trajectory
+        """
+        frames = list(frames)
+        if not frames:
+            raise ValueError(f"No frames to read from {reader.path}")
+        natoms = reader.natoms[frames]
+        if (natoms != natoms[0]).any():
+            raise ValueError(f"Inconsistent number of atoms across frames in {reader.path}")
+        n_atoms = int(natoms[0])
+
+        coordinates = np.empty((len(frames), n_atoms, 3), dtype=dtype)
+        titles = []
+        elements = None
+        for out, index in enumerate(frames):
+            title, frame_elements = parse_frame(reader.frame_bytes(index), n_atoms, coordinates[out])
+            titles.append(title)
+            if elements is None:
+                elements = frame_elements
+        return cls(elements, coordinates, titles)
+
+    @classmethod
+    def concatenate(cls, trajectories):
+        """
+        Join trajectories with the same atoms into one.
+
+        Parameters
+        ----------
+        trajectories : list of Trajectory
+            Trajectories to join, in order.
+
+        Returns
+        -------
+        Trajectory
+        """
+        first = trajectories[0]
+        for traj in trajectories[1:]:
+            if not np.array_equal(traj.elements, first.elements):
+                raise ValueError("Cannot concatenate trajectories with different atoms.")
+        coordinates = np.concatenate([traj.coordinates for traj in trajectories])
+        titles = [title for traj in trajectories for title in traj.titles]
+        return cls(first.elements, coordinates, titles)
+
+    @property
+    def n_frames(self):
+        return self.coordinates.shape[0]
+
+    @property
+    def n_atoms(self):
+        return self.coordinates.shape[1]
+
+    def __len__(self):
+        return self.n_frames
+
+    def __repr__(self):
+        return f"<Trajectory with {self.n_frames} frames and {self.n_atoms} atoms>"
+
+    def __getitem__(self, frames):
+        """Select frames by index, slice, or list of indices, always returning a Trajectory."""
+        if isinstance(frames, (int, np.integer)):
+            frames = slice(frames, frames + 1 or None)
+        if isinstance(frames, slice):
+            titles = self.titles[frames]
+        else:
+            frames = np.asarray(frames, dtype=np.int64)
+            titles = [self.titles[i] for i in frames]
+        return Trajectory(self.elements, self.coordinates[frames], titles)
+
+    def delete_atoms(self, atom_indices):
+        """
+        Remove atoms from every frame.
+
+        Parameters
+        ----------
+        atom_indices : iterable of int
+            Zero-based indices of the atoms to remove.
+
+        Returns
+        -------
+        Trajectory
+        """
+        keep = np.ones(self.n_atoms, dtype=bool)
+        keep[np.fromiter(atom_indices, dtype=np.int64)] = False
+        return Trajectory(self.elements[keep], self.coordinates[:, keep], self.titles)
+
+    def distances(self, atom_1, atom_2):
+        """
+        Distance between two atoms in every frame.
+
+        Parameters
+        ----------
+        atom_1, atom_2 : int
+            Zero-based atom indices.
+
+        Returns
+        -------
+        np.ndarray
+            Distances with shape (n_frames,).
+        """
+        return np.linalg.norm(self.coordinates[:, atom_1] - self.coordinates[:, atom_2], axis=1)
+
+    def _atom_template(self):
+        """Printf-style template for the atom lines of one frame."""
+        return "".join(ATOM_FORMAT.format(element=element) for element in self.elements)
+
+    def frame_text(self, index):
+        """Render a single frame as xyz text."""
+        template = self._atom_template()
+        return f"{self.n_atoms}\n{self.titles[index]}\n" + template % tuple(self.coordinates[index].ravel())
+
+    def write_xyz(self, path):
+        """
+        Write the trajectory as a stacked xyz file.
+
+        Parameters
+        ----------
+        path : str
+            Path of the output xyz file.
+        """
+        with XYZWriter(path) as writer:
+            writer.write_frames(self.coordinates, self.elements, self.titles)
@@ -1,6 +1,114 @@
+import functools
 import time
 
-def xyz2pdb_traj(xyz_name, pdb_name, pdb_template) -> None:
+import numpy as np
+
+from pyqmmm.io.binary_trajectory import open_writer
+from pyqmmm.io.compression import detect_compression, open_input, open_output
+from pyqmmm.io.sharding import imap_ordered, map_frames, map_stream, worker_count
+from pyqmmm.io.trajectory import parse_frame
+from pyqmmm.io.xyz_reader import XYZReader, XYZStream
+from pyqmmm.profiling import span
+
+FRAMES_PER_CHUNK = 500
+
+
+def build_frame_template(template_lines):
+    """
+    Split the PDB template once into a printf-style template for a whole frame.
+
+    The text before column 31 (prefix) and after column 54 (suffix) of each
+    template record is kept verbatim and the coordinate columns become %8.3f fields.
+
+    Parameters
+    ----------
+    template_lines : list of str
+        One PDB record per atom, in the same order as the xyz atoms.
+
+    Returns
+    -------
+    frame_template : str
+        Template that formats a flattened (n_atoms * 3) coordinate tuple into PDB records.
+    """
+    prefixes = [line[:30].replace("%", "%%") for line in template_lines]
+    suffixes = [line[54:].replace("%", "%%") for line in template_lines]
+    return "".join(f"{prefix}%8.3f%8.3f%8.3f{suffix}" for prefix, suffix in zip(prefixes, suffixes))
+
+
+def format_coordinates(coordinates, first_model, frame_template):
+    """
+    Format an array of frames into PDB MODEL blocks.
+
+    Parameters
+    ----------
+    coordinates : np.ndarray
+        Coordinates with shape (n_frames, n_atoms, 3).
+    first_model : int
+        MODEL number of the first frame.
+    frame_template : str
+        Output of build_frame_template.
+
+    Returns
+    -------
+    str
+        The PDB text of every frame.
+    """
+    blocks = []
+    for model, coords in enumerate(coordinates, start=first_model):
+        blocks.append(f"MODEL     {model}\n")
+        blocks.append(frame_template % tuple(coords.ravel()))
+        blocks.append("TER\nENDMDL\n")
+    return "".join(blocks)
+
+
+def format_frame(n_atoms, frame_template, frame, index):
+    """
+    Convert one xyz frame into a PDB MODEL block.
+
+    Used as a sharded frame transform, see pyqmmm.io.sharding.
+
+    Parameters
+    ----------
+    n_atoms : int
+        Number of atoms in every frame.
+    frame_template : str
+        Output of build_frame_template.
+    frame : bytes
+        Raw text of the xyz frame.
+    index : int
+        Zero-based frame index, MODEL records are numbered from 1.
+
+    Returns
+    -------
+    str
+        The PDB text of the frame.
+    """
+    coordinates = np.empty((1, n_atoms, 3))
+    parse_frame(frame, n_atoms, coordinates[0])
+    return format_coordinates(coordinates, index + 1, frame_template)
+
+
+def cached_coordinates(traj):
+    """
+    Coordinates already parsed by another tool, read from the binary sidecar.
+
+    The array is memory-mapped, so only the frames being written are read.
+    Only float64 arrays are used, since coordinates parsed in lower precision
+    (e.g., Trajectory.from_xyz(dtype=np.float32)) can change the last digit
+    of the written output.
+
+    Returns
+    -------
+    dict or None
+        The cached coordinates, or None to parse the text instead.
+    """
+    cached = traj.load_cached(("coordinates",), mmap_mode="r")
+    if cached and cached["coordinates"].dtype == np.float64:
+        return cached
+    return None
+
+
+def xyz2pdb_traj(xyz_name, pdb_name, pdb_template, n_workers=None) -> None:
     """
     Converts an XYZ trajectory file into a valid PDB trajectory file using a PDB template.
 
@@ -9,14 +117,13 @@ def xyz2pdb_traj(xyz_name, pdb_name, pdb_template) -> None:
     - Uses a template PDB for residue information.
     - Assumes all frames in the XYZ file have the same number of atoms as the PDB template.
     - Adds MODEL and ENDMDL records for PDB trajectory compatibility.
+    - Shards of frames are formatted in a process pool and written in order.
+    - Compressed trajectories are decompressed on the fly, see stream_xyz2pdb.
     """
 
     start_time = time.time()  # Start time for execution speed reporting
 
-    # Read input files
-    with open(xyz_name, "r") as f:
-        xyz_lines = f.readlines()
-    with open(pdb_template, "r") as f:
+    with open_input(pdb_template, "r") as f:
         pdb_lines = f.readlines()
 
     # Get the number of atoms from the PDB template
@@ -26,54 +133,88 @@ def xyz2pdb_traj(xyz_name, pdb_name, pdb_template) -> None:
         print("> Error: Template PDB file does not have expected atom numbering.")
         return
 
-    # Open output PDB file
-    with open(pdb_name, "w") as new_file:
-        line_count = 0  # Track current line in XYZ file
-        frame_count = 0  # Track the number of frames processed
-
-        while line_count < len(xyz_lines):
-            try:
-                num_atoms = int(xyz_lines[line_count].strip())  # Read number of atoms
-            except ValueError:
-                print(f"> Error at line {line_count+1}: Expected number of atoms but got '{xyz_lines[line_count].strip()}'")
-                return
-
-            line_count += 2  # Skip the title/comment line
-            frame_count += 1
-
-            # Write MODEL record
-            new_file.write(f"MODEL     {frame_count}\n")
-
-            # Process atom lines
-            for atom in range(num_atoms):
-                try:
-                    parts = xyz_lines[line_count].strip().split()
-                    if len(parts) < 4:
-                        raise ValueError(f"Incomplete XYZ line: {xyz_lines[line_count].strip()}")
-                    x, y, z = parts[1:4]  # Extract XYZ coordinates
-                except Exception as e:
-                    print(f"> Script died at line {line_count+1} -> '{xyz_lines[line_count].strip()}'")
-                    print(f"> Error: {e}")
-                    return
-
-                # Get corresponding PDB line
-                try:
-                    pdb_line = pdb_lines[atom]
-                except IndexError:
-                    print(f"> Error: Atom index {atom+1} out of range in PDB template.")
-                    return
-
-                # Write new PDB line with updated coordinates
-                new_file.write(
-                    f"{pdb_line[:30]}{float(x):8.3f}{float(y):8.3f}{float(z):8.3f}{pdb_line[54:]}"
-                )
-
-                line_count += 1
-
-            # Write ENDMDL record at the end of the frame
-            new_file.write("TER\n")
-            new_file.write("ENDMDL\n")
+    if detect_compression(xyz_name) is not None:
+        frame_count = stream_xyz2pdb(xyz_name, pdb_name, pdb_lines, n_workers)
+        if frame_count is None:
+            return
+        report(xyz_name, pdb_name, frame_count, start_time)
+        return
+
+    with span("index"):
+        traj = XYZReader(xyz_name)
+    with traj:
+        frame_count = len(traj)
+        if frame_count == 0:
+            print(f"> Error: No frames found in {xyz_name}.")
+            return
+        num_atoms = int(traj.natoms[0])
+        if (traj.natoms != num_atoms).any():
+            print("> Error: All frames in the XYZ file must have the same number of atoms.")
+            return
+        if num_atoms > len(pdb_lines):
+            print(f"> Error: Atom index {len(pdb_lines) + 1} out of range in PDB template.")
+            return
+        cached = cached_coordinates(traj)
+
+        frame_template = build_frame_template(pdb_lines[:num_atoms])
+        try:
+            with span("write"), open_output(pdb_name, "w") as new_file:
+                if cached:
+                    coordinates = cached["coordinates"]
+                    # Chunks are sliced from the map as they are formatted
+                    chunks = (
+                        (np.asarray(coordinates[i:i + FRAMES_PER_CHUNK]), i + 1, frame_template)
+                        for i in range(0, frame_count, FRAMES_PER_CHUNK)
+                    )
+                    n_workers = min(worker_count(n_workers), -(-frame_count // FRAMES_PER_CHUNK))
+                    if n_workers == 1:
+                        new_file.writelines(format_coordinates(*chunk) for chunk in chunks)
+                    else:
+                        new_file.writelines(imap_ordered(format_coordinates, chunks, n_workers))
+                else:
+                    transform = functools.partial(format_frame, num_atoms, frame_template)
+                    frames = map_frames(traj.data_path, traj.starts, traj.ends, transform, n_workers=n_workers)
+                    new_file.writelines(frames)
+        except ValueError as e:
+            print(f"> Error: {e}")
+            return
+
+    report(xyz_name, pdb_name, frame_count, start_time)
+
 
+def stream_xyz2pdb(xyz_name, pdb_name, pdb_lines, n_workers=None):
+    """
+    Convert a compressed XYZ trajectory to PDB in a single pass.
+
+    Frames are decompressed on the fly and formatted in batches by a process
+    pool (see pyqmmm.io.sharding.map_stream), so no decompressed copy of the
+    trajectory is written to disk.
+
+    Returns
+    -------
+    int or None
+        Number of frames written, or None after printing an error.
+    """
+    try:
+        with span("write"), XYZStream(xyz_name, uniform=True) as stream:
+            num_atoms = stream.natoms
+            if num_atoms is None:
+                print(f"> Error: No frames found in {xyz_name}.")
+                return None
+            if num_atoms > len(pdb_lines):
+                print(f"> Error: Atom index {len(pdb_lines) + 1} out of range in PDB template.")
+                return None
+            transform = functools.partial(format_frame, num_atoms, build_frame_template(pdb_lines[:num_atoms]))
+            with open_output(pdb_name, "w") as new_file:
+                new_file.writelines(map_stream(stream, transform, n_workers))
+            return stream.count
+    except ValueError as e:
+        print(f"> Error: {e}")
+        return None
+
+
+def report(xyz_name, pdb_name, frame_count, start_time):
+    """Print the summary of an xyz2pdb_traj conversion."""
     total_time = round(time.time() - start_time, 3)  # Measure execution time
     print(
         f"""
@@ -86,6 +227,112 @@ def xyz2pdb_traj(xyz_name, pdb_name, pdb_template) -> None:
         """
     )
 
+def xyz2binary_traj(xyz_name, traj_name, pdb_template) -> None:
+    """
+    Converts an XYZ trajectory into a binary DCD or AMBER NetCDF trajectory.
+
+    The PDB template is the topology: load it together with the output in VMD
+    or MDAnalysis (e.g., mda.Universe(pdb_template, traj_name)).
+    The format is chosen by the extension of traj_name (.dcd, .nc, or .ncdf).
+    Frames are streamed from the xyz reader in chunks of FRAMES_PER_CHUNK,
+    compressed trajectories are decompressed on the fly, see XYZStream.
+    """
+
+    start_time = time.time()
+
+    with open_input(pdb_template, "r") as f:
+        template_atoms = sum(line.startswith(("ATOM", "HETATM")) for line in f)
+
+    if detect_compression(xyz_name) is not None:
+        frame_count = stream_xyz2binary(xyz_name, traj_name, pdb_template, template_atoms)
+        if frame_count is None:
+            return
+        report_binary(xyz_name, traj_name, pdb_template, frame_count, start_time)
+        return
+
+    with span("index"):
+        traj = XYZReader(xyz_name)
+    with traj:
+        frame_count = len(traj)
+        if frame_count == 0:
+            print(f"> Error: No frames found in {xyz_name}.")
+            return
+        num_atoms = int(traj.natoms[0])
+        if (traj.natoms != num_atoms).any():
+            print("> Error: All frames in the XYZ file must have the same number of atoms.")
+            return
+        if num_atoms != template_atoms:
+            print(f"> Error: {xyz_name} has {num_atoms} atoms but {pdb_template} has {template_atoms}.")
+            return
+        cached = cached_coordinates(traj)
+
+        with span("write"), open_writer(traj_name, num_atoms) as writer:
+            if cached:
+                for first in range(0, frame_count, FRAMES_PER_CHUNK):
+                    writer.write(np.asarray(cached["coordinates"][first:first + FRAMES_PER_CHUNK]))
+            else:
+                coordinates = np.empty((FRAMES_PER_CHUNK, num_atoms, 3))
+                for first in range(0, frame_count, FRAMES_PER_CHUNK):
+                    chunk = range(first, min(first + FRAMES_PER_CHUNK, frame_count))
+                    for out, index in enumerate(chunk):
+                        parse_frame(traj.frame_bytes(index), num_atoms, coordinates[out])
+                    writer.write(coordinates[:len(chunk)])
+
+    report_binary(xyz_name, traj_name, pdb_template, frame_count, start_time)
+
+
+def stream_xyz2binary(xyz_name, traj_name, pdb_template, template_atoms):
+    """
+    Convert a compressed XYZ trajectory to DCD or NetCDF in a single pass.
+
+    Frames are decompressed on the fly and parsed into chunks of
+    FRAMES_PER_CHUNK, so no decompressed copy is written to disk.
+
+    Returns
+    -------
+    int or None
+        Number of frames written, or None after printing an error.
+    """
+    try:
+        with XYZStream(xyz_name, uniform=True) as stream:
+            num_atoms = stream.natoms
+            if num_atoms is None:
+                print(f"> Error: No frames found in {xyz_name}.")
+                return None
+            if num_atoms != template_atoms:
+                print(f"> Error: {xyz_name} has {num_atoms} atoms but {pdb_template} has {template_atoms}.")
+                return None
+            with span("write"), open_writer(traj_name, num_atoms) as writer:
+                coordinates = np.empty((FRAMES_PER_CHUNK, num_atoms, 3))
+                filled = 0
+                for _, frame in stream:
+                    parse_frame(frame, num_atoms, coordinates[filled])
+                    filled += 1
+                    if filled == FRAMES_PER_CHUNK:
+                        writer.write(coordinates)
+                        filled = 0
+                if filled:
+                    writer.write(coordinates[:filled])
+            return stream.count
+    except ValueError as e:
+        print(f"> Error: {e}")
+        return None
+
+
+def report_binary(xyz_name, traj_name, pdb_template, frame_count, start_time):
+    """Print the summary of an xyz2binary_traj conversion."""
+    total_time = round(time.time() - start_time, 3)
+    print(
+        f"""
+        \t----------------------------ALL RUNS END----------------------------
+        \tRESULT: Converted {xyz_name} to {traj_name}.
+        \tTOPOLOGY: Load {traj_name} with {pdb_template}.
+        \tFRAMES PROCESSED: {frame_count}
+        \tTIME: Total execution time: {total_time} seconds.
+        \t--------------------------------------------------------------------\n
+        """
+    )
+
 if __name__ == "__main__":
     # Run the conversion
     xyz_traj = input("What is the name or your xyz trajectory without the extension? ") + ".xyz"
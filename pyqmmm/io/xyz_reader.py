@@ -0,0 +1,483 @@
+"""
+Indexed, memory-mapped reader for XYZ and ORCA allxyz trajectories.
+
+The file is memory-mapped and scanned once to build a byte-offset index of
+every frame. Individual frames, the last frame, or lazy views of slices
+and reversed or picked frames can then be read without loading the rest
+of the trajectory into memory.
+
+Trajectories that are still being written by TeraChem or ORCA can be read
+with allow_truncated=True, which ignores a half-written final frame, or
+followed with follow=True, where refresh() indexes only the newly appended
+frames.
+
+Tools that read every frame once, in order, use XYZStream instead, which
+decompresses compressed trajectories on the fly without a scratch copy.
+"""
+
+import mmap
+import os
+import time
+from typing import List, NamedTuple
+
+import numpy as np
+
+from pyqmmm.io import traj_cache
+from pyqmmm.io.compression import decompress_to_scratch, open_input
+from pyqmmm.io.frame_selection import FrameView
+
+_NEWLINE = ord("\n")
+_SEPARATORS = (b"", b">")
+
+
+class XYZFrame(NamedTuple):
+    """A single frame of an xyz trajectory as text."""
+
+    natoms: int
+    title: str
+    atoms: List[str]
+
+
+def _skip_lines(buf, pos, count, hint):
+    """
+    Find the offset just past the `count`-th line starting at `pos`.
+
+    Parameters
+    ----------
+    buf : np.ndarray
+        Zero-copy uint8 view of the memory-mapped file.
+    pos : int
+        Byte offset of the start of a line.
+    count : int
+        Number of lines to skip.
+    hint : int
+        Expected number of bytes to scan, usually the length of the previous frame.
+
+    Returns
+    -------
+    end : int or None
+        Offset of the first byte after the skipped lines,
+        or None if the file ends before `count` lines were found.
+    """
+    size = buf.size
+    window = max(hint, 4096)
+    while count:
+        stop = min(pos + window, size)
+        newlines = np.flatnonzero(buf[pos:stop] == _NEWLINE)
+        if newlines.size >= count:
+            return pos + int(newlines[count - 1]) + 1
+        count -= newlines.size
+        if stop == size:
+            # A final line without a trailing newline still counts as a line
+            if count == 1 and buf[size - 1] != _NEWLINE:
+                return size
+            return None
+        pos = stop
+        window *= 2
+    return pos
+
+
+def _complete_atom_line(line):
+    """Whether an atom line without a trailing newline holds an element and three coordinates."""
+    fields = line.split()
+    try:
+        return len(fields) >= 4 and all(np.isfinite([float(x) for x in fields[1:4]]))
+    except ValueError:
+        return False
+
+
+class XYZReader:
+    """
+    Random-access reader for xyz trajectories.
+
+    Handles plain stacked xyz files as well as ORCA allxyz files,
+    where frames are separated by '>' lines and optional blank lines.
+
+    Parameters
+    ----------
+    path : str
+        Path to the xyz or allxyz trajectory.
+    cache : bool, optional
+        Load and store the frame index and titles in a binary sidecar,
+        see pyqmmm.io.traj_cache. Defaults to the PYQMMM_TRAJ_CACHE setting.
+    allow_truncated : bool
+        Ignore an incomplete final frame instead of raising a ValueError.
+        A final frame is incomplete if it has fewer lines than its atom count
+        or its last atom line cannot be parsed.
+    follow : bool
+        Follow a trajectory that is still growing, see refresh() and follow().
+        Implies allow_truncated and disables the sidecar cache. A final line
+        without a trailing newline may still be written and is not indexed.
+
+    Attributes
+    ----------
+    starts : np.ndarray
+        Byte offset of the atom-count line of each frame.
+    ends : np.ndarray
+        Byte offset just past the last atom line of each frame.
+    natoms : np.ndarray
+        Number of atoms in each frame.
+    data_path : str
+        Path of the uncompressed bytes that the offsets refer to, a temporary
+        copy for gzip, xz, bzip2, or zstd compressed trajectories.
+    signature : np.ndarray or None
+        Fingerprint of the file used to validate the sidecar, None if caching is off.
+
+    Examples
+    --------
+    >>> with XYZReader("scan_optim.xyz") as traj:
+    ...     last = traj[-1]
+    ...     every_tenth = traj[::10]  # FrameView, nothing is read yet
+    ...     reversed(traj).write("scan_optim_reversed.xyz")
+    >>> with XYZReader("optim.xyz", follow=True) as traj:
+    ...     for new_frames in traj.follow(interval=10):
+    ...         print([frame.title for frame in new_frames])
+    """
+
+    def __init__(self, path, cache=None, allow_truncated=False, follow=False):
+        self.path = os.fspath(path)
+        self._file, self._mm = None, b""
+        # Compressed files are streamed once into a scratch copy that can be memory-mapped
+        self._scratch = decompress_to_scratch(self.path)
+        try:
+            self.data_path = self._scratch.name if self._scratch is not None else self.path
+            self._file = open(self.data_path, "rb")
+            size = os.fstat(self._file.fileno()).st_size
+            # Empty files cannot be memory-mapped
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            self.allow_truncated = allow_truncated or follow
+            self.following = follow
+            if follow and self._scratch is not None:
+                raise ValueError(f"Cannot follow the compressed trajectory {self.path}")
+            # A growing file never matches its sidecar, so following skips the cache
+            if not follow and traj_cache.cache_enabled(cache):
+                self.signature = traj_cache.file_signature(self.path)
+            else:
+                self.signature = None
+            cached = self.load_cached(("starts", "ends", "natoms"))
+            if cached:
+                self.starts, self.ends, self.natoms = cached["starts"], cached["ends"], cached["natoms"]
+                self._scanned = int(self.ends[-1]) if len(self.ends) else 0
+            else:
+                self._build_index()
+                # An index that stopped at a truncated frame would hide the truncation from strict readers
+                if self._scanned >= size:
+                    self.store_cached(starts=self.starts, ends=self.ends, natoms=self.natoms)
+        except BaseException:
+            # Remove the scratch copy of a compressed file that failed to index
+            self.close()
+            raise
+
+    def load_cached(self, keys, mmap_mode=None):
+        """Arrays from the sidecar of this trajectory, or None if caching is off or they are missing."""
+        if self.signature is None:
+            return None
+        return traj_cache.load_sidecar(self.path, self.signature, keys, mmap_mode)
+
+    def store_cached(self, **arrays):
+        """Store arrays parsed from this trajectory in its sidecar, if caching is on."""
+        if self.signature is not None:
+            traj_cache.update_sidecar(self.path, self.signature, **arrays)
+
+    def _build_index(self):
+        """Scan the file once and record the byte range of every frame."""
+        self.starts, self.ends, self.natoms = self._scan(0)
+
+    def _scan(self, pos):
+        """
+        Index the complete frames from byte `pos` to the end of the file.
+
+        Returns
+        -------
+        starts, ends, natoms : np.ndarray
+            Index arrays of the frames found. The offset just past the last
+            complete frame is kept in self._scanned for refresh().
+        """
+        mm = self._mm
+        buf = np.frombuffer(mm, dtype=np.uint8)
+        size = buf.size
+        try:
+            starts, ends, natoms = [], [], []
+            hint = 0
+            while pos < size:
+                eol = mm.find(b"\n", pos)
+                line_end = size if eol == -1 else eol
+                header = mm[pos:line_end].strip()
+                if self.following and eol == -1:
+                    break  # Partially written atom-count or separator line
+                if header in _SEPARATORS:
+                    pos = line_end + 1
+                    continue
+                try:
+                    count = int(header)
+                except ValueError:
+                    raise ValueError(
+                        f"Expected integer atom count at byte {pos} in {self.path}, got {header[:40]!r}"
+                    )
+                end = _skip_lines(buf, pos, count + 2, hint or (count + 2) * 64)
+                if self.allow_truncated and (end is None or not self._complete_line(end)):
+                    break  # The writer has not finished this frame yet
+                if end is None:
+                    raise ValueError(f"Unexpected EOF while reading frame {len(starts) + 1} of {self.path}")
+                starts.append(pos)
+                ends.append(end)
+                natoms.append(count)
+                hint = end - pos + 256
+                pos = end
+        finally:
+            # An open view of the map would keep close() from releasing it after an error
+            del buf
+
+        self._scanned = min(pos, size)
+        return (
+            np.array(starts, dtype=np.int64),
+            np.array(ends, dtype=np.int64),
+            np.array(natoms, dtype=np.int64),
+        )
+
+    def _complete_line(self, end):
+        """Whether the last line of a frame ending at `end` is fully written."""
+        if self._mm[end - 1] == _NEWLINE:
+            return True
+        if self.following:
+            return False
+        return _complete_atom_line(self._mm[self._mm.rfind(b"\n", 0, end) + 1:end])
+
+    def refresh(self):
+        """
+        Index the frames appended to the file since the last scan.
+
+        Only the bytes after the last complete frame are read,
+        so polling a long optimization stays cheap.
+
+        Returns
+        -------
+        new_frames : FrameView
+            Lazy view of the frames that were added.
+        """
+        first = len(self)
+        size = os.fstat(self._file.fileno()).st_size
+        if size > len(self._mm):
+            # The map has the size of the file when it was created, so map the grown file again
+            if isinstance(self._mm, mmap.mmap):
+                self._mm.close()
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            starts, ends, natoms = self._scan(self._scanned)
+            self.starts = np.concatenate((self.starts, starts))
+            self.ends = np.concatenate((self.ends, ends))
+            self.natoms = np.concatenate((self.natoms, natoms))
+        return FrameView(self, np.arange(first, len(self)))
+
+    def follow(self, interval=5.0, timeout=None):
+        """
+        Yield the new frames of a growing trajectory as they are written.
+
+        Parameters
+        ----------
+        interval : float
+            Seconds between checks of the file size.
+        timeout : float, optional
+            Stop after this many seconds without new frames, never by default.
+
+        Yields
+        ------
+        new_frames : FrameView
+            The frames present on the first call, then each batch of appended frames.
+        """
+        if len(self):
+            yield FrameView(self, np.arange(len(self)))
+        idle = 0.0
+        while timeout is None or idle < timeout:
+            time.sleep(interval)
+            new_frames = self.refresh()
+            if len(new_frames):
+                idle = 0.0
+                yield new_frames
+            else:
+                idle += interval
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the memory map and the underlying file handle."""
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        if self._file is not None:
+            self._file.close()
+        if self._scratch is not None:
+            self._scratch.close()
+
+    def _check_index(self, index):
+        n_frames = len(self)
+        if index < 0:
+            index += n_frames
+        if not 0 <= index < n_frames:
+            raise IndexError(f"Frame {index} out of range for {self.path} with {n_frames} frames")
+        return index
+
+    def frame_bytes(self, index):
+        """
+        Raw bytes of a frame, including the atom-count and title lines.
+
+        Parameters
+        ----------
+        index : int
+            Zero-based frame index, negative values count from the end.
+
+        Returns
+        -------
+        bytes
+        """
+        index = self._check_index(index)
+        return self._mm[self.starts[index]:self.ends[index]]
+
+    def frame_text(self, index):
+        """Decoded text of a frame, see `frame_bytes`."""
+        return self.frame_bytes(index).decode()
+
+    def title(self, index):
+        """Title/comment line of a frame, which usually holds the energy."""
+        index = self._check_index(index)
+        start = self._mm.find(b"\n", self.starts[index], self.ends[index]) + 1
+        stop = self._mm.find(b"\n", start, self.ends[index])
+        if stop == -1:
+            stop = self.ends[index]
+        return self._mm[start:stop].decode().rstrip("\r")
+
+    def titles(self):
+        """Title lines of every frame without reading any atom lines."""
+        cached = self.load_cached(("titles",))
+        if cached:
+            return cached["titles"].tolist()
+        titles = [self.title(index) for index in range(len(self))]
+        self.store_cached(titles=np.array(titles, dtype=str))
+        return titles
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FrameView(self, np.arange(len(self))[index])
+        lines = self.frame_text(index).split("\n")
+        natoms = int(lines[0])
+        atoms = [line.rstrip("\r") for line in lines[2:2 + natoms]]
+        return XYZFrame(natoms, lines[1].rstrip("\r"), atoms)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __reversed__(self):
+        return FrameView(self, np.arange(len(self))[::-1])
+
+    def take(self, frames):
+        """Lazy view of the given zero-based frames, in the given order."""
+        return FrameView(self, np.arange(len(self))[np.asarray(frames, dtype=np.int64)])
+
+    def last(self):
+        """The final frame of the trajectory."""
+        return self[-1]
+
+
+class XYZStream:
+    """
+    Single pass over the frames of a plain or compressed xyz trajectory.
+
+    Frames are read in order straight from the decompressing stream (see
+    pyqmmm.io.compression.open_input), so a compressed trajectory is never
+    written to disk. Use XYZReader for random access.
+
+    Parameters
+    ----------
+    path : str
+        Path to the xyz or allxyz trajectory.
+    allow_truncated : bool
+        Stop at an incomplete final frame instead of raising a ValueError,
+        with the same rules as XYZReader.
+    uniform : bool
+        Raise a ValueError if a frame has a different number of atoms than the first.
+
+    Attributes
+    ----------
+    natoms : int or None
+        Number of atoms of the first frame, None for an empty trajectory.
+    count : int
+        Number of frames read so far, the total once the stream is exhausted.
+
+    Examples
+    --------
+    >>> with XYZStream("scan_optim.xyz.gz") as stream:
+    ...     titles = [frame.split(b"\\n", 2)[1] for index, frame in stream]
+    """
+
+    def __init__(self, path, allow_truncated=False, uniform=False):
+        self.path = os.fspath(path)
+        self.allow_truncated = allow_truncated
+        self.uniform = uniform
+        self.count = 0
+        self.natoms = None
+        self._file = open_input(self.path, "rb")
+        try:
+            # The first frame is read ahead for its atom count
+            self._next = self._read_frame()
+        except BaseException:
+            self._file.close()
+            raise
+        self.natoms = None if self._next is None else int(self._next[:self._next.index(b"\n")])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the underlying stream."""
+        self._file.close()
+
+    def _read_frame(self):
+        """Raw bytes of the next frame, or None at the end of the trajectory."""
+        f = self._file
+        header = f.readline()
+        while header and header.strip() in _SEPARATORS:
+            header = f.readline()
+        if not header:
+            return None
+        try:
+            count = int(header)
+        except ValueError:
+            raise ValueError(f"Expected integer atom count in frame {self.count + 1} of {self.path}, "
+                             f"got {header.strip()[:40]!r}")
+        if self.uniform and self.natoms is not None and count != self.natoms:
+            raise ValueError("All frames in the XYZ file must have the same number of atoms.")
+        lines = [header]
+        for _ in range(count + 1):
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line)
+        complete = len(lines) == count + 2 and (
+            lines[-1].endswith(b"\n") or count == 0 or _complete_atom_line(lines[-1])
+        )
+        if not complete:
+            if self.allow_truncated:
+                return None
+            raise ValueError(f"Unexpected EOF while reading frame {self.count + 1} of {self.path}")
+        return b"".join(lines)
+
+    def __iter__(self):
+        """Yield (index, frame) pairs with the raw bytes of every frame."""
+        while self._next is not None:
+            frame, index = self._next, self.count
+            self.count += 1
+            yield index, frame
+            self._next = self._read_frame()
+
+    def titles(self):
+        """Title lines of the remaining frames."""
+        return [frame.split(b"\n", 2)[1].decode().rstrip("\r") for _, frame in self]
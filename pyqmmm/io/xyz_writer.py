@@ -0,0 +1,149 @@
+"""
+Buffered writer for xyz and ORCA allxyz trajectories.
+
+Frames are formatted into a single reusable bytearray and flushed in large
+chunks. Blocks of frames from a coordinate array are formatted with one
+C-level printf call. The same buffer can be written both as a plain stacked
+xyz file and as a '>'-separated allxyz file, so writing both outputs never
+holds a second copy of the frames.
+"""
+
+import numpy as np
+
+from pyqmmm.io.compression import open_output
+
+FLUSH_BYTES = 1 << 22  # Buffered bytes before the outputs are written
+BLOCK_BYTES = 1 << 20  # Approximate text size of a block of frames formatted at once
+ATOM_FORMAT = "{element:<2s} %15.10f %15.10f %15.10f\n"
+
+
+class XYZWriter:
+    """
+    Write frames to an xyz trajectory, an allxyz trajectory, or both.
+
+    Parameters
+    ----------
+    xyz_path : str, optional
+        Path of the stacked xyz output.
+    allxyz_path : str, optional
+        Path of the ORCA allxyz output, with a '>' line between frames.
+    flush_bytes : int
+        Size of the buffer before it is written out.
+
+    Outputs ending in .gz, .xz, .bz2, or .zst are compressed,
+    see pyqmmm.io.compression.
+
+    Examples
+    --------
+    >>> with XYZWriter("path.xyz", "path.allxyz") as writer:
+    ...     writer.write_frames(coordinates, elements, titles)
+    ...     writer.write_raw("1\\nextra frame\\nH 0.0 0.0 0.0\\n")
+    """
+
+    def __init__(self, xyz_path=None, allxyz_path=None, flush_bytes=FLUSH_BYTES):
+        self._xyz = open_output(xyz_path) if xyz_path is not None else None
+        self._allxyz = open_output(allxyz_path) if allxyz_path is not None else None
+        self.flush_bytes = flush_bytes
+        self.frame_count = 0
+        self._buffer = bytearray()
+        self._frame_starts = []  # Offsets of the frames in the buffer, for the allxyz separators
+        self._atom_templates = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Flush the buffer and close the outputs."""
+        self.flush()
+        for f in (self._xyz, self._allxyz):
+            if f is not None:
+                f.close()
+
+    def flush(self):
+        """Write the buffered frames to every output and empty the buffer."""
+        if not self._buffer:
+            return
+        if self._xyz is not None:
+            self._xyz.write(self._buffer)
+        if self._allxyz is not None:
+            # Slices of a memoryview write the shared frames without copying them
+            view = memoryview(self._buffer)
+            bounds = self._frame_starts + [len(self._buffer)]
+            first_frame = self.frame_count - len(bounds) + 1
+            for number, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]), start=first_frame):
+                if number:
+                    self._allxyz.write(b">\n")
+                self._allxyz.write(view[start:stop])
+            view.release()
+        self._buffer.clear()
+        self._frame_starts.clear()
+
+    def _append(self, frame):
+        if self._allxyz is not None:
+            self._frame_starts.append(len(self._buffer))
+        self._buffer += frame
+        self.frame_count += 1
+
+    def write_raw(self, frame):
+        """
+        Append a frame that is already formatted.
+
+        Parameters
+        ----------
+        frame : str or bytes
+            Text of one frame starting at its atom-count line.
+        """
+        if isinstance(frame, str):
+            frame = frame.encode()
+        if not frame.endswith(b"\n"):
+            frame += b"\n"
+        self._append(frame)
+        if len(self._buffer) >= self.flush_bytes:
+            self.flush()
+
+    def _atom_template(self, elements):
+        key = tuple(elements)
+        template = self._atom_templates.get(key)
+        if template is None:
+            template = "".join(ATOM_FORMAT.format(element=element) for element in elements)
+            self._atom_templates[key] = template
+        return template
+
+    def write_frames(self, coordinates, elements, titles):
+        """
+        Format and append frames from a coordinate array.
+
+        Parameters
+        ----------
+        coordinates : np.ndarray
+            Coordinates with shape (n_frames, n_atoms, 3).
+        elements : list of str
+            Element symbol of each atom.
+        titles : list of str
+            Title line of each frame.
+        """
+        coordinates = np.asarray(coordinates, dtype=np.float64)
+        n_frames, n_atoms = coordinates.shape[:2]
+        atom_template = self._atom_template(elements)
+        frames_per_block = max(1, BLOCK_BYTES // max(len(atom_template) * 2, 1))
+
+        for first in range(0, n_frames, frames_per_block):
+            block = coordinates[first:first + frames_per_block]
+            # One template covers the whole block, so it is formatted in a single call
+            headers = [f"{n_atoms}\n{title}\n".replace("%", "%%") for title in titles[first:first + len(block)]]
+            data = ("".join(header + atom_template for header in headers) % tuple(block.ravel())).encode()
+            if self._allxyz is not None:
+                self._frame_starts.extend((len(self._buffer) + _frame_offsets(data, n_atoms)).tolist())
+            self._buffer += data
+            self.frame_count += len(block)
+            if len(self._buffer) >= self.flush_bytes:
+                self.flush()
+
+
+def _frame_offsets(data, n_atoms):
+    """Start offsets of the frames in formatted text with n_atoms + 2 lines per frame."""
+    line_starts = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n")) + 1
+    return np.concatenate(([0], line_starts[n_atoms + 1:-1:n_atoms + 2]))
@@ -0,0 +1,124 @@
+"""
+Command-line tools of the pyqmmm md group, see pyqmmm.registry.
+"""
+
+from pyqmmm.registry import Tool, tool_group
+
+
+def gbsa_submit():
+    import pyqmmm.md.amber_toolkit
+    protein_id = input("What is the id of your protein (e.g., taud, mc6)? ")
+    ligand_id = input("What is the id of your ligand (e.g., hm1, tau)? ")
+    ligand_index = input("What is the index of your ligand minus 1 if after the stripped metal? ")
+    start = 100000
+    stride = 50
+    cpus = 8
+    pyqmmm.md.amber_toolkit.gbsa_script(protein_id, ligand_id, ligand_index, start, stride, cpus)
+
+
+def compute_hbond():
+    import pyqmmm.md.hbond_analyzer
+    import pyqmmm.md.amber_toolkit
+    protein_id = input("What is the name of your protein (e.g., DAH)? ")
+    substrate_index = input("What is the index of your substrate (e.g., 355)? ")
+    residue_range = input("What is the range of residues in your protein (e.g., 1-351)? ")
+    hbonds_script = pyqmmm.md.amber_toolkit.calculate_hbonds_script(protein_id, substrate_index, residue_range)
+    submit_script = pyqmmm.md.amber_toolkit.submit_script(protein_id, "hbonds.in")
+    pyqmmm.md.hbond_analyzer.compute_hbonds(hbonds_script, submit_script, "hbonds.in")
+
+
+def hbond_analysis():
+    import pyqmmm.md.hbond_analyzer
+    # Include more than one path in the list to perform multiple analyses
+    file_paths = ["./"]
+    names = ["unrestrained"]
+    substrate = input("   What is the resid of your substrate? (e.g., DCA) ")
+    pyqmmm.md.hbond_analyzer.analyze_hbonds(file_paths, names, substrate)
+
+
+def last_frame():
+    import pyqmmm.md.amber_toolkit
+    prmtop = input("What is the path of your prmtop file? ")
+    mdcrd = input("What is the path of your trajectory file? ")
+    pyqmmm.md.amber_toolkit.get_last_frame(prmtop, mdcrd, "final_frame.pdb")
+
+
+def colored_rmsd():
+    import pyqmmm.md.rmsd_clusters_colorcoder
+    yaxis_title = "RMSD (Å)"
+    cluster_count = int(input("How many cluster would you like plotted? "))
+    layout = input("Enter layout (e.g., 'square', '5,4', or press enter for default): ").strip() or "wide"
+    legend_input = input("Show legend? (y/n): ").strip().lower()
+    show_legend = legend_input != 'n'
+    pyqmmm.md.rmsd_clusters_colorcoder.rmsd_clusters_colorcoder(yaxis_title, cluster_count, layout, show_legend)
+
+
+def strip_all():
+    import pyqmmm.md.amber_toolkit
+    protein_id = input("What is the id of your protein (e.g., taud, mc6)? ")
+    cpus = 8
+    pyqmmm.md.amber_toolkit.strip_all_script(protein_id)
+    pyqmmm.md.amber_toolkit.submit_script(protein_id, "strip.in", cpus)
+
+
+def cc_coupling():
+    import pyqmmm.md.cc_coupling
+    pyqmmm.md.cc_coupling.heatmap(
+        data="cacovar.dat",
+        delete=[],
+        out_file="matrix_geom",
+    )
+
+
+def transcode():
+    import pyqmmm.io.mdcrd
+    prmtop = input("What is the path of your prmtop file? ")
+    trajectories = input("What trajectories would you like transcoded (e.g., rep1/constP_prod.mdcrd,rep2/...)? ")
+    for trajectory in trajectories.split(","):
+        path, fmt = pyqmmm.io.mdcrd.fast_trajectory(trajectory.strip(), prmtop)
+        print(f"   > {trajectory.strip()} is read from {path} ({fmt})")
+
+
+def compare_distances():
+    import pyqmmm.md.compare_distances
+    files = input("What distance files would you like to plot? ").split(",")
+    pyqmmm.md.compare_distances.get_plot(files)
+
+
+def plot_rmsd():
+    import pyqmmm.md.rmsd_plotter
+    yaxis_title = "RMSD (Å)"
+    layout = "wide"
+    pyqmmm.md.rmsd_plotter.rmsd_plotter(yaxis_title, layout)
+
+
+TOOLS = (
+    Tool("gbsa_submit", "-gs", "Prepares and submits a mmGBSA job.", gbsa_submit, "Submit a mmGBSA job:"),
+    Tool("gbsa_analysis", "-ga", "Extract results from GBSA analysis.", "pyqmmm.md.gbsa_analyzer:analyze",
+         "Analyze a GBSA calculation output:"),
+    Tool("compute_hbond", "-hc", "Calculates hbonds with cpptraj.", compute_hbond,
+         "Compute all hbonds between the protein and the substrate using CPPTraj:"),
+    Tool("hbond_analysis", "-ha", "Extract Hbonding patterns from MD.", hbond_analysis,
+         "Extract and plot hbonding patterns from an MD simulation:"),
+    Tool("last_frame", "-lf", "Get last frame from an AMBER trajectory.", last_frame,
+         "Extracting the last frame from a MD simulation:"),
+    Tool("residue_list", "-lr", "Get a list of all residues in a PDB.", "pyqmmm.md.residue_lister:list_residues",
+         "Extract the residues from a PDB:"),
+    Tool("colored_rmsd", "-cr", "Color RMSD by clusters.", colored_rmsd, "Color a MD trajectory by clusters:"),
+    Tool("restraint_plot", "-rp", "Restraint plot KDE's on one plot.", "pyqmmm.md.restraint_plotter:restraint_plots",
+         "Generate single KDE plot with hyscore measurements:"),
+    Tool("strip_all", "-sa", "Strip waters and metals.", strip_all,
+         "Strip waters and metals and create new traj and prmtop file:"),
+    Tool("dssp_plot", "-dp", "Generate a DSSP plot.", "pyqmmm.md.dssp_plotter:combine_dssp_files",
+         "Create a DSSP plot from CPPTraj data:"),
+    Tool("rmsf", "-rmsf", "Calculates the RMSF.", "pyqmmm.md.rmsf_calculator:main"),
+    Tool("plot_rmsf", "-prmsf", "Plots RMSF.", "pyqmmm.md.rmsf_plotter:main"),
+    Tool("cc_coupling", "-cc", "Plots the results from cc coupling analysis.", cc_coupling),
+    Tool("compare_distances", "-cd", "Plots distance metrics together.", compare_distances),
+    Tool("plot_rmsd", "-rmsd", "Plots the RMSD from CPPTraj.", plot_rmsd),
+    Tool("transcode", "-nc", "Transcode AMBER mdcrd trajectories to NetCDF.", transcode,
+         "Create binary copies of ASCII trajectories for fast analysis:"),
+    Tool("cluster_frames", "-cf", "Gets frames for largest CPPTraj cluster.", "pyqmmm.md.cluster_frame_indexer:main"),
+)
+
+command = tool_group("md", "Functions for molecular dynamics (MD) simulations.", TOOLS)
@@ -0,0 +1,127 @@
+"""
+Frame-block parallel reductions over MD trajectories.
+
+A per-frame reduction (a mean, a variance, a histogram, ...) is computed
+over contiguous blocks of frames in separate worker processes, and the
+partial results of the blocks are merged into the result for the whole
+trajectory. Splitting every trajectory into blocks keeps all workers busy
+whether there is one long trajectory or many replicas.
+
+The block function is called as function(*args, block, n_blocks) in a
+worker and resolves its own frames with block_bounds(), so the parent
+never has to open or count the frames of a trajectory. It must be a
+module-level function so it can be sent to the workers, and its partial
+results must be merged by the merge function, RunningMoments.merge by
+default.
+"""
+
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pyqmmm.io.sharding import worker_count
+
+
+class RunningMoments:
+    """
+    Count, mean, and sum of squared deviations (M2) of a stream of arrays.
+
+    Frames are added with Welford's update and partial moments of
+    different blocks are combined with the parallel formula of Chan et al.,
+    both numerically stable in float64.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        Shape of the arrays, e.g., (n_atoms, 3).
+    """
+
+    def __init__(self, shape):
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+
+    def add(self, values):
+        """Add one frame of values."""
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+
+    def merge(self, other):
+        """Combine with the moments of another block, in place, and return self."""
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / count)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * (self.count * other.count / count)
+        self.count = count
+        return self
+
+    @property
+    def variance(self):
+        """Population variance of every element."""
+        return self.m2 / self.count
+
+
+def block_bounds(n_frames, block, n_blocks):
+    """
+    First and stop frame of one of n_blocks contiguous blocks of near-equal size.
+
+    Parameters
+    ----------
+    n_frames : int
+        Number of frames in the trajectory.
+    block : int
+        Zero-based index of the block.
+    n_blocks : int
+        Number of blocks.
+
+    Returns
+    -------
+    tuple of int
+    """
+    return n_frames * block // n_blocks, n_frames * (block + 1) // n_blocks
+
+
+def _merge(left, right):
+    return left.merge(right)
+
+
+def reduce_blocks(function, tasks, n_blocks=None, merge=_merge, n_workers=None):
+    """
+    Run a block reduction over every task and merge the blocks of each task.
+
+    Parameters
+    ----------
+    function : callable
+        Called as function(*args, block, n_blocks) in a worker process.
+    tasks : list of tuple
+        Arguments of each trajectory, e.g., (topology, trajectory).
+    n_blocks : int, optional
+        Blocks per task. Defaults to enough blocks to give every worker work.
+    merge : callable
+        Combines the partial results of two blocks.
+    n_workers : int, optional
+        Number of worker processes, see pyqmmm.io.sharding.worker_count.
+
+    Returns
+    -------
+    results : list
+        The merged result of each task, in the order of tasks.
+    """
+    n_workers = worker_count(n_workers)
+    if n_blocks is None:
+        n_blocks = max(1, -(-n_workers // max(1, len(tasks))))
+    calls = [(*args, block, n_blocks) for args in tasks for block in range(n_blocks)]
+    if n_workers == 1 or len(calls) == 1:
+        partials = [function(*call) for call in calls]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_workers, len(calls))) as executor:
+            partials = list(executor.map(function, *zip(*calls)))
+    return [
+        functools.reduce(merge, partials[task * n_blocks:(task + 1) * n_blocks])
+        for task in range(len(tasks))
+    ]
@@ -4,6 +4,7 @@ import glob
 import pandas as pd
 import matplotlib.pyplot as plt
 from pandas.api.types import CategoricalDtype
+from pyqmmm.io.compression import EXTENSIONS, open_input
 
 
 def format_plot() -> None:
@@ -71,7 +72,7 @@ def get_gbsa_df(raw, ignore_residues) -> pd.DataFrame:
     csv_file_name = "deltas.csv"
 
     delta_section = False
-    with open(raw, "r") as raw_data, open(csv_file_name, "w") as csv_file:
+    with open_input(raw, "r") as raw_data, open(csv_file_name, "w") as csv_file:
         for line in raw_data:
             if delta_section:
                 if "T,o,t,a,l" in line or "Std" in line or "Resid" in line:
@@ -285,7 +286,8 @@ def analyze() -> None:
     file_extension = "*24.dat"
 
     # Collect the GBSA data located in the current directory
-    raw_files = glob.glob(file_extension)
+    # Archived outputs may be compressed, e.g., FINAL_RESULTS_MMPBSA_24.dat.gz
+    raw_files = [f for suffix in ("", *EXTENSIONS) for f in glob.glob(file_extension + suffix)]
     raw_files = sorted(raw_files)
 
     if len(raw_files) == 0:
@@ -1,5 +1,6 @@
 """Analyze data from hydrogen bonding analysis based on hbond.gnu file."""
 
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
@@ -7,6 +8,9 @@ import subprocess
 import sys
 import os
 import textwrap
+from pyqmmm.io.compression import open_input, resolve_path
+from pyqmmm.io.result_cache import cached
+from pyqmmm.md import hbond_series
 
 
 def compute_hbonds(cpptraj_script, submit_script, script_name):
@@ -33,7 +37,7 @@ def compute_hbonds(cpptraj_script, submit_script, script_name):
 
     """
     # Check if hbond.gnu exists in the current directory
-    if os.path.exists("hbond.gnu"):
+    if os.path.exists(resolve_path("hbond.gnu")):
         print(" > Hbonding results found")
     else:
         print(" > No hbond data found, submitting")
@@ -72,7 +76,7 @@ def bond_labels(file_path, ignore_backbone=True, include_backbone=tuple("DHK")):
     """
 
     dict = {}
-    with open(file_path, "r") as f:
+    with open_input(file_path, "r") as f:
         for line in f:
             if line[:10] == "set ytics(":
                 bonds = line.split("(")[1].split(")")[0]
@@ -122,27 +126,51 @@ def count_occurrences(file_path, labels):
     -------
     labels: DataFrame containing residue pair and interaction index
     frame_count: total number of frames in trajectory
+
+    See Also
+    --------
+    pyqmmm.md.hbond_series
     """
 
-    labels["count"] = 0
-    frame_count = 0
-    with open(file_path, "r") as f:
-        for _ in range(8):
-            next(f)
-        for frame in f.read().split("\n\n"):
-            frame_count += 1
-            bonds = set()
-            for line in frame.split("\n"):
-                if line == "end":
-                    break
-                arr = [int(float(x)) for x in line.split(" ") if x]
-                if arr[-1] == 1:
-                    bonds.add(arr[1])
-            contains_bond = [len(i & bonds) != 0 for i in labels["index"]]
-            labels.loc[contains_bond, "count"] += 1
+    series = hbond_series.read_series(file_path)
+    groups = hbond_series.group_matrix(labels["index"], series.shape[1])
+    presence = hbond_series.group_presence(series, groups)
+    labels["count"] = hbond_series.occurrence_counts(presence)
+    frame_count = series.shape[0]
     return labels, frame_count
 
 
+def count_windows(file_path, labels, size=None, n_windows=None):
+    """
+    Counts occurrences of each hydrogen bond per replicate or time window.
+
+    Parameters
+    ----------
+    file_path: str
+        Path to hbond.gnu file
+    labels: pd.DataFrame
+        Hbond label groups, see bond_labels
+    size: int
+        Frames per time window
+    n_windows: int
+        Number of windows of equal length, e.g. concatenated replicates
+
+    Returns
+    -------
+    counts: pd.DataFrame
+        Occurrence counts with one row per label group and one column per window
+    frame_counts: np.ndarray
+        Number of frames in each window
+    """
+    series = hbond_series.read_series(file_path)
+    groups = hbond_series.group_matrix(labels["index"], series.shape[1])
+    presence = hbond_series.group_presence(series, groups)
+    edges = hbond_series.window_edges(series.shape[0], size, n_windows)
+    counts = hbond_series.occurrence_counts(presence, edges)
+    counts = pd.DataFrame(counts.T, index=pd.MultiIndex.from_frame(labels[["acceptor", "donor"]]))
+    return counts, np.diff(edges)
+
+
 def process_data(count_df, frame_count, name, substrate):
     """
     Cleans up hbonding data (formats residue names, dataframe index, etc.)
@@ -212,6 +240,32 @@ def process_data(count_df, frame_count, name, substrate):
     return count_df
 
 
+@cached(files=("file_path",))
+def hbond_occurrences(file_path, name, substrate):
+    """
+    Percent occurrence of each hbond in a hbond.gnu file.
+
+    Results are cached by the contents of the file, see pyqmmm.io.result_cache.
+
+    Parameters
+    ----------
+    file_path: str
+        Path to hbond.gnu file
+    name: str
+        System name
+    substrate: str
+        Resid of the substrate
+
+    Returns
+    -------
+    pd.DataFrame
+        Percent occurrence of each hbond, see process_data
+    """
+    label_df = bond_labels(file_path)
+    count_df, frame_count = count_occurrences(file_path, label_df)
+    return process_data(count_df, frame_count, name, substrate)
+
+
 def figure_formatting():
     """
     Sets formatting for matplotlib.
@@ -311,17 +365,15 @@ def analyze_hbonds(file_paths, names, substrate):
     data = []
     for file_path, name in zip(file_paths, names):
         data_path = Path(file_path + "hbond.csv")
-        if data_path.is_file():
-            print(f"   > {data_path} already exists")
-            d = pd.read_csv(file_path + "hbond.csv")
+        path = resolve_path(file_path + "hbond.gnu")
+        if not os.path.isfile(path) and data_path.is_file():
+            print(f"   > {path} not found, using {data_path}")
+            d = pd.read_csv(data_path)
             d = d.set_index("residue")
         else:
-            path = file_path + "hbond.gnu"
             print(f"   > Processing: {path}")
-            label_df = bond_labels(path)
-            count_df, frame_count = count_occurrences(path, label_df)
-            d = process_data(count_df, frame_count, name, substrate)
-            d.to_csv(file_path + "hbond.csv")
+            d = hbond_occurrences(path, name, substrate)
+            d.to_csv(data_path)
         plot(d, file_path)
         print(f"   > Creating single plot")
         data.append(d)
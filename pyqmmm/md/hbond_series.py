@@ -0,0 +1,173 @@
+"""
+Sparse matrix engine for cpptraj hbond time series (hbond.gnu).
+
+The series is parsed once into a boolean frames x bonds matrix S. The
+hbonds of each label group (an acceptor/donor residue pair, see
+hbond_analyzer.bond_labels) form a boolean bonds x groups matrix G, so
+the groups present in every frame are the nonzeros of S @ G. Counting
+frames per group, per replicate, or per time window is a product with a
+windows x frames indicator matrix W: counts = W @ (S @ G).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from pyqmmm.io.compression import open_input
+
+HEADER_LINES = 8
+CHUNK_ROWS = 1 << 22  # Rows of the series parsed at a time
+
+
+def read_series(file_path, chunk_rows=CHUNK_ROWS):
+    """
+    Frames x bonds matrix of the hbonds present in every frame of hbond.gnu.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the hbond.gnu file, optionally compressed.
+    chunk_rows : int
+        Number of rows parsed at a time, bounds the memory of the parse.
+
+    Returns
+    -------
+    series : scipy.sparse.csr_matrix
+        Boolean matrix of shape (n_frames, max bond index + 1).
+    """
+    frames, present_frames, present_bonds = [], [], []
+    with open_input(file_path, "r") as f:
+        chunks = pd.read_csv(f, sep=r"\s+", header=None, skiprows=HEADER_LINES, names=["frame", "bond", "value"],
+                             dtype=float, na_values=["end"], chunksize=chunk_rows)
+        for chunk in chunks:
+            chunk = chunk.dropna().to_numpy(dtype=np.int64)
+            frames.append(np.unique(chunk[:, 0]))
+            present = chunk[chunk[:, 2] == 1]
+            present_frames.append(present[:, 0])
+            present_bonds.append(present[:, 1])
+    if not frames:
+        return sparse.csr_matrix((0, 0), dtype=bool)
+
+    # Frames are numbered by cpptraj, rows follow the order of the frame numbers
+    frames = np.unique(np.concatenate(frames))
+    rows = np.searchsorted(frames, np.concatenate(present_frames))
+    columns = np.concatenate(present_bonds)
+    n_bonds = columns.max() + 1 if len(columns) else 0
+    series = sparse.coo_matrix((np.ones(len(rows), dtype=bool), (rows, columns)), shape=(len(frames), n_bonds))
+    return series.tocsr()
+
+
+def group_matrix(groups, n_bonds):
+    """
+    Bonds x groups matrix mapping every hbond index to its label groups.
+
+    Parameters
+    ----------
+    groups : iterable of set of int
+        Hbond indices of every group, e.g., the index column of bond_labels.
+    n_bonds : int
+        Number of rows, at least the columns of the series. Indices beyond
+        it never occur in the series and are left out.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        Boolean matrix of shape (n_bonds, n_groups).
+    """
+    rows, columns = [], []
+    n_groups = 0
+    for column, bonds in enumerate(groups):
+        n_groups += 1
+        bonds = [bond for bond in bonds if 0 <= bond < n_bonds]
+        rows.extend(bonds)
+        columns.extend([column] * len(bonds))
+    data = np.ones(len(rows), dtype=bool)
+    return sparse.coo_matrix((data, (rows, columns)), shape=(n_bonds, n_groups)).tocsr()
+
+
+def group_presence(series, groups):
+    """
+    Frames x groups matrix of the groups with at least one hbond in a frame.
+
+    Parameters
+    ----------
+    series : scipy.sparse.csr_matrix
+        Frames x bonds matrix, see read_series.
+    groups : scipy.sparse.csr_matrix
+        Bonds x groups matrix, see group_matrix.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        Boolean matrix of shape (n_frames, n_groups).
+    """
+    n_bonds = max(series.shape[1], groups.shape[0])
+    series = sparse.csr_matrix(series, dtype=np.int32)
+    series.resize(series.shape[0], n_bonds)
+    groups = sparse.csr_matrix(groups, dtype=np.int32)
+    groups.resize(n_bonds, groups.shape[1])
+    return (series @ groups) > 0
+
+
+def window_edges(n_frames, size=None, n_windows=None):
+    """
+    Frame edges of consecutive windows, e.g., replicates or time windows.
+
+    Parameters
+    ----------
+    n_frames : int
+        Number of frames in the series.
+    size : int, optional
+        Frames per window, the last window holds the rest.
+    n_windows : int, optional
+        Number of windows of near-equal size, e.g., concatenated replicates
+        of the same length. Used if size is not given.
+
+    Returns
+    -------
+    np.ndarray
+        Edges from 0 to n_frames, window i spans edges[i]:edges[i + 1].
+    """
+    if size:
+        return np.append(np.arange(0, n_frames, size), n_frames)
+    n_windows = n_windows or 1
+    return n_frames * np.arange(n_windows + 1) // n_windows
+
+
+def window_matrix(edges):
+    """
+    Windows x frames indicator matrix of the windows between edges.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        Integer matrix with a one where a frame belongs to a window.
+    """
+    edges = np.asarray(edges)
+    lengths = np.diff(edges)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    columns = np.arange(edges[0], edges[-1])
+    data = np.ones(len(columns), dtype=np.int64)
+    return sparse.csr_matrix((data, (rows, columns)), shape=(len(lengths), edges[-1]))
+
+
+def occurrence_counts(presence, edges=None):
+    """
+    Number of frames with each group present, overall or per window.
+
+    Parameters
+    ----------
+    presence : scipy.sparse.csr_matrix
+        Frames x groups matrix, see group_presence.
+    edges : array_like, optional
+        Frame edges of the windows, see window_edges.
+
+    Returns
+    -------
+    np.ndarray
+        Counts of shape (n_groups,), or (n_windows, n_groups) with edges.
+    """
+    presence = sparse.csr_matrix(presence, dtype=np.int64)
+    if edges is None:
+        return np.asarray(presence.sum(axis=0)).ravel()
+    return (window_matrix(edges) @ presence).toarray()
@@ -35,7 +35,15 @@ import time
 import numpy as np
 import pandas as pd
 import MDAnalysis as mda
-from MDAnalysis.analysis import align, rms
+from MDAnalysis.analysis import align
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Local libs
+# ──────────────────────────────────────────────────────────────────────────────
+from pyqmmm.io.mdcrd import fast_trajectory
+from pyqmmm.md.frame_reduction import RunningMoments, block_bounds, reduce_blocks
+from pyqmmm.md.universe import load_universe, open_universe
+from pyqmmm.profiling import span
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Pretty printing helpers
@@ -55,38 +63,99 @@ warnings.filterwarnings("ignore", category=UserWarning, module="MDAnalysis")
 # ──────────────────────────────────────────────────────────────────────────────
 # Core calculation
 # ──────────────────────────────────────────────────────────────────────────────
-def calculate_rmsf_per_trajectory(topology: str, trajectory: str,
-                                  reference: mda.Universe,
-                                  column_name: str) -> pd.DataFrame:
-    """Compute per-residue RMSF for a single trajectory."""
-    print(f"   > Reading  : {trajectory}")
-    u = mda.Universe(topology, trajectory, dt=0.2, format="TRJ")
+ALIGN_SELECTION = "backbone and resid 3-14 19-26 29 30"
 
-    align.AlignTraj(
-        u, reference,
-        select="backbone and resid 3-14 19-26 29 30",
-        in_memory=True
-    ).run()
 
-    print(f"   > Computing: {trajectory}")
-    rmsf_values = rms.RMSF(u.select_atoms("all")).run().results.rmsf
+def aligned_moments(u: mda.Universe, reference: mda.Universe,
+                    select: str = ALIGN_SELECTION,
+                    start: int = None, stop: int = None) -> RunningMoments:
+    """
+    Per-atom position moments after fitting every frame onto the reference selection.
 
-    rmsf_res, resnames, resids = [], [], []
-    offset = min(u.atoms.indices)
+    Single pass over frames start to stop: each frame is superimposed on
+    the fly, like align.AlignTraj (unweighted centers and rotation), and
+    added to the moments with a Welford update, so memory stays O(n_atoms)
+    however long the trajectory is.
+    """
+    mobile = u.select_atoms(select)
+    target = reference.select_atoms(select)
+    target_coordinates = target.positions.astype(np.float64) - target.center_of_geometry()
 
-    for res in u.atoms.residues:
-        idx = [i - offset for i in res.atoms.indices]
-        if max(idx) >= len(rmsf_values):
-            print(f"Skipping residue {res.resname}{res.resid}")
-            continue
-        rmsf_res.append(np.mean(rmsf_values[idx]))
-        resnames.append(res.resname)
-        resids.append(res.resid)
+    moments = RunningMoments((u.atoms.n_atoms, 3))
+    for _ in u.trajectory[start:stop]:
+        mobile_center = mobile.center_of_geometry()
+        rotation, _ = align.rotation_matrix(mobile.positions - mobile_center, target_coordinates)
+        # Translation does not change the RMSF, so the reference center is not added back
+        moments.add((u.atoms.positions - mobile_center) @ rotation.T)
+    return moments
+
+
+def rmsf_from_moments(moments: RunningMoments) -> np.ndarray:
+    """Per-atom RMSF in Angstrom from position moments of shape (n_atoms, 3)."""
+    return np.sqrt(moments.variance.sum(axis=1))
+
+
+def streaming_rmsf(u: mda.Universe, reference: mda.Universe,
+                   select: str = ALIGN_SELECTION) -> np.ndarray:
+    """Per-atom RMSF of the whole trajectory of u, see aligned_moments."""
+    return rmsf_from_moments(aligned_moments(u, reference, select))
+
+
+def block_moments(topology: str, trajectory: str, fmt: str, reference: mda.Universe,
+                  block: int, n_blocks: int) -> RunningMoments:
+    """Aligned position moments of one frame block, run in a worker, see reduce_blocks."""
+    u = load_universe(topology, trajectory, fmt, dt=0.2)
+    start, stop = block_bounds(len(u.trajectory), block, n_blocks)
+    return aligned_moments(u, reference, ALIGN_SELECTION, start, stop)
 
+
+def residue_rmsf(u: mda.Universe, rmsf_values: np.ndarray,
+                 column_name: str) -> pd.DataFrame:
+    """
+    Average per-atom RMSF values over the residues of u.
+
+    Residues with atoms beyond the end of rmsf_values are skipped.
+    """
+    residues = u.atoms.residues
+    resindices = u.atoms.resindices
+    positions = u.atoms.indices - u.atoms.indices.min()
+    in_range = positions < len(rmsf_values)
+
+    # Atom counts and RMSF sums of every residue in one pass over the atoms
+    n_residues = len(u.residues)
+    n_atoms = np.bincount(resindices, minlength=n_residues)
+    n_found = np.bincount(resindices[in_range], minlength=n_residues)
+    sums = np.bincount(resindices[in_range], weights=rmsf_values[positions[in_range]], minlength=n_residues)
+
+    keep = (n_found == n_atoms)[residues.resindices]
+    for res in residues[~keep]:
+        print(f"Skipping residue {res.resname}{res.resid}")
+    kept = residues.resindices[keep]
     return pd.DataFrame(
-        dict(ResID=resids, ResName=resnames, **{column_name: rmsf_res})
+        dict(ResID=residues.resids[keep], ResName=residues.resnames[keep],
+             **{column_name: sums[kept] / n_atoms[kept]})
     )
 
+
+def combine_replicas(dfs: list) -> pd.DataFrame:
+    """Join per-residue RMSF tables of replicas on ResID and add their mean and spread."""
+    names = [df.columns[-1] for df in dfs]
+    df = pd.concat([d.set_index(["ResID", "ResName"]) for d in dfs], axis=1, join="outer").reset_index()
+    df["Avg. RMSF"] = df[names].mean(axis=1)
+    df["Std. Dev"]  = df[names].std(axis=1)
+    return df
+
+
+def calculate_rmsf_per_trajectory(topology: str, trajectory: str,
+                                  reference: mda.Universe,
+                                  column_name: str) -> pd.DataFrame:
+    """Compute per-residue RMSF for a single trajectory in this process."""
+    print(f"   > Reading  : {trajectory}")
+    u = open_universe(topology, trajectory, dt=0.2)
+
+    print(f"   > Computing: {trajectory}")
+    return residue_rmsf(u, streaming_rmsf(u, reference), column_name)
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Input-file parser
 # ──────────────────────────────────────────────────────────────────────────────
@@ -186,15 +255,22 @@ def main() -> None:
     # ── Analysis ────────────────────────────────────────────────────────────
     t0 = time.time()
     reference = mda.Universe(ref)
-    args = [(top, path, reference, name) for name, path in trajs]
-
-    with mp.Pool(processes=n_cpus) as pool:
-        dfs = pool.starmap(calculate_rmsf_per_trajectory, args)
-
-    df = pd.concat(dfs, axis=1).T.drop_duplicates().T
-    df["Avg. RMSF"] = df.iloc[:, 2:].mean(axis=1)
-    df["Std. Dev"]  = df.iloc[:, 2:-1].std(axis=1)
-    df.to_csv("rmsf.csv", index=False)
+    # ASCII trajectories are transcoded once to a binary copy before the workers start
+    with span("transcode"):
+        tasks = [(top, *fast_trajectory(path, top, n_workers=n_cpus), reference) for _, path in trajs]
+
+    # Every trajectory is split into frame blocks so all cores are busy
+    # even with fewer trajectories than cores
+    for _, path in trajs:
+        print(f"   > Computing: {path}")
+    with span("compute"):
+        moments = reduce_blocks(block_moments, tasks, n_workers=n_cpus)
+
+    with span("write"):
+        topology = mda.Universe(top)
+        dfs = [residue_rmsf(topology, rmsf_from_moments(m), name) for m, (name, _) in zip(moments, trajs)]
+        df = combine_replicas(dfs)
+        df.to_csv("rmsf.csv", index=False)
 
     dt = time.time() - t0
     print(f"""\n{YLW}------------------------- RMSF SUMMARY -------------------------
@@ -0,0 +1,48 @@
+"""
+MDAnalysis universes that read AMBER ASCII trajectories from a binary copy.
+
+ASCII trajectories are transcoded once on first use, see pyqmmm.io.mdcrd,
+and every later analysis reads the NetCDF or .npy copy instead.
+"""
+
+import MDAnalysis as mda
+import numpy as np
+from MDAnalysis.coordinates.memory import MemoryReader
+
+from pyqmmm.io.mdcrd import fast_trajectory
+
+
+def load_universe(topology, path, fmt, dt=None):
+    """
+    Universe of a trajectory resolved by fast_trajectory.
+
+    Parameters
+    ----------
+    topology : str
+        Path to the topology.
+    path : str
+        Path to the trajectory or to its binary copy.
+    fmt : str
+        'NCDF', 'TRJ', or 'NPY', see fast_trajectory.
+    dt : float, optional
+        Time between frames in ps, for trajectories that do not store it.
+
+    Returns
+    -------
+    mda.Universe
+    """
+    kwargs = {} if dt is None or fmt == "NCDF" else {"dt": dt}
+    if fmt == "NPY":
+        return mda.Universe(topology, np.load(path, mmap_mode="r"), format=MemoryReader, **kwargs)
+    return mda.Universe(topology, path, format=fmt, **kwargs)
+
+
+def open_universe(topology, trajectory, dt=None, n_workers=None):
+    """
+    Universe of an AMBER trajectory, transcoding ASCII trajectories on first use.
+
+    Do not call from several processes for the same new trajectory, resolve
+    it once with fast_trajectory and use load_universe in the workers.
+    """
+    path, fmt = fast_trajectory(trajectory, topology, n_workers=n_workers)
+    return load_universe(topology, path, fmt, dt)
@@ -0,0 +1,203 @@
+"""
+Timing spans, memory statistics, and JSON run reports for pyqmmm tools.
+
+Tools mark their stages with span(), which costs one global lookup when no
+profile is running. Running a command with ``pyqmmm --profile`` starts a
+Profiler that collects the spans with their nesting, the peak resident
+memory of the process and its pool workers, the tracemalloc peak and top
+allocation sites, and optionally cProfile call statistics, and writes
+them to a JSON report when the command ends:
+
+    pyqmmm --profile --profile_calls qm --plot_energy
+
+Setting PYQMMM_PROFILE=1 profiles every run, for example the directory
+runs of a batch, each writing its report in its own directory.
+Spans inside process pool workers are not collected, the span around the
+pool covers them.
+"""
+
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_NAME = "pyqmmm_profile.json"
+TOP_ALLOCATIONS = 10
+TOP_CALLS = 25
+
+_ACTIVE = None
+
+
+def peak_rss_mb(children=False):
+    """
+    Peak resident set size in MB of this process or of its finished children.
+
+    Returns None where the resource module is not available.
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def current():
+    """The Profiler running in this process, or None."""
+    # A forked pool worker inherits the profiler of its parent but must not report to it
+    if _ACTIVE is not None and _ACTIVE.pid == os.getpid():
+        return _ACTIVE
+    return None
+
+
+@contextlib.contextmanager
+def span(name):
+    """
+    Time a stage of a tool, such as 'parse', 'compute', 'plot', or 'write'.
+
+    Spans nest, a span opened inside another is reported as 'outer/inner'.
+    Works as a context manager or a decorator and does nothing unless a
+    Profiler is running.
+
+    Examples
+    --------
+    >>> with span("parse"):
+    ...     traj = Trajectory.from_xyz(path)
+    """
+    profiler = current()
+    if profiler is None:
+        yield
+        return
+    profiler._stack.append(name)
+    path = "/".join(profiler._stack)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.add_span(path, time.perf_counter() - start)
+        profiler._stack.pop()
+
+
+class Profiler:
+    """
+    Profile one run and write its JSON report.
+
+    Parameters
+    ----------
+    report : str
+        Path of the JSON report, cProfile statistics go next to it as .prof.
+    calls : bool
+        Also record function call statistics with cProfile.
+    memory : bool
+        Trace Python allocations with tracemalloc, which slows allocation-heavy code.
+    """
+
+    def __init__(self, report=REPORT_NAME, calls=False, memory=True):
+        self.report = os.path.abspath(report)
+        self.calls = calls
+        self.memory = memory
+        self.pid = os.getpid()
+        self.spans = {}
+        self._stack = []
+        self._profile = None
+        self._tracing = False
+
+    def add_span(self, path, seconds):
+        """Add a finished span, spans with the same path are summed."""
+        record = self.spans.setdefault(path, {"name": path, "calls": 0, "seconds": 0.0})
+        record["calls"] += 1
+        record["seconds"] += seconds
+
+    def start(self):
+        """Start collecting, making this the profiler used by span()."""
+        global _ACTIVE
+        self._previous = _ACTIVE
+        _ACTIVE = self
+        self.started = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        if self.calls:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def stop(self, status="ok"):
+        """
+        Stop collecting and write the report.
+
+        Parameters
+        ----------
+        status : str
+            Outcome of the run recorded in the report.
+
+        Returns
+        -------
+        dict
+            The report.
+        """
+        global _ACTIVE
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        if self._profile is not None:
+            self._profile.disable()
+        report = {
+            "command": sys.argv,
+            "cwd": os.getcwd(),
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "status": status,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_children_mb": peak_rss_mb(children=True),
+            "spans": list(self.spans.values()),
+        }
+        if self._tracing:
+            report["tracemalloc"] = self._memory_stats()
+            tracemalloc.stop()
+        if self._profile is not None:
+            report["cprofile"] = self._call_stats()
+        _ACTIVE = self._previous
+
+        with open(self.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"> Profile written to {self.report}")
+        return report
+
+    def _memory_stats(self):
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+        return {
+            "current_mb": current_bytes / 1e6,
+            "peak_mb": peak_bytes / 1e6,
+            "top": [
+                {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 "size_mb": stat.size / 1e6, "count": stat.count}
+                for stat in statistics
+            ],
+        }
+
+    def _call_stats(self):
+        import pstats
+        path = os.path.splitext(self.report)[0] + ".prof"
+        self._profile.dump_stats(path)
+        stats = pstats.Stats(self._profile).stats
+        # Entries map (file, line, function) to (primitive calls, calls, own time, cumulative time, callers)
+        ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_CALLS]
+        return {
+            "stats": path,
+            "top": [
+                {"function": f"{file}:{line}({function})", "calls": calls, "own_s": own, "cumulative_s": cumulative}
+                for (file, line, function), (_, calls, own, cumulative, _) in ranked
+            ],
+        }
@@ -6,6 +6,9 @@ import subprocess
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from pyqmmm.io.result_cache import cached
+from pyqmmm.profiling import span
+
 def format_plot() -> None:
     """
     General plotting parameters for the Kulik Lab.
@@ -26,6 +29,64 @@ def format_plot() -> None:
     plt.rcParams["ytick.right"] = True
     plt.rcParams["svg.fonttype"] = "none"
 
+@cached(files=("wfn",), ignore=("threads",))
+def bond_orders(wfn, atom_pairs, threads):
+    """
+    Mayer bond orders of the atom pairs from a wavefunction file with Multiwfn.
+
+    Results are cached by the contents of the wavefunction file,
+    see pyqmmm.io.result_cache.
+
+    Parameters
+    ----------
+    wfn : str
+        Path to the ORCA .gbw wavefunction file.
+    atom_pairs : list of tuple of int
+        Pairs of atom numbers whose bond orders are kept.
+    threads : int
+        Threads used by Multiwfn.
+
+    Returns
+    -------
+    step_data : dict or None
+        Bond order of each pair found, keyed by 'atom1-atom2',
+        or None if the Multiwfn output has no bond orders.
+    """
+    command = f"Multiwfn {wfn} -nt {threads}"
+    print(f"      > Executing command: {command}")
+
+    proc = subprocess.Popen(
+        command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, shell=True
+    )
+
+    commands = ["9", "1", "n", "0", "q"]
+    output = proc.communicate("\n".join(commands).encode())
+
+    lines = str(output[0]).split("\\n")
+    step_data = {}
+    start_processing = False
+    found = False
+
+    for line in lines:
+        if "Bond orders with absolute value" in line:
+            start_processing = True
+            found = True
+            continue
+
+        if "Note: The \"Total\" bond orders shown above" in line:
+            break
+
+        if start_processing and "Alpha:" in line and "Total:" in line:
+            parts = line.split("(")
+            atom1 = int(parts[0].split()[-1])
+            atom2 = int(parts[1].split()[-1])
+            bond_order = float(parts[2].split()[-1])
+            if (atom1, atom2) in atom_pairs or (atom2, atom1) in atom_pairs:
+                step_data[f"{atom1}-{atom2}"] = bond_order
+    return step_data if found else None
+
+
+@span("compute")
 def calculate_bond_valence(atom_pairs, threads):
     start_time = time.time()
 
@@ -47,38 +108,9 @@ def calculate_bond_valence(atom_pairs, threads):
 
         for wfn in wfn_files:
             step_name = wfn.split('.')[0]
-            command = f"Multiwfn {wfn} -nt {threads}"
-
             print(f"   > Processing {step_name}")
-            print(f"      > Executing command: {command}")
-
-            proc = subprocess.Popen(
-                command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, shell=True
-            )
-
-            commands = ["9", "1", "n", "0", "q"]
-            output = proc.communicate("\n".join(commands).encode())
-
-            lines = str(output[0]).split("\\n")
-            step_data = {'Step': step_name}
-            start_processing = False
-
-            for line in lines:
-                if "Bond orders with absolute value" in line:
-                    start_processing = True
-                    continue
-
-                if "Note: The \"Total\" bond orders shown above" in line:
-                    break
-
-                if start_processing and "Alpha:" in line and "Total:" in line:
-                    parts = line.split("(")
-                    atom1 = int(parts[0].split()[-1])
-                    atom2 = int(parts[1].split()[-1])
-                    bond_order = float(parts[2].split()[-1])
-                    if (atom1, atom2) in atom_pairs or (atom2, atom1) in atom_pairs:
-                        step_data[f"{atom1}-{atom2}"] = bond_order
-            
+            step_data = {'Step': step_name, **(bond_orders(wfn, atom_pairs, threads) or {})}
+
             # Create step_data as a list with the same order as columns
             step_data_list = [step_data.get(col, '') for col in columns]
 
@@ -90,6 +122,7 @@ def calculate_bond_valence(atom_pairs, threads):
     print(f"\tOUTPUT: Generated bond valences in the current directory.")
     print(f"\tTIME: Total execution time: {total_time} seconds.\n")
 
+@span("plot")
 def plot_bond_valence():
     # Read the bond valence data from CSV, including the row names
     format_plot()
@@ -116,13 +149,7 @@ def plot_bond_valence():
     plt.savefig(f"bond_valence.png", bbox_inches="tight", format="png", dpi=300)
 
 if __name__ == "__main__":
-    try:
-        # Check if the CSV file exists
-        with open("bond_valence.csv"):
-            print("   > CSV file found. Plotting the data.")
-            plot_bond_valence()
-    except FileNotFoundError:
-        print("   > CSV file not found. Running Multiwfn analysis.")
-        atom_pairs = [(145, 146), (65, 145), (66, 145), (12, 145), (32, 145), (145, 149)]
-        calculate_bond_valence(atom_pairs, 4)
-        plot_bond_valence()
\ No newline at end of file
+    # Bond orders of unchanged wavefunction files are reused from the result cache
+    atom_pairs = [(145, 146), (65, 145), (66, 145), (12, 145), (32, 145), (145, 149)]
+    calculate_bond_valence(atom_pairs, 4)
+    plot_bond_valence()
\ No newline at end of file
@@ -1,6 +1,7 @@
 """Extract charge and spin data for a given subset of atoms for graphing."""
 
 import glob
+from pyqmmm.io.selection import parse_ranges
 
 
 def get_files(file_pattern):
@@ -27,38 +28,33 @@ def get_files(file_pattern):
 
 def get_selection(file):
     """
-    Get the user's atom set.
+    Get the user's frame selection.
     Returns
     -------
-    atoms : selection
-        The index of the atom for which the user would like the spin and charge.
+    selection : list
+        The 1-indexed frames the user would like, in the order they were given.
     """
 
     # For which frames would the user like
     selection = input(f"What frames would you like for {file}: ")
 
-    # Convert user input to a list even if it is hyphenated
-    temp = [
-        (lambda sub: range(sub[0], sub[-1] + 1))(list(map(int, ele.split("-"))))
-        for ele in selection.split(",")
-    ]
-    selection = [int(b) for a in temp for b in a]
-
-    return selection
+    # Convert user input to a list of frames even if it is hyphenated
+    return parse_ranges(selection)
 
 
 def get_atoms():
+    """
+    Get the user's atom selection.
+    Returns
+    -------
+    atoms : list
+        The atom labels to sum, in the order they were given.
+    """
     # For which atoms would the user like to sum the spin and charge
     my_atoms = input("   > What atom indexes would you like to sum (e.g., 58-76): ")
 
-    # Convert user input to a list even if it is hyphenated
-    temp = [
-        (lambda sub: range(sub[0], sub[-1] + 1))(list(map(int, ele.split("-"))))
-        for ele in my_atoms.split(",")
-    ]
-    atoms = [str(b) for a in temp for b in a]
-
-    return atoms
+    # Convert user input to a list of atom labels even if it is hyphenated
+    return [str(atom) for atom in parse_ranges(my_atoms)]
 
 
 def get_spins(atoms, file, selection):
@@ -72,7 +68,7 @@ def get_spins(atoms, file, selection):
     file : str
         The name of the file that you would like to analyze.
     selection : list
-        The indices of the atoms for which the user would like the charge and spin.
+        The 1-indexed frames to keep, see get_selection.
 
     Returns
     -------
@@ -84,6 +80,8 @@ def get_spins(atoms, file, selection):
     net_spins = []
     net_spin = 0
     step_count = 0
+    # Sets make the per-line membership tests constant time
+    atoms, selection = set(atoms), set(selection)
     with open(file, "r") as scan_spin_file:
         for line in scan_spin_file:
             line_list = line.split()
@@ -118,7 +116,7 @@ def get_charges(atoms, file, selection):
     file : str
         The name of the file that you would like to analyze.
     selection : list
-        The atom indices for which the user would like the charge and spin.
+        The 1-indexed frames to keep, see get_selection.
 
     Returns
     -------
@@ -130,6 +128,8 @@ def get_charges(atoms, file, selection):
     net_charges = []
     net_charge = 0
     step_count = 0
+    # Sets make the per-line membership tests constant time
+    atoms, selection = set(atoms), set(selection)
     with open(file, "r") as scan_charge_file:
         for line in scan_charge_file:
             line_list = line.split()
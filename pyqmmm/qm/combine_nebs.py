@@ -1,5 +1,10 @@
 import glob
 import re
+from contextlib import ExitStack
+import numpy as np
+from pyqmmm.io.frame_selection import write_views
+from pyqmmm.io.trajectory import parse_frame
+from pyqmmm.io.xyz_reader import XYZReader
 
 def get_sorted_xyz_files():
     """
@@ -22,7 +27,7 @@ def get_sorted_xyz_files():
 
 def extract_frames(xyz_filename):
     """
-    Reads all frames from an xyz file and returns them as a list of strings.
+    Indexes all frames of an xyz file.
     
     Parameters
     ----------
@@ -31,17 +36,31 @@ def extract_frames(xyz_filename):
     
     Returns
     -------
-    list
-        A list of strings, each string representing a frame in the xyz file.
+    XYZReader
+        The open, indexed trajectory. Frames are only read when written.
+    """
+    return XYZReader(xyz_filename)
+
+def frame_coordinates(traj, index):
+    """
+    Parses the coordinates of a single frame of an indexed xyz file.
+
+    Parameters
+    ----------
+    traj : XYZReader
+        The open, indexed trajectory.
+    index : int
+        Zero-based index of the frame.
+
+    Returns
+    -------
+    np.ndarray
+        Coordinates of shape (natoms, 3).
     """
-    frames = []
-    with open(xyz_filename, 'r') as file:
-        lines = file.readlines()
-        atom_count = lines[0].strip()
-        frame_length = int(atom_count) + 2
-        for i in range(0, len(lines), frame_length):
-            frames.append("".join(lines[i:i + frame_length]))
-    return frames
+    natoms = int(traj.natoms[index])
+    coordinates = np.empty((natoms, 3))
+    parse_frame(traj.frame_bytes(index), natoms, coordinates)
+    return coordinates
 
 def combine_trajectories():
     """
@@ -50,21 +69,25 @@ def combine_trajectories():
     """
     output_filename = "combined_nebs.xyz"
     xyz_files = get_sorted_xyz_files()
-    combined_frames = []
-    
-    for idx, xyz_file in enumerate(xyz_files):
-        frames = extract_frames(xyz_file)
-        
-        # If not the first file, check for duplicate with the last frame of previous file
-        if idx > 0 and frames[0] == combined_frames[-1]:
-            frames = frames[1:]  # Remove the first frame if it's a duplicate
+    previous_last = None
+    views = []
+
+    # Frames are copied verbatim from the memory-mapped files, only the first and last frames are parsed
+    with ExitStack() as open_files:
+        for xyz_file in xyz_files:
+            frames = open_files.enter_context(extract_frames(xyz_file))
+            if not len(frames):
+                continue
 
-        combined_frames.extend(frames)
+            # If not the first file, check for duplicate with the last frame of previous file
+            first = 0
+            if previous_last is not None and np.array_equal(frame_coordinates(frames, 0), previous_last):
+                first = 1  # Remove the first frame if it's a duplicate
 
-    # Write the combined frames to a new file
-    with open(output_filename, "w") as outfile:
-        for frame in combined_frames:
-            outfile.write(frame)
+            if len(frames) > first:
+                views.append(frames[first:])
+                previous_last = frame_coordinates(frames, len(frames) - 1)
+        write_views(output_filename, views)
     
     print(f"Combined trajectory written to {output_filename}")
 
@@ -0,0 +1,85 @@
+"""
+Command-line tools of the pyqmmm qm group, see pyqmmm.registry.
+"""
+
+import os
+
+from pyqmmm.registry import Tool, tool_group
+
+
+def flip_xyz():
+    import pyqmmm.qm.xyz_flipper
+    in_file = input("What is the name of the xyz trajectory to reverse (omit extenstion)? ")
+    pyqmmm.qm.xyz_flipper.xyz_flipper(in_file)
+
+
+def plot_mechanism():
+    import pyqmmm.qm.mechanism_plotter
+    color_scheme = input("What color scheme would you like (e.g., tab20, viridis)? ")
+    pyqmmm.qm.mechanism_plotter.generate_plot(color_scheme)
+
+
+def qm_replace_pdb():
+    import pyqmmm.qm.replace_pdb
+    protein = input("   What is the name of your protein (e.g., DAH, TAUD)? ")
+    pdb_file_path = f"{protein}.pdb"
+    xyz_file_path = "scr/optim.xyz"
+    info_file_path = "../info.csv"
+    output_file_path = f"./{protein}_optim.pdb"
+    pyqmmm.qm.replace_pdb.replace_coordinates_in_pdb(pdb_file_path, xyz_file_path, info_file_path, output_file_path)
+
+
+def bond_valence():
+    import glob
+    import pyqmmm.qm.bond_valence
+    if not glob.glob("*.gbw") and os.path.isfile("bond_valence.csv"):
+        print("   No wavefunction files found. Plotting the existing CSV file.")
+    else:
+        # Bond orders of unchanged wavefunction files are reused from the result cache
+        atom_pairs = [(145, 146), (65, 145), (66, 145), (12, 145), (32, 145), (145, 149)]
+        pyqmmm.qm.bond_valence.calculate_bond_valence(atom_pairs, 4)
+    pyqmmm.qm.bond_valence.plot_bond_valence()
+
+
+def orca_scan():
+    import pyqmmm.qm.orca_scan_plotter
+    atom_1 = input("   What is your first atom being scanned? ")
+    atom_2 = input("   What is your second atom being scanned? ")
+    distances, relative_energies = pyqmmm.qm.orca_scan_plotter.read_orca_output("orca.out")
+    print(f"   Start distance: {distances[0]}, End distance: {distances[-1]}\n")
+    pyqmmm.qm.orca_scan_plotter.plot_energy(distances, relative_energies, atom_1, atom_2)
+
+
+def orca_neb_restart():
+    import pyqmmm.qm.orca_neb_restart
+    pyqmmm.qm.orca_neb_restart.create_delete_folder()
+    files_in_directory = [f for f in os.listdir() if f != 'delete']
+    pyqmmm.qm.orca_neb_restart.move_files(files_in_directory)
+
+
+TOOLS = (
+    Tool("plot_energy", "-pe", "Plot the energy of a xyz traj.", "pyqmmm.qm.energy_plotter:plot_energies",
+         "Plot xyz trajectory energies:"),
+    Tool("follow_energy", "-fe", "Print energies of a running xyz traj as frames arrive.",
+         "pyqmmm.qm.energy_plotter:watch_energies", "Follow xyz trajectory energies:"),
+    Tool("flip_xyz", "-f", "Reverse and xyz trajectory.", flip_xyz, "Reverse an xyz trajectory:"),
+    Tool("plot_mechanism", "-pm", "Plot energies for all steps of a mechanism.", plot_mechanism,
+         "Combine all mechanism energetics and plot:"),
+    Tool("residue_decomp", "-rd", "Analyze residue decomposition analysis.",
+         "pyqmmm.qm.residue_decomposition:residue_decomposition", "Analyze residue decomposition jobs:"),
+    Tool("qm_replace_pdb", "-qr", "Replace QM optimized atoms in a pdb.", qm_replace_pdb,
+         "Replace PDB atoms with QM optimized atoms:"),
+    Tool("bond_valence", "-bv", "Replace QM optimized atoms in a pdb.", bond_valence,
+         "Calculates and plots the bond valence for a mechanism:"),
+    Tool("orca_scan", "-os", "Plots an ORCA scan.", orca_scan),
+    Tool("orca_neb_restart", "-rneb", "Prepare to restart an ORCA NEB.", orca_neb_restart),
+    Tool("orca_clean_irc", "-circ", "Removes remaining files from an IRC calc.", "pyqmmm.qm.orca_clean_irc:main"),
+    Tool("combine_nebs", "-cneb", "Combines and NEBs.", "pyqmmm.qm.combine_nebs:combine_trajectories"),
+    Tool("plot_combine_nebs", "-pcneb", "Combines and plots NEBs as a single trajectory.",
+         "pyqmmm.qm.plot_combined_nebs:plot_energies"),
+    Tool("extract_energies", "-ee", "Extract electronic energies", "pyqmmm.qm.extract_electronic_energies:extract"),
+    Tool("extract_gibbs", "-eg", "Extract Gibbs free energies", "pyqmmm.qm.extract_gibbs_free_energies:extract"),
+    Tool("neb_doubler", "-nd", "Doubles the number of frames in an NEB", "pyqmmm.qm.neb_doubler:main"),
+)
+
+command = tool_group("qm", "Functions for quantum mechanics (QM) simulations.", TOOLS)
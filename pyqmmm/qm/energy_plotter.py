@@ -4,6 +4,9 @@ import matplotlib.pyplot as plt
 import numpy as np
 import csv
 import time
+from pyqmmm.io.compression import detect_compression, open_input, resolve_path
+from pyqmmm.io.xyz_reader import XYZReader, XYZStream
+from pyqmmm.profiling import span
 
 HARTREE_TO_KCAL = 627.509
 
@@ -80,21 +83,12 @@ def get_trajectory_energies(filename, software):
         Third value is a list of absolute energies in Hartrees.
 
     """
-    energies_hartrees = []
-    with open(filename, "r") as f:
-        while True:
-            line = f.readline()
-            if not line:
-                break  # end of file
-
-            atom_count = int(line.strip())
-            # next line should contain energy
-            energy_line = f.readline().strip()
-            # parse and append energy
-            energies_hartrees.append(parse_energy(energy_line, software))
-            # skip atom lines
-            for _ in range(atom_count):
-                f.readline()
+    # Only the title line of each frame is read, the atom lines are skipped via the frame index.
+    # A half-written final frame of a running job is ignored.
+    # Compressed trajectories are read in one pass instead of decompressing them to scratch for the index.
+    reader = XYZReader if detect_compression(filename) is None else XYZStream
+    with reader(filename, allow_truncated=True) as traj:
+        energies_hartrees = [parse_energy(title.strip(), software) for title in traj.titles()]
 
     # convert energies to kcal/mol and subtract first energy to make it relative
     first_energy = energies_hartrees[0] * HARTREE_TO_KCAL
@@ -103,6 +97,55 @@ def get_trajectory_energies(filename, software):
     return energies_kcal, first_energy, energies_hartrees
 
 
+def follow_energies(filename, software, interval=5.0, timeout=None):
+    """
+    Print the energy of each new frame of a trajectory that is still being written.
+
+    Only the frames appended since the last check are read.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the trajectory file.
+    software : str
+        Software used for the calculation.
+    interval : float
+        Seconds between checks for new frames.
+    timeout : float, optional
+        Stop after this many seconds without new frames, never by default.
+
+    Returns
+    -------
+    energies_hartrees : list
+        Absolute energies in Hartrees of every frame seen.
+    """
+    energies_hartrees = []
+    with XYZReader(filename, follow=True) as traj:
+        try:
+            for new_frames in traj.follow(interval, timeout):
+                for index in new_frames.indices:
+                    energies_hartrees.append(parse_energy(traj.title(int(index)).strip(), software))
+                    relative = (energies_hartrees[-1] - energies_hartrees[0]) * HARTREE_TO_KCAL
+                    print(f"   > Frame {index + 1}: {energies_hartrees[-1]:.8f} Eh, {relative:8.2f} kcal/mol")
+        except KeyboardInterrupt:
+            pass
+    return energies_hartrees
+
+
+def watch_energies():
+    """
+    Follow the energies of a running optimization or scan until interrupted with Ctrl+C.
+    """
+    name = input("   > What trajectory would you like to follow (omit .xyz extension)? ").strip()
+    filename = resolve_path(name + ".xyz")
+    with open_input(filename, "r") as f:
+        f.readline()
+        software = identify_software(f.readline())
+    print(f"> Following {filename} ({software}), press Ctrl+C to stop")
+    energies_hartrees = follow_energies(filename, software)
+    print(f"> Read {len(energies_hartrees)} frames")
+
+
 def identify_software(line):
     """
     Identify the software used for the calculation from a line.
@@ -174,14 +217,15 @@ def collect_data():
     filenames_input = input(
         "   > What trajectories would you like to plot (omit .xyz extension)? "
     ).split(",")
-    filenames = [f"{name.strip()}.xyz" for name in filenames_input]
+    # Compressed trajectories (e.g., scan.xyz.gz) are used when the plain file is missing
+    filenames = [resolve_path(f"{name.strip()}.xyz") for name in filenames_input]
 
     energies_by_file = {}
     energies_hartrees_by_file = {}
     first_energies = []
 
     for filename in filenames:
-        with open(filename, "r") as f:
+        with open_input(filename, "r") as f:
             # read two lines to get to the software info
             f.readline()
             software_line = f.readline()
@@ -292,9 +336,12 @@ def plot_energies():
         dim_list = [4, 4]
 
 
-    energies_by_file, min_first_energy, plot_relative_to_lowest, energies_hartrees_by_file = collect_data()
-    write_energies_to_csv(energies_by_file, energies_hartrees_by_file)  # Write energies to CSV
-    plot_data(energies_by_file, min_first_energy, plot_relative_to_lowest, dim_list)
+    with span("parse"):
+        energies_by_file, min_first_energy, plot_relative_to_lowest, energies_hartrees_by_file = collect_data()
+    with span("write"):
+        write_energies_to_csv(energies_by_file, energies_hartrees_by_file)  # Write energies to CSV
+    with span("plot"):
+        plot_data(energies_by_file, min_first_energy, plot_relative_to_lowest, dim_list)
 
     total_time = round(time.time() - start_time, 3)  # Seconds to run the function
     job_summary = f"""
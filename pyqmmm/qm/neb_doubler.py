@@ -6,6 +6,9 @@ import shutil
 import subprocess
 import sys
 
+from pyqmmm.io.xyz_reader import XYZReader
+from pyqmmm.io.xyz_writer import XYZWriter
+
 # -------------------------
 # Minimal, clean progress bar
 # -------------------------
@@ -52,10 +55,6 @@ def _get_charge_spin(input_file: Path) -> Tuple[str, str]:
         spin = input("Please enter the spin multiplicity: ").strip()
     return charge, spin
 
-def _read_all_lines(path: Path) -> List[str]:
-    with path.open("r") as f:
-        return f.read().splitlines()
-
 def _parse_allxyz(file_path: Path) -> List[str]:
     """
     Robust ORCA .allxyz parser:
@@ -65,41 +64,16 @@ def _parse_allxyz(file_path: Path) -> List[str]:
     """
     if not file_path.exists():
         raise FileNotFoundError(f"{file_path} not found.")
-    lines = _read_all_lines(file_path)
-    i = 0
-    frames = []
-    natoms_set = set()
-
-    def skip_seps(j):
-        while j < len(lines) and (lines[j].strip() in {"", ">"}):
-            j += 1
-        return j
-
-    while i < len(lines):
-        i = skip_seps(i)
-        if i >= len(lines):
-            break
-        try:
-            natoms = int(lines[i].strip())
-        except ValueError:
-            raise ValueError(f"Expected integer atom count at line {i+1} in {file_path}")
-        natoms_set.add(natoms)
-        i += 1
-        if i >= len(lines):
-            raise ValueError("Unexpected EOF while reading title.")
-        title = lines[i].rstrip()
-        i += 1
-        if i + natoms > len(lines):
-            raise ValueError("Unexpected EOF while reading coordinates.")
-        coords = lines[i:i+natoms]
-        i += natoms
-        frames.append("\n".join([str(natoms), title] + coords))
-        i = skip_seps(i)
-
-    if not frames:
-        raise ValueError(f"No frames parsed in {file_path}")
-    if len(natoms_set) != 1:
-        raise ValueError("Inconsistent number of atoms across frames.")
+    # An allxyz that ORCA is still writing is read up to its last complete image
+    with XYZReader(file_path, allow_truncated=True) as traj:
+        if not len(traj):
+            raise ValueError(f"No frames parsed in {file_path}")
+        if (traj.natoms != traj.natoms[0]).any():
+            raise ValueError("Inconsistent number of atoms across frames.")
+        frames = [
+            "\n".join([str(natoms), title.rstrip()] + coords)
+            for natoms, title, coords in traj
+        ]
     return frames
 
 def _write_text(path: Path, text: str) -> None:
@@ -107,7 +81,8 @@ def _write_text(path: Path, text: str) -> None:
         f.write(text if text.endswith("\n") else text + "\n")
 
 def _write_frame_xyz(frame_str: str, out_xyz: Path) -> None:
-    _write_text(out_xyz, frame_str)
+    with XYZWriter(out_xyz) as writer:
+        writer.write_raw(frame_str)
 
 def _make_interpolate_input(charge: str, spin: str, nimages: int, nprocs: int, maxcore: int) -> str:
     s = (
@@ -229,9 +204,10 @@ def _double_path(
     if strict_double and len(new_frames) == (2 * nframes - 1):
         new_frames.append(frames[-1])
 
-    # Write outputs
-    _write_text(output_traj_allxyz, "\n>\n".join(new_frames) + "\n")  # ORCA-style
-    _write_text(output_traj_xyz, "\n".join(new_frames) + "\n")        # plain stacked XYZ
+    # Write the ORCA-style allxyz and the plain stacked XYZ from one buffer
+    with XYZWriter(output_traj_xyz, output_traj_allxyz) as writer:
+        for frame in new_frames:
+            writer.write_raw(frame)
 
     # Cleanup/archive everything created this run except outputs, inputs, original, and the archive dir itself
     final_listing = set(os.listdir("."))
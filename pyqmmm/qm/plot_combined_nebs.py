@@ -6,6 +6,7 @@ import csv
 import time
 import os
 import re
+from pyqmmm.io.xyz_reader import XYZReader
 
 HARTREE_TO_KCAL = 627.509
 
@@ -84,21 +85,9 @@ def get_trajectory_energies(filename, software):
         Third value is a list of absolute energies in Hartrees.
 
     """
-    energies_hartrees = []
-    with open(filename, "r") as f:
-        while True:
-            line = f.readline()
-            if not line:
-                break  # end of file
-
-            atom_count = int(line.strip())
-            # next line should contain energy
-            energy_line = f.readline().strip()
-            # parse and append energy
-            energies_hartrees.append(parse_energy(energy_line, software))
-            # skip atom lines
-            for _ in range(atom_count):
-                f.readline()
+    # Only the title line of each frame is read, the atom lines are skipped via the frame index
+    with XYZReader(filename) as traj:
+        energies_hartrees = [parse_energy(title.strip(), software) for title in traj.titles()]
 
     # Convert energies to kcal/mol (absolute energies)
     energies_kcal_abs = [e * HARTREE_TO_KCAL for e in energies_hartrees]
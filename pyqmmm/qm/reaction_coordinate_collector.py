@@ -1,8 +1,11 @@
 """Extract RC against energy and generate CSV."""
 
-from scipy.spatial import distance
+import functools
 import numpy as np
 import os
+from pyqmmm.io.selection import parse_ranges
+from pyqmmm.io.sharding import map_frames
+from pyqmmm.io.xyz_reader import XYZReader
 
 
 def request_rc(rc_request):
@@ -16,27 +19,66 @@ def request_rc(rc_request):
 
     """
     # What atoms define your reaction coordinate
+    atoms = []
     request = input(f"Atoms in your {rc_request} RC? (e.g., 1_2): ")
 
     # Check if RC is requested and onvert to a list even if it is hyphenated
     if request != "":
-        temp = [
-            (lambda sub: range(sub[0], sub[-1] + 1))(list(map(int, ele.split("-"))))
-            for ele in request.split("_")
-        ]
-        atoms = [b for a in temp for b in a]
+        atoms = parse_ranges(request, separator="_")
 
     return atoms, request
 
 
-def get_distance(atoms, xyz_file):
+def frame_distances(pairs, frame, index):
+    """
+    Distances between pairs of atoms in one xyz frame.
+
+    Only the lines of the requested atoms are parsed.
+    Used as a sharded frame transform, see pyqmmm.io.sharding.
+
+    Parameters
+    ----------
+    pairs : tuple
+        Pairs of 1-indexed atoms.
+    frame : bytes
+        Raw text of the xyz frame.
+    index : int
+        Zero-based frame index.
+
+    Returns
+    -------
+    distances : list
+        One distance per pair.
+
+    """
+    lines = frame.split(b"\n")
+    # Atom lines follow the atom count and title lines
+    coords = {
+        atom: np.array(lines[atom + 1].split()[1:4], dtype=float)
+        for pair in pairs for atom in pair
+    }
+    return [float(np.linalg.norm(coords[a] - coords[b])) for a, b in pairs]
+
+
+def get_distance(atoms, xyz_file, frames=None, n_workers=None):
     """
     Calculates the reaction coordinate at each step of the scan in the xyz file.
 
+    Frames are processed in parallel shards, see pyqmmm.io.sharding.
+    A half-written final frame of a running scan is ignored.
+
     Parameters
     ----------
     atoms : list
-        List of two atoms defining a reaction coordiante distance.
+        List of two atoms (1-indexed) defining a reaction coordiante distance.
+    xyz_file : str
+        The scan trajectory.
+    frames : list, optional
+        Zero-based frames to use, e.g., the converged frames from
+        converged_frames, so distances line up with their energies.
+        Defaults to every complete frame.
+    n_workers : int, optional
+        Number of worker processes, defaults to NSLOTS or the CPU count.
 
     Returns
     -------
@@ -44,53 +86,67 @@ def get_distance(atoms, xyz_file):
         List of values mapping to the distance that two atoms have moved.
 
     """
-    atom_count = 0
-    coords_list = []
+    # Consecutive pairs of requested atoms each define a distance
+    pairs = tuple(zip(atoms[0::2], atoms[1::2]))
+    transform = functools.partial(frame_distances, pairs)
+
     dist_list = []
-    with open(xyz_file, "r") as scan_optim:
-        for line in scan_optim:
-            if line[:9] == "Converged":
-                atom_count = 0
-            if atom_count in atoms:
-                line_elements = line.split()
-                coords = line_elements[1:4]
-                coords_list.append(list(map(float, coords)))
-                if len(coords_list) and len(coords_list) % 2 == 0:
-                    atom_1 = tuple(coords_list[-1])
-                    atom_2 = tuple(coords_list[-2])
-                    dist = distance.euclidean(atom_1, atom_2)
-                    dist_list.append(dist)
-            atom_count += 1
+    with XYZReader(xyz_file, allow_truncated=True) as traj:
+        if frames is not None:
+            # A growing trajectory can only have gained frames since the titles were read
+            frames = [frame for frame in frames if frame < len(traj)]
+        for frame_dists in map_frames(traj.data_path, traj.starts, traj.ends, transform, frames, n_workers):
+            dist_list.extend(frame_dists)
 
     return dist_list
 
 
-def get_opt_energies(xyz_file):
+def converged_frames(titles):
     """
-    Loop through the xyz file and collect optimized energies.
+    Frames of the scan trajectory that hold a converged geometry.
+
+    Parameters
+    ----------
+    titles : list
+        The title line of each frame of the scan trajectory.
 
     Returns
     -------
-    energy_df : dataframe
-        The optimized energy from the current convergence line of the file.
-    energy_list : list
-        Returns a list of the energies extracted from the .out file.
+    frames : list
+        Zero-based indices of the frames whose title starts with 'Converged'.
+
+    """
+    return [index for index, title in enumerate(titles) if title[:9] == "Converged"]
+
+
+def get_opt_energies(titles):
+    """
+    Collect optimized energies from the title lines of the scan trajectory.
+
+    Parameters
+    ----------
+    titles : list
+        The title line of each frame of the scan trajectory.
+
+    Returns
+    -------
+    DE_list : list
+        The optimized energies relative to the first frame in kcal/mol.
+    E_list : list
+        The absolute optimized energies in Hartrees.
 
     """
     DE_list = []
     E_list = []
-    with open(xyz_file, "r") as file:
-        first_energy = None
-        for line in file:
-            if line[:9] == "Converged":
-                line = line.split()
-                energy = float(line[4])
-                if first_energy is None:
-                    first_energy = energy
-                relative_energy = (energy - first_energy) * 627.5
-                absolute_energy = energy
-                DE_list.append(relative_energy)
-                E_list.append(absolute_energy)
+    first_energy = None
+    for index in converged_frames(titles):
+        energy = float(titles[index].split()[4])
+        if first_energy is None:
+            first_energy = energy
+        relative_energy = (energy - first_energy) * 627.5
+        absolute_energy = energy
+        DE_list.append(relative_energy)
+        E_list.append(absolute_energy)
 
     # Return lists of relative and absolute energies
     return DE_list, E_list
@@ -140,17 +196,23 @@ def reaction_coordinate_collector():
     else:
         xyz_file = input("   > What xyz file would you like to use?")
 
-    DE_list, E_list = get_opt_energies(xyz_file)
+    # Titles come from the frame index, coordinates are only parsed for the RC atoms
+    # Running scans are read up to their last complete frame
+    with XYZReader(xyz_file, allow_truncated=True) as traj:
+        titles = traj.titles()
+    # Distances are only computed for the converged frames that have an energy
+    frames = converged_frames(titles)
+    DE_list, E_list = get_opt_energies(titles)
     # Energy against first distance coordinate
     rc1_dist_atoms, rc1_request = request_rc("first")
     if rc1_request != "":
-        rc1_dist_list = get_distance(rc1_dist_atoms, xyz_file)
+        rc1_dist_list = get_distance(rc1_dist_atoms, xyz_file, frames)
         get_reaction_csv(rc1_dist_list, E_list, "rc1_v_energy")
 
     # Energy against second distance coordinate
     rc2_dist_atoms, rc2_request = request_rc("second")
     if rc2_request != "":
-        rc2_dist_list = get_distance(rc2_dist_atoms, xyz_file)
+        rc2_dist_list = get_distance(rc2_dist_atoms, xyz_file, frames)
         get_reaction_csv(rc2_dist_list, E_list, "rc2_v_energy")
 
     # Calculate differences of differences
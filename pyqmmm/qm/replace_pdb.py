@@ -1,5 +1,6 @@
 from Bio.PDB import PDBParser, PDBIO
 import pandas as pd
+from pyqmmm.io.xyz_reader import XYZReader
 
 
 def read_info(info_file_path):
@@ -7,21 +8,9 @@ def read_info(info_file_path):
 
 
 def read_xyz_last_frame(xyz_file_path):
-    with open(xyz_file_path, "r") as file:
-        lines = file.readlines()
-
-    # Determine the number of lines in one frame. The first two lines contain
-    # the atom count and a comment, respectively. The rest are atom lines.
-    num_atoms = int(lines[0].strip())
-    lines_per_frame = num_atoms + 2
-
-    # Get the lines of the final frame. Exclude the atom count and comment lines.
-    last_frame_lines = lines[-lines_per_frame + 2 :]
-
-    # Check if the last line is blank
-    if last_frame_lines[-1].strip() == "":
-        # If it is, remove it
-        last_frame_lines = last_frame_lines[:-1]
+    # Only the final frame is read, the rest of the trajectory is skipped via the frame index
+    with XYZReader(xyz_file_path) as traj:
+        last_frame_lines = traj.last().atoms
 
     # Split each line into its components and convert to float
     data = {"X": [], "Y": [], "Z": []}
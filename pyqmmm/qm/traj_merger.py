@@ -1,7 +1,10 @@
 """Combine frames into a single file."""
 
 import glob
-import caddkit.qm.reaction_coordinate_collector
+from contextlib import ExitStack
+import pyqmmm.qm.reaction_coordinate_collector
+from pyqmmm.io.frame_selection import write_views
+from pyqmmm.io.xyz_reader import XYZReader
 
 
 def get_xyz_filenames():
@@ -85,7 +88,7 @@ def request_frames(xyz_filename):
 
 def multiframe_xyz_to_list(xyz_filename):
     """
-    Turns an xyz trajectory file into a list of lists where each element is a frame.
+    Indexes the frames of an xyz trajectory file.
 
     Parameters
     ----------
@@ -94,34 +97,11 @@ def multiframe_xyz_to_list(xyz_filename):
 
     Returns
     -------
-    trajectory_list : list
-        List of lists containing the trajectory with each frame saved as an element.
+    xyz_as_list : XYZReader
+        The open, indexed trajectory. Frames are only read when written.
 
     """
-    # Variables that measure our progress in parsing the optim.xyz file
-    xyz_as_list = []  # List of lists containing all frames
-    frame_contents = ""
-    line_count = 0
-    frame_count = 0
-    first_line = True  # Marks if we've looked at the atom count yet
-
-    # Loop through optim.xyz and collect distances, energies and frame contents
-    with open(xyz_filename, "r") as trajectory:
-        for line in trajectory:
-            # We determine the section length using the atom count in first line
-            if first_line == True:
-                section_length = int(line.strip()) + 2
-                first_line = False
-            # At the end of the section reset the frame-specific variables
-            if line_count == section_length:
-                line_count = 0
-                xyz_as_list.append(frame_contents)
-                frame_contents = ""
-                frame_count += 1
-            frame_contents += line
-            line_count += 1
-
-        xyz_as_list.append(frame_contents)
+    xyz_as_list = XYZReader(xyz_filename)
 
     print(f"   > We found {len(xyz_as_list)} frames in {xyz_filename}.")
 
@@ -136,30 +116,26 @@ def combine_xyz_files():
     # Find xyz trajectories in the current directory
     combined_filename = "combined.xyz"
     xyz_filename_list = get_xyz_filenames()
-    # For each xyz file convert to a list with only the requested frames
+    # For each xyz file keep only the requested frames
     combined_xyz_list = []
-    for file in xyz_filename_list:
-        requested_frames = request_frames(file)
-        # The user can skip files by with enter which returns an empty string
-        if requested_frames == "":
-            continue
-        # Convert the xyz files to a list
-        xyz_list = multiframe_xyz_to_list(file)
-        requested_xyz_list = [
-            frame
-            for index, frame in enumerate(xyz_list)
-            if index + 1 in requested_frames
-        ]
-        # Ask the user if they want the frames reversed for a given xyz file
-        reverse = input(f"   > Any key to reverse {file} else Return: ")
-        if reverse:
-            requested_xyz_list.reverse()
-            reverse = False
-        combined_xyz_list += requested_xyz_list
-    # Write the combined trajectories out to a new file called combined.xyz
-    with open(combined_filename, "w") as combined_file:
-        for entry in combined_xyz_list:
-            combined_file.write(entry)
+    with ExitStack() as open_files:
+        for file in xyz_filename_list:
+            requested_frames = request_frames(file)
+            # The user can skip files by with enter which returns an empty string
+            if not requested_frames:
+                continue
+            xyz_list = open_files.enter_context(multiframe_xyz_to_list(file))
+            # Requested frames are 1-indexed and kept in file order
+            indices = sorted({frame - 1 for frame in requested_frames if 0 < frame <= len(xyz_list)})
+            requested_xyz_list = xyz_list.take(indices)
+            # Ask the user if they want the frames reversed for a given xyz file
+            reverse = input(f"   > Any key to reverse {file} else Return: ")
+            if reverse:
+                requested_xyz_list = reversed(requested_xyz_list)
+                reverse = False
+            combined_xyz_list.append(requested_xyz_list)
+        # Write the combined trajectories out to a new file called combined.xyz
+        write_views(combined_filename, combined_xyz_list)
     print(f"   > Your combined xyz was written to {combined_filename}\n")
 
 
@@ -188,7 +164,7 @@ def xyz_merger():
     # STEP 2: Perform reaction coordinate analysis
     perform_rc_analysis = input("   > Any key to perform analyze RC, else Return: ")
     if perform_rc_analysis:
-        reaction_coordinate_collector.reaction_coordinate_collector()
+        pyqmmm.qm.reaction_coordinate_collector.reaction_coordinate_collector()
 
 
 if __name__ == "__main__":
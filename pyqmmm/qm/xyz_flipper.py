@@ -1,10 +1,12 @@
 """Reverses an xyz trajectory, for example if it was run backwards for better convergence."""
 
 import os
+from pyqmmm.io.xyz_reader import XYZReader
+from pyqmmm.io.xyz_writer import XYZWriter
 
 def read_xyz(file):
     """
-    Read an xyz trajectory file and return a list of frames.
+    Index an xyz trajectory file without reading its frames.
 
     Parameters
     ----------
@@ -13,26 +15,10 @@ def read_xyz(file):
 
     Returns
     -------
-    frames : list
-        A list of tuples containing the number of atoms, title, and atom lines for each frame.
+    frames : XYZReader
+        The open, indexed trajectory. Use it as a context manager.
     """
-    frames = []
-    with open(file, 'r') as f:
-        while True:
-            line = f.readline()
-            if not line:
-                break
-            line = line.strip()
-            if not line:  # Skip empty lines
-                continue
-            natoms = int(line)
-            title = f.readline().strip()
-            atoms = []
-            for _ in range(natoms):
-                atom_line = f.readline().strip()
-                atoms.append(atom_line)
-            frames.append((natoms, title, atoms))
-    return frames
+    return XYZReader(file)
 
 def write_xyz(file, frames):
     """
@@ -42,15 +28,12 @@ def write_xyz(file, frames):
     ----------
     file : str
         The name of the output xyz file.
-    frames : list
-        A list of tuples containing the number of atoms, title, and atom lines for each frame.
+    frames : FrameView
+        The frames to write, copied verbatim from the input.
     """
-    with open(file, 'w') as f:
-        for natoms, title, atoms in frames:
-            f.write(f'{natoms}\n')
-            f.write(f'{title}\n')
-            for atom_line in atoms:
-                f.write(f'{atom_line}\n')
+    with XYZWriter(file) as writer:
+        for index in range(len(frames)):
+            writer.write_raw(frames.frame_bytes(index))
 
 def xyz_flipper(input_file):
     """
@@ -77,14 +60,13 @@ def xyz_flipper(input_file):
     xyz_file = f"{input_file}.xyz"
     output_file = f"{input_file}_reversed.xyz"
 
-    # Read frames from the input file
-    frames = read_xyz(xyz_file)
+    # Index the frames of the input file, they are only read when written
+    with read_xyz(xyz_file) as frames:
+        # Reverse the order of the frames
+        frames_reversed = reversed(frames)
 
-    # Reverse the order of the frames
-    frames_reversed = list(reversed(frames))
-
-    # Write the reversed frames to the output file
-    write_xyz(output_file, frames_reversed)
+        # Write the reversed frames to the output file
+        write_xyz(output_file, frames_reversed)
 
     print(f"Reversed trajectory written to {output_file}")
 
@@ -0,0 +1,12 @@
+"""
+Command-line tools of the pyqmmm qmmm group, see pyqmmm.registry.
+"""
+
+from pyqmmm.registry import Tool, tool_group
+
+TOOLS = (
+    Tool("quick_csa", "-csa", "Performs charge shift analysis.", "pyqmmm.qmmm.quickcsa:quick_csa",
+         "Charge shift analysis:"),
+)
+
+command = tool_group("qmmm", "Functions for multiscale QM/MM simulations.", TOOLS)
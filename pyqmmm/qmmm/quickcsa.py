@@ -11,6 +11,7 @@ import sys
 import shutil
 import csv
 from typing import List
+from pyqmmm.io.selection import parse_ranges
 
 def clean_dir() -> str:
     """
@@ -83,14 +84,7 @@ def get_mask_res(type) -> List:
     """
     try:
         with open(f"./1_input/{type}_list") as mask_res_file:
-            mask_str = mask_res_file.read().strip()
-            mask_list = []
-            for part in mask_str.split(","):
-                if "-" in part:
-                    start, end = map(int, part.split("-"))
-                    mask_list.extend(range(start, end+1))
-                else:
-                    mask_list.append(int(part))
+            mask_list = parse_ranges(mask_res_file.read())
     except FileNotFoundError:
         print(f"   > File {type}_list does not exist")
         sys.exit()
@@ -115,6 +109,7 @@ def mask_maker(mask, pdb_name, type) -> None:
         Indicates whether the mask is for 'apo' or 'holo'.
     """
     print(f"   > Creating the {type} mask")
+    mask = set(mask)
     res_type_array = []
     new_pdb = f"{type}_mask"
     # Select the correct reference PDB for reading atoms.
@@ -0,0 +1,131 @@
+"""
+Lazily loaded registry of the pyqmmm command-line tools.
+
+Each command group (io, md, qm, qmmm) declares its tools in a commands
+module as Tool records. A tool names the function that runs it as a
+'module:function' string, so the tool module and its heavy dependencies
+(pandas, matplotlib, MDAnalysis) are only imported when the tool is
+selected, never for --help. The group modules themselves are only
+imported when their group is invoked, see LazyGroup.
+
+Adding a tool means adding one Tool to the TOOLS of its group. Every tool
+runs inside a profiling span named after it, see pyqmmm.profiling.
+"""
+
+import importlib
+from typing import Callable, NamedTuple, Tuple, Union
+
+import click
+
+from pyqmmm.profiling import span
+
+CONTEXT_SETTINGS = {"help_option_names": ["--help", "-h"]}
+
+
+class Tool(NamedTuple):
+    """
+    Declaration of a command-line tool.
+
+    Attributes
+    ----------
+    name : str
+        Name of the flag, e.g., 'flip_xyz' for --flip_xyz.
+    short : str
+        Short flag, e.g., '-f'.
+    help : str
+        Help text of the flag.
+    run : str or callable
+        'module:function' imported when the tool runs, or the function itself.
+    message : str
+        Printed with 'Loading...' before the tool module is imported.
+    options : tuple of str
+        Names of extra group options passed to run as keyword arguments.
+    """
+
+    name: str
+    short: str
+    help: str
+    run: Union[str, Callable]
+    message: str = ""
+    options: Tuple[str, ...] = ()
+
+
+def resolve(target):
+    """
+    Import the object named by a 'module:attribute' string.
+
+    Parameters
+    ----------
+    target : str or callable
+        The import path, callables are returned unchanged.
+
+    Returns
+    -------
+    object
+    """
+    if callable(target):
+        return target
+    module, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module), attribute)
+
+
+def tool_group(name, help, tools, options=()):
+    """
+    Build the click command of a tool group with one flag per tool.
+
+    Selected tools run in the order they are declared.
+
+    Parameters
+    ----------
+    name : str
+        Name of the command, e.g., 'qm'.
+    help : str
+        Help text of the command.
+    tools : sequence of Tool
+        The tools of the group.
+    options : sequence of click.Option
+        Extra options used by some of the tools, see Tool.options.
+
+    Returns
+    -------
+    click.Command
+    """
+    params = [click.Option([f"--{tool.name}", tool.short], is_flag=True, help=tool.help) for tool in tools]
+    params.extend(options)
+
+    def callback(**values):
+        for tool in tools:
+            if not values[tool.name]:
+                continue
+            if tool.message:
+                click.echo(tool.message)
+                click.echo("Loading...")
+            with span(tool.name):
+                with span("import"):
+                    run = resolve(tool.run)
+                run(**{option: values[option] for option in tool.options})
+
+    return click.Command(name, params=params, callback=callback, help=help, context_settings=CONTEXT_SETTINGS)
+
+
+class LazyGroup(click.Group):
+    """
+    Click group whose subcommands are imported on first use.
+
+    Parameters
+    ----------
+    lazy_commands : dict
+        Maps a subcommand name to the 'module:attribute' of its click command.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, name):
+        if name in self.lazy_commands:
+            return resolve(self.lazy_commands[name])
+        return super().get_command(ctx, name)
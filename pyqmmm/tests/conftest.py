@@ -0,0 +1,144 @@
+"""
+Shared pytest configuration, including the opt-in benchmark suite.
+
+Benchmarks are marked with @pytest.mark.benchmark and skipped unless
+PYQMMM_BENCHMARK=1 is set. Each one reports its time, throughput in
+frames/s and MB/s, and peak Python memory traced by tracemalloc.
+The suite is configured with environment variables:
+
+PYQMMM_BENCHMARK_SCALE
+    Factor applied to the frame counts, defaults to 1.
+PYQMMM_BENCHMARK_JSON
+    Save the results to this JSON file.
+PYQMMM_BENCHMARK_COMPARE
+    Fail benchmarks whose frames/s dropped against this saved JSON file.
+PYQMMM_BENCHMARK_TOLERANCE
+    Allowed fractional slowdown for the comparison, defaults to 0.25.
+
+    PYQMMM_BENCHMARK=1 PYQMMM_BENCHMARK_JSON=bench.json python -m pytest pyqmmm/tests/test_benchmarks.py
+"""
+
+import json
+import os
+import time
+import tracemalloc
+
+import pytest
+
+_RESULTS = []
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: throughput benchmark, only run with PYQMMM_BENCHMARK=1")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv("PYQMMM_BENCHMARK", "0") != "0":
+        return
+    skip = pytest.mark.skip(reason="benchmarks need PYQMMM_BENCHMARK=1")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+class Benchmark:
+    """
+    Measure one call of a parser or writer.
+
+    Parameters
+    ----------
+    name : str
+        Identifier of the benchmark, the pytest node id.
+    scale : float
+        Factor applied to the frame counts, see frames().
+    baseline : dict
+        Results of a saved run keyed by name, for regression checks.
+    tolerance : float
+        Allowed fractional drop in frames/s.
+    """
+
+    def __init__(self, name, scale=1.0, baseline=None, tolerance=0.25):
+        self.name = name
+        self.scale = scale
+        self.baseline = baseline or {}
+        self.tolerance = tolerance
+
+    def frames(self, n_frames):
+        """Frame count scaled by PYQMMM_BENCHMARK_SCALE."""
+        return max(1, int(n_frames * self.scale))
+
+    def __call__(self, function, *args, frames, nbytes, **kwargs):
+        """
+        Time function(*args, **kwargs), then trace its peak memory in a second call.
+
+        Parameters
+        ----------
+        frames : int
+            Number of frames processed by the call.
+        nbytes : int
+            Number of bytes read or written by the call.
+
+        Returns
+        -------
+        object
+            The return value of the timed call.
+        """
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        seconds = time.perf_counter() - start
+
+        tracemalloc.start()
+        try:
+            function(*args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        record = {
+            "name": self.name,
+            "seconds": seconds,
+            "frames": frames,
+            "bytes": nbytes,
+            "frames_per_s": frames / seconds,
+            "mb_per_s": nbytes / seconds / 1e6,
+            "peak_mb": peak / 1e6,
+        }
+        _RESULTS.append(record)
+        previous = self.baseline.get(self.name)
+        if previous is not None:
+            floor = previous["frames_per_s"] * (1 - self.tolerance)
+            assert record["frames_per_s"] >= floor, (
+                f"{self.name} regressed to {record['frames_per_s']:.0f} frames/s "
+                f"from {previous['frames_per_s']:.0f} frames/s"
+            )
+        return result
+
+
+@pytest.fixture
+def benchmark(request):
+    """Benchmark helper for the current test, see Benchmark."""
+    baseline = None
+    if os.getenv("PYQMMM_BENCHMARK_COMPARE"):
+        with open(os.getenv("PYQMMM_BENCHMARK_COMPARE")) as f:
+            baseline = {record["name"]: record for record in json.load(f)}
+    return Benchmark(
+        request.node.nodeid,
+        scale=float(os.getenv("PYQMMM_BENCHMARK_SCALE", "1")),
+        baseline=baseline,
+        tolerance=float(os.getenv("PYQMMM_BENCHMARK_TOLERANCE", "0.25")),
+    )
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not _RESULTS:
+        return
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(f"{'benchmark':<70s} {'s':>8s} {'frames/s':>12s} {'MB/s':>8s} {'peak MB':>8s}")
+    for record in _RESULTS:
+        terminalreporter.write_line(
+            f"{record['name'].split('::')[-1]:<70s} {record['seconds']:8.3f} {record['frames_per_s']:12.0f} "
+            f"{record['mb_per_s']:8.1f} {record['peak_mb']:8.1f}"
+        )
+    if os.getenv("PYQMMM_BENCHMARK_JSON"):
+        with open(os.getenv("PYQMMM_BENCHMARK_JSON"), "w") as f:
+            json.dump(_RESULTS, f, indent=2)
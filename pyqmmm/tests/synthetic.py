@@ -0,0 +1,172 @@
+"""
+Generators of synthetic input files for the tests and benchmarks.
+
+Each generator writes a file in the format produced by TeraChem, ORCA,
+cpptraj, or MMPBSA.py with random but reproducible contents, sized by the
+number of frames and atoms, and returns the number of bytes written.
+"""
+
+import numpy as np
+
+ELEMENTS = ("C", "H", "N", "O", "S", "Fe")
+RESIDUES = ("ALA", "ARG", "ASP", "GLU", "HIS", "LYS", "SER", "TYR")
+
+
+def _rng(seed):
+    return np.random.default_rng(seed)
+
+
+def _write(path, text):
+    data = text.encode()
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def coordinates(n_frames, n_atoms, seed=0):
+    """Random walk coordinates in Angstrom with shape (n_frames, n_atoms, 3)."""
+    rng = _rng(seed)
+    start = rng.uniform(-30, 30, size=(1, n_atoms, 3))
+    return start + np.cumsum(rng.normal(scale=0.05, size=(n_frames, n_atoms, 3)), axis=0)
+
+
+def xyz_trajectory(path, n_frames, n_atoms, allxyz=False, seed=0):
+    """TeraChem scan_optim.xyz style trajectory, or an ORCA allxyz with '>' separators."""
+    coords = coordinates(n_frames, n_atoms, seed)
+    elements = [ELEMENTS[i % len(ELEMENTS)] for i in range(n_atoms)]
+    energies = -1500.0 + _rng(seed + 1).normal(scale=0.01, size=n_frames)
+    atom_template = "".join(f"{element:<2s} %15.10f %15.10f %15.10f\n" for element in elements)
+    frames = []
+    for index in range(n_frames):
+        title = f"Converged     Job  {index + 1}  Energy  {energies[index]:.10f}\n"
+        frames.append(f"{n_atoms}\n{title}" + atom_template % tuple(coords[index].ravel()))
+    return _write(path, (">\n" if allxyz else "").join(frames))
+
+
+def pdb_atoms(n_atoms):
+    """ATOM records of a template with residues of ten atoms."""
+    lines = []
+    for index in range(n_atoms):
+        resname = RESIDUES[(index // 10) % len(RESIDUES)]
+        element = ELEMENTS[index % 4]
+        name = f"{element}{index % 10}"
+        lines.append(
+            f"ATOM  {index + 1:5d} {name:<4s} {resname} A{index // 10 + 1:4d}    "
+            f"{0.0:8.3f}{0.0:8.3f}{0.0:8.3f}  1.00  0.00          {element:>2s}\n"
+        )
+    return lines
+
+
+def pdb_trajectory(path, n_frames, n_atoms, seed=0):
+    """Multi-model PDB trajectory with MODEL/ENDMDL blocks."""
+    coords = coordinates(n_frames, n_atoms, seed)
+    template = "".join(line[:30] + "%8.3f%8.3f%8.3f" + line[54:] for line in pdb_atoms(n_atoms))
+    parts = ["REMARK   synthetic trajectory\n"]
+    for index in range(n_frames):
+        parts.append(f"MODEL     {index + 1:4d}\n" + template % tuple(coords[index].ravel()) + "TER\nENDMDL\n")
+    parts.append("END\n")
+    return _write(path, "".join(parts))
+
+
+def hbond_gnu(path, n_frames, n_bonds, seed=0):
+    """cpptraj hbond time series in gnuplot format (hbond.gnu)."""
+    rng = _rng(seed)
+    labels = []
+    for index in range(n_bonds):
+        acceptor = f"{RESIDUES[index % len(RESIDUES)]}_{index + 1}"
+        donor = f"{RESIDUES[(index + 3) % len(RESIDUES)]}_{index + 100}"
+        atom = ("O", "OD1", "N", "NZ")[index % 4]
+        labels.append(f'"{acceptor}@{atom}-{donor}@N-{donor}@H" {index + 1}')
+    header = [
+        'set xlabel "Frame"',
+        'set ylabel "Hbond"',
+        f"set yrange [0.0:{n_bonds + 1}.0]",
+        f"set xrange [0.0:{n_frames + 1}.0]",
+        "set cbrange [0:1]",
+        f"set ytics({','.join(labels)})",
+        "set pm3d map corners2color c1",
+        'splot "-" with pm3d title "hbond.gnu"',
+    ]
+    present = rng.random((n_frames, n_bonds)) < 0.3
+    frames = [
+        "\n".join(f"{frame + 1} {bond + 1} {int(present[frame, bond])}" for bond in range(n_bonds))
+        for frame in range(n_frames)
+    ]
+    return _write(path, "\n".join(header) + "\n" + "\n\n".join(frames) + "\nend\n")
+
+
+def cnumvtime(path, n_frames, n_clusters=5, seed=0):
+    """cpptraj cluster number against time (cnumvtime.dat)."""
+    clusters = _rng(seed).integers(0, n_clusters, size=n_frames)
+    rows = "".join(f"{frame + 1:8d} {cluster:8d}\n" for frame, cluster in enumerate(clusters))
+    return _write(path, "#Frame     c0\n" + rows)
+
+
+def dssp(path, n_frames, n_residues, seed=0):
+    """cpptraj DSSP secondary structure per residue and frame (dssp.dat)."""
+    states = _rng(seed).integers(0, 8, size=(n_frames, n_residues))
+    header = "#Frame " + " ".join(f"{RESIDUES[i % len(RESIDUES)]}:{i + 1}" for i in range(n_residues))
+    rows = "".join(f"{frame + 1} " + " ".join(map(str, row)) + "\n" for frame, row in enumerate(states))
+    return _write(path, header + "\n" + rows)
+
+
+def mmpbsa_decomp(path, n_residues, seed=0):
+    """MMPBSA.py pairwise decomposition output (FINAL_DECOMP_MMPBSA_24.dat)."""
+    values = _rng(seed).normal(size=(n_residues, 18))
+    lines = ["| Run on synthetic data", "D,E,L,T,A,S,:", "T,o,t,a,l, ,E,n,e,r,g,y, ,D,e,c,o,m,p,o,s,i,t,i,o,n,:",
+             "Resid 1,Resid 2,Internal,,,van der Waals,,,Electrostatic,,,Polar Solvation,,,"
+             "Non-Polar Solv.,,,TOTAL,,", ",,Avg.,Std. Dev.,Std. Err. of Mean"]
+    for index in range(n_residues):
+        numbers = " ".join(f"{value:.3f}" for value in values[index])
+        lines.append(f"LIG 355 {RESIDUES[index % len(RESIDUES)]} {index + 1} {numbers}")
+    lines.append("S,i,d,e,c,h,a,i,n, ,E,n,e,r,g,y, ,D,e,c,o,m,p,o,s,i,t,i,o,n,:")
+    return _write(path, "\n".join(lines) + "\n")
+
+
+def orca_output(path, n_steps, n_atoms=20, seed=0):
+    """ORCA relaxed surface scan output with per-step energies and the final surface table."""
+    rng = _rng(seed)
+    energies = -1500.0 + rng.normal(scale=0.01, size=n_steps)
+    distances = np.linspace(1.5, 3.0, n_steps)
+    parts = []
+    for step in range(n_steps):
+        parts.append(f"*** RELAXED SURFACE SCAN STEP {step + 1} ***\n")
+        parts.append("".join(f"  {i:4d} {ELEMENTS[i % 4]:<2s}  {rng.normal():10.6f}\n" for i in range(n_atoms)))
+        parts.append(f"FINAL SINGLE POINT ENERGY     {energies[step]:.12f}\n")
+    parts.append("Final Gibbs free energy         ...  -1499.98765432 Eh\n")
+    parts.append("G-E(el)                           ...      0.12345678 Eh     77.47 kcal/mol\n")
+    parts.append("The Calculated Surface using the 'Actual Energy'\n")
+    parts.append("".join(f"  {d:.8f} {e:.12f}\n" for d, e in zip(distances, energies)))
+    parts.append("\n")
+    return _write(path, "".join(parts))
+
+
+def terachem_scan(directory, n_scans, n_iterations, n_atoms, seed=0):
+    """
+    TeraChem scan outputs: qmscript.out, scr/mullpop, and scr/charge_mull.xls.
+
+    Every scan step takes n_iterations optimization steps, each with a
+    Mulliken spin and charge section of n_atoms atoms.
+    """
+    rng = _rng(seed)
+    scr = directory / "scr"
+    scr.mkdir(exist_ok=True)
+    out = []
+    for scan in range(n_scans):
+        out.extend(f"FINAL ENERGY: {-1500.0 + rng.normal() * 0.01:.10f} a.u.\n" for _ in range(n_iterations))
+        out.append(f"-=#=- Optimized Energy: {-1500.0 + rng.normal() * 0.01:.10f} a.u.\n")
+    size = _write(directory / "qmscript.out", "".join(out))
+
+    n_sections = n_scans * n_iterations
+    atom_lines = [f"{i + 1:6d} {ELEMENTS[i % 4]:>3s}" for i in range(n_atoms)]
+    spins = rng.normal(scale=0.1, size=(n_sections, n_atoms))
+    charges = rng.normal(scale=0.3, size=(n_sections, n_atoms))
+    mullpop = []
+    xls = []
+    for section in range(n_sections):
+        mullpop.append(f"{'':29s}Spin-Averaged Mulliken Populations\n")
+        mullpop.extend(f"{line} {spin:12.6f}\n" for line, spin in zip(atom_lines, spins[section]))
+        xls.extend(f"{line} {charge:12.6f}\n" for line, charge in zip(atom_lines, charges[section]))
+    size += _write(scr / "mullpop", "".join(mullpop))
+    size += _write(scr / "charge_mull.xls", "".join(xls))
+    return size
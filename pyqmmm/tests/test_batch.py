@@ -0,0 +1,25 @@
+"""
+Unit tests for the non-interactive batch runner.
+"""
+
+import csv
+
+from pyqmmm.batch import run_batch
+
+XYZ = "1\nE -1.0\nH 0.0 0.0 0.0\n1\nE -2.0\nH 0.0 0.0 1.0\n"
+
+
+def test_flip_across_directories(tmp_path, monkeypatch):
+    for name in ("rep1", "rep2", "rep3"):
+        (tmp_path / name).mkdir()
+    for name in ("rep1", "rep2"):
+        (tmp_path / name / "scan.xyz").write_text(XYZ)
+    monkeypatch.chdir(tmp_path)
+
+    results = run_batch("qm --flip_xyz", "rep*", answers=["scan"], n_workers=1)
+
+    assert [result.status for result in results] == ["ok", "ok", "failed"]
+    assert (tmp_path / "rep1" / "scan_reversed.xyz").read_text().startswith("1\nE -2.0\n")
+    assert "scan" in (tmp_path / "rep2" / "pyqmmm_batch.log").read_text()
+    with open(tmp_path / "batch_summary.csv") as f:
+        assert len(list(csv.reader(f))) == 4
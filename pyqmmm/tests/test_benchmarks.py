@@ -0,0 +1,216 @@
+"""
+Throughput benchmarks of the trajectory and output parsers on synthetic data.
+
+Skipped by default, run them with PYQMMM_BENCHMARK=1, see conftest.py.
+Each benchmark is parameterized over trajectory shapes, either many frames
+of a small system or fewer frames of a large one.
+"""
+
+import numpy as np
+import pytest
+
+from pyqmmm.io import pdb_reader
+from pyqmmm.io.binary_trajectory import open_writer
+from pyqmmm.io.delete_xyz_trj_atoms import stream_atoms_from_xyz
+from pyqmmm.io.pdb_rewriter import rigid_transform_pdb
+from pyqmmm.io.trajectory import Trajectory
+from pyqmmm.io.xyz2pdb import xyz2pdb_traj
+from pyqmmm.io.xyz_reader import XYZReader
+from pyqmmm.io.xyz_writer import XYZWriter
+from pyqmmm.md.cluster_frame_indexer import get_clusters
+from pyqmmm.qm import pes_organizer
+from pyqmmm.qm.extract_electronic_energies import parse_final_energy
+from pyqmmm.qm.extract_gibbs_free_energies import parse_orca_out
+from pyqmmm.tests import synthetic
+
+pytestmark = pytest.mark.benchmark
+
+SHAPES = [(2000, 50), (200, 1000)]  # (frames, atoms)
+
+
+@pytest.fixture(autouse=True)
+def no_traj_cache(monkeypatch):
+    # The timed and traced calls must both parse, not load a sidecar index
+    monkeypatch.setenv("PYQMMM_TRAJ_CACHE", "0")
+
+
+@pytest.fixture
+def xyz_file(tmp_path, benchmark, request):
+    n_frames, n_atoms = request.param
+    n_frames = benchmark.frames(n_frames)
+    path = tmp_path / "traj.xyz"
+    nbytes = synthetic.xyz_trajectory(path, n_frames, n_atoms)
+    return path, n_frames, n_atoms, nbytes
+
+
+@pytest.fixture
+def pdb_file(tmp_path, benchmark, request):
+    n_frames, n_atoms = request.param
+    n_frames = benchmark.frames(n_frames)
+    path = tmp_path / "traj.pdb"
+    nbytes = synthetic.pdb_trajectory(path, n_frames, n_atoms)
+    return path, n_frames, n_atoms, nbytes
+
+
+def _index_titles(path):
+    with XYZReader(path) as traj:
+        return traj.titles()
+
+
+@pytest.mark.parametrize("xyz_file", SHAPES, indirect=True)
+def test_xyz_index(benchmark, xyz_file):
+    path, n_frames, _, nbytes = xyz_file
+    titles = benchmark(_index_titles, path, frames=n_frames, nbytes=nbytes)
+    assert len(titles) == n_frames
+
+
+@pytest.mark.parametrize("xyz_file", SHAPES, indirect=True)
+def test_xyz_coordinates(benchmark, xyz_file):
+    path, n_frames, n_atoms, nbytes = xyz_file
+    traj = benchmark(Trajectory.from_xyz, path, frames=n_frames, nbytes=nbytes)
+    assert traj.coordinates.shape == (n_frames, n_atoms, 3)
+
+
+def _write_xyz(path, coordinates, elements, titles):
+    with XYZWriter(path) as writer:
+        writer.write_frames(coordinates, elements, titles)
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_xyz_writer(benchmark, tmp_path, shape):
+    n_frames, n_atoms = benchmark.frames(shape[0]), shape[1]
+    coordinates = synthetic.coordinates(n_frames, n_atoms)
+    elements = ["C"] * n_atoms
+    titles = [f"frame {index}" for index in range(n_frames)]
+    path = tmp_path / "out.xyz"
+    benchmark(_write_xyz, path, coordinates, elements, titles, frames=n_frames, nbytes=coordinates.nbytes)
+    assert path.stat().st_size > 0
+
+
+@pytest.mark.parametrize("xyz_file", SHAPES, indirect=True)
+def test_xyz2pdb(benchmark, tmp_path, xyz_file):
+    path, n_frames, n_atoms, nbytes = xyz_file
+    template = tmp_path / "template.pdb"
+    template.write_text("".join(synthetic.pdb_atoms(n_atoms)) + "END\n")
+    output = tmp_path / "out.pdb"
+    benchmark(xyz2pdb_traj, str(path), str(output), str(template), n_workers=1, frames=n_frames, nbytes=nbytes)
+    assert output.read_text().count("ENDMDL") == n_frames
+
+
+@pytest.mark.parametrize("xyz_file", SHAPES, indirect=True)
+def test_delete_xyz_atoms(benchmark, tmp_path, xyz_file):
+    path, n_frames, n_atoms, nbytes = xyz_file
+    output = tmp_path / "out.xyz"
+    remove = list(range(1, n_atoms // 2))
+    benchmark(stream_atoms_from_xyz, str(path), str(output), remove, n_workers=1, frames=n_frames, nbytes=nbytes)
+    assert output.stat().st_size < nbytes
+
+
+def _translate_pdb(path, output):
+    with pdb_reader.PDBReader(path) as traj:
+        pdb_reader.write_frames(traj, output, transforms=[pdb_reader.translate((1.0, 2.0, 3.0))], n_workers=1)
+
+
+@pytest.mark.parametrize("pdb_file", SHAPES, indirect=True)
+def test_pdb_translate(benchmark, tmp_path, pdb_file):
+    path, n_frames, _, nbytes = pdb_file
+    output = tmp_path / "out.pdb"
+    benchmark(_translate_pdb, str(path), str(output), frames=n_frames, nbytes=nbytes)
+    assert output.read_text().count("ENDMDL") == n_frames
+
+
+@pytest.mark.parametrize("pdb_file", SHAPES, indirect=True)
+def test_pdb_rigid_transform(benchmark, tmp_path, pdb_file):
+    path, n_frames, _, nbytes = pdb_file
+    output = tmp_path / "out.pdb"
+    rotation = np.array([[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    benchmark(rigid_transform_pdb, str(path), rotation, (1.0, 2.0, 3.0), str(output), frames=n_frames, nbytes=nbytes)
+    assert output.stat().st_size == nbytes
+
+
+def _write_binary(path, coordinates):
+    with open_writer(path, coordinates.shape[1]) as writer:
+        writer.write(coordinates)
+
+
+@pytest.mark.parametrize("extension", [".dcd", ".nc"])
+@pytest.mark.parametrize("shape", SHAPES)
+def test_binary_writer(benchmark, tmp_path, shape, extension):
+    n_frames, n_atoms = benchmark.frames(shape[0]), shape[1]
+    coordinates = synthetic.coordinates(n_frames, n_atoms)
+    path = str(tmp_path / f"out{extension}")
+    benchmark(_write_binary, path, coordinates, frames=n_frames, nbytes=coordinates.nbytes)
+
+
+@pytest.mark.parametrize("n_frames", [100000])
+def test_cluster_frames(benchmark, tmp_path, n_frames):
+    n_frames = benchmark.frames(n_frames)
+    path = tmp_path / "cnumvtime.dat"
+    nbytes = synthetic.cnumvtime(path, n_frames)
+    clusters = benchmark(get_clusters, str(path), frames=n_frames, nbytes=nbytes)
+    assert 0 < len(clusters) < n_frames
+
+
+@pytest.mark.parametrize("parser", [parse_final_energy, parse_orca_out])
+def test_orca_energies(benchmark, tmp_path, parser):
+    n_steps = benchmark.frames(2000)
+    path = tmp_path / "orca.out"
+    nbytes = synthetic.orca_output(path, n_steps)
+    assert all(benchmark(parser, str(path), frames=n_steps, nbytes=nbytes))
+
+
+def _organize():
+    final_scan_position, _ = pes_organizer.get_iteration_pairs()
+    pes_organizer.get_scan_spins(final_scan_position)
+    return pes_organizer.get_scan_charges(final_scan_position)
+
+
+@pytest.mark.parametrize("shape", [(100, 200)])
+def test_pes_organizer(benchmark, tmp_path, monkeypatch, shape):
+    n_scans, n_atoms = benchmark.frames(shape[0]), shape[1]
+    nbytes = synthetic.terachem_scan(tmp_path, n_scans, n_iterations=5, n_atoms=n_atoms)
+    monkeypatch.chdir(tmp_path)
+    charges = benchmark(_organize, frames=n_scans * 5, nbytes=nbytes)
+    assert len(charges) == n_scans
+
+
+@pytest.mark.parametrize("shape", [(5000, 100)])
+def test_hbond_occurrences(benchmark, tmp_path, shape):
+    hbond_analyzer = pytest.importorskip("pyqmmm.md.hbond_analyzer")
+    n_frames, n_bonds = benchmark.frames(shape[0]), shape[1]
+    path = tmp_path / "hbond.gnu"
+    nbytes = synthetic.hbond_gnu(path, n_frames, n_bonds)
+    labels = hbond_analyzer.bond_labels(str(path), ignore_backbone=False)
+    _, frame_count = benchmark(hbond_analyzer.count_occurrences, str(path), labels, frames=n_frames, nbytes=nbytes)
+    assert frame_count == n_frames
+
+
+@pytest.mark.parametrize("n_residues", [5000])
+def test_gbsa_decomposition(benchmark, tmp_path, monkeypatch, n_residues):
+    gbsa_analyzer = pytest.importorskip("pyqmmm.md.gbsa_analyzer")
+    n_residues = benchmark.frames(n_residues)
+    path = tmp_path / "FINAL_DECOMP_MMPBSA_24.dat"
+    nbytes = synthetic.mmpbsa_decomp(path, n_residues)
+    monkeypatch.chdir(tmp_path)
+    df = benchmark(gbsa_analyzer.get_gbsa_df, str(path), [], frames=n_residues, nbytes=nbytes)
+    assert len(df) == n_residues
+
+
+@pytest.mark.parametrize("shape", [(20000, 100)])
+def test_dssp(benchmark, tmp_path, monkeypatch, shape):
+    dssp_plotter = pytest.importorskip("pyqmmm.md.dssp_plotter")
+    n_frames, n_residues = benchmark.frames(shape[0]), shape[1]
+    path = tmp_path / "dssp.dat"
+    nbytes = synthetic.dssp(path, n_frames, n_residues)
+    monkeypatch.chdir(tmp_path)
+    benchmark(dssp_plotter.process_data, str(path), frames=n_frames, nbytes=nbytes)
+
+
+@pytest.mark.parametrize("n_steps", [2000])
+def test_orca_scan(benchmark, tmp_path, n_steps):
+    orca_scan_plotter = pytest.importorskip("pyqmmm.qm.orca_scan_plotter")
+    n_steps = benchmark.frames(n_steps)
+    path = tmp_path / "orca.out"
+    nbytes = synthetic.orca_output(path, n_steps)
+    distances, _ = benchmark(orca_scan_plotter.read_orca_output, str(path), frames=n_steps, nbytes=nbytes)
+    assert len(distances) == n_steps
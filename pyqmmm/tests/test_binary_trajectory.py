@@ -0,0 +1,35 @@
+"""
+Unit tests for the DCD and AMBER NetCDF trajectory writers.
+"""
+
+import struct
+
+import numpy as np
+from scipy.io import netcdf_file
+
+from pyqmmm.io.binary_trajectory import open_writer
+
+
+def test_netcdf_follows_amber_convention(tmp_path):
+    coordinates = np.random.default_rng(0).random((4, 3, 3)) * 10
+    with open_writer(tmp_path / "traj.nc", 3) as writer:
+        writer.write(coordinates[:1])
+        writer.write(coordinates[1:])
+
+    with netcdf_file(tmp_path / "traj.nc", "r", mmap=False) as nc:
+        assert nc.Conventions == b"AMBER"
+        assert nc.variables["coordinates"].units == b"angstrom"
+        assert np.allclose(nc.variables["coordinates"][:], coordinates, atol=1e-5)
+        assert nc.variables["time"][:].tolist() == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_dcd_records(tmp_path):
+    coordinates = np.arange(18, dtype=float).reshape(2, 3, 3)
+    with open_writer(tmp_path / "traj.dcd", 3) as writer:
+        writer.write(coordinates)
+
+    data = (tmp_path / "traj.dcd").read_bytes()
+    assert data[4:8] == b"CORD" and struct.unpack("<i", data[8:12])[0] == 2
+    # Header records of 84, 84, and 4 bytes, each with two length markers
+    frames = np.frombuffer(data[4 * 6 + 84 + 84 + 4:], dtype="<f4").reshape(2, 3, 5)
+    assert np.array_equal(frames[:, :, 1:-1], coordinates.transpose(0, 2, 1))
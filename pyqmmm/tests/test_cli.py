@@ -0,0 +1,51 @@
+"""
+Startup benchmark and registry checks for the command-line interface.
+"""
+
+import ast
+import importlib.util
+import json
+import subprocess
+import sys
+
+import pytest
+
+from pyqmmm.registry import Tool
+
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib", "scipy", "MDAnalysis", "pyqmmm.io.xyz_reader")
+STARTUP_BUDGET = 1.0  # Seconds to import the CLI and render every help page
+
+STARTUP = f"""
+import json, sys, time
+start = time.perf_counter()
+from pyqmmm.cli import cli
+for command in ([], ["io"], ["md"], ["qm"], ["qmmm"], ["batch"]):
+    try:
+        cli.main(command + ["--help"], prog_name="pyqmmm", standalone_mode=False)
+    except SystemExit:
+        pass
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))
+"""
+
+
+def test_help_is_fast_and_light():
+    # A fresh interpreter so modules imported by other tests do not count
+    output = subprocess.run([sys.executable, "-c", STARTUP], capture_output=True, text=True, check=True).stdout
+    elapsed, imported = json.loads(output.splitlines()[-1])
+    assert imported == []
+    assert elapsed < STARTUP_BUDGET
+
+
+@pytest.mark.parametrize("group", ["io", "md", "qm", "qmmm"])
+def test_tool_targets_exist(group):
+    tools = importlib.import_module(f"pyqmmm.{group}.commands").TOOLS
+    assert all(isinstance(tool, Tool) for tool in tools)
+    for tool in tools:
+        if callable(tool.run):
+            continue
+        # Check the target without importing the tool module and its dependencies
+        module, _, function = tool.run.partition(":")
+        with open(importlib.util.find_spec(module).origin) as f:
+            names = {node.name for node in ast.parse(f.read()).body if isinstance(node, ast.FunctionDef)}
+        assert function in names, tool.run
@@ -0,0 +1,17 @@
+"""
+Unit tests for combining NEB trajectories.
+"""
+
+from pyqmmm.qm.combine_nebs import combine_trajectories
+
+FRAME = "2\n{}\nC {} 0.0 0.0\nO 0.0 0.0 1.0\n"
+
+
+def test_frames_are_copied_verbatim(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "1.xyz").write_text(FRAME.format("E -1", "0.1234567890123") + FRAME.format("E -2", "1.5"))
+    # The first frame repeats the last frame of 1.xyz with other formatting
+    (tmp_path / "2.xyz").write_text(FRAME.format("E -2", "1.50000") + FRAME.format("E -3", "2.5"))
+    combine_trajectories()
+    expected = FRAME.format("E -1", "0.1234567890123") + FRAME.format("E -2", "1.5") + FRAME.format("E -3", "2.5")
+    assert (tmp_path / "combined_nebs.xyz").read_text() == expected
@@ -0,0 +1,98 @@
+"""
+Unit tests for reading and writing compressed trajectories.
+"""
+
+import gzip
+import lzma
+import os
+
+import pytest
+
+from pyqmmm.io import compression, pdb_reader, sharding, xyz_reader
+from pyqmmm.io.delete_xyz_trj_atoms import stream_atoms_from_xyz
+from pyqmmm.io.selection import read_topology
+from pyqmmm.io.xyz2pdb import xyz2pdb_traj
+from pyqmmm.io.xyz_reader import XYZReader, XYZStream
+from pyqmmm.tests import synthetic
+
+FRAMES = "".join(f"2\nE -{i}.0\nC 0.0 0.0 {i}.0\nO 0.0 0.0 1.0\n" for i in range(5))
+
+
+def test_reader_on_gzip_trajectory(tmp_path):
+    path = tmp_path / "scan.xyz.gz"
+    path.write_bytes(gzip.compress(FRAMES.encode()))
+    assert compression.detect_compression(path) == "gzip"
+    assert compression.resolve_path(str(tmp_path / "scan.xyz")) == str(path)
+
+    with XYZReader(path, cache=False) as traj:
+        assert traj.titles() == [f"E -{i}.0" for i in range(5)]
+        assert traj[-1].atoms[0] == "C 0.0 0.0 4.0"
+
+    stream_atoms_from_xyz(str(path), str(tmp_path / "stripped.xyz.xz"), [2], stride=2)
+    stripped = lzma.decompress((tmp_path / "stripped.xyz.xz").read_bytes()).decode()
+    assert stripped.count("O ") == 0 and stripped.count("\nE -") == 3
+
+
+def test_scratch_removed_on_errors(tmp_path, monkeypatch):
+    monkeypatch.setenv("TMPDIR", str(tmp_path / "scratch"))
+    os.mkdir(tmp_path / "scratch")
+    monkeypatch.setattr(compression.tempfile, "tempdir", None)
+    path = tmp_path / "broken.xyz.gz"
+    path.write_bytes(gzip.compress(FRAMES.encode() + b"x\n"))
+    with pytest.raises(ValueError):
+        XYZReader(path, cache=False)
+    # A gzip stream cut off in the middle fails while decompressing
+    path.write_bytes(gzip.compress(FRAMES.encode())[:-20])
+    with pytest.raises(EOFError):
+        XYZReader(path, cache=False)
+    assert os.listdir(tmp_path / "scratch") == []
+
+
+def test_single_pass_tools_skip_scratch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    synthetic.xyz_trajectory(tmp_path / "scan.allxyz", 7, 4, allxyz=True)
+    synthetic.pdb_trajectory(tmp_path / "traj.pdb", 7, 4)
+    (tmp_path / "template.pdb").write_text("".join(synthetic.pdb_atoms(4)) + "END\n")
+    for name in ("scan.allxyz", "traj.pdb", "template.pdb"):
+        (tmp_path / f"{name}.gz").write_bytes(gzip.compress((tmp_path / name).read_bytes()))
+
+    def no_scratch(path):
+        assert compression.detect_compression(path) is None, f"{path} was decompressed to scratch"
+
+    # Tiny batches send the frames of the stream to two workers
+    monkeypatch.setattr(sharding, "BATCH_BYTES", 64)
+    monkeypatch.setattr(xyz_reader, "decompress_to_scratch", no_scratch)
+    monkeypatch.setattr(pdb_reader, "decompress_to_scratch", no_scratch)
+
+    assert stream_atoms_from_xyz("scan.allxyz.gz", "gz.xyz", [2], stride=3, n_workers=2) == (7, 3)
+    assert stream_atoms_from_xyz("scan.allxyz", "plain.xyz", [2], stride=3, n_workers=2) == (7, 3)
+    assert (tmp_path / "gz.xyz").read_text() == (tmp_path / "plain.xyz").read_text()
+
+    xyz2pdb_traj("scan.allxyz.gz", "gz.pdb", "template.pdb.gz", n_workers=2)
+    xyz2pdb_traj("scan.allxyz", "plain.pdb", "template.pdb", n_workers=2)
+    assert (tmp_path / "gz.pdb").read_text() == (tmp_path / "plain.pdb").read_text()
+    assert (read_topology("template.pdb.gz")["name"] == read_topology("template.pdb")["name"]).all()
+
+    transforms = [pdb_reader.delete_atoms([1])]
+    assert pdb_reader.stream_frames("traj.pdb.gz", "gz.pdb", 2, transforms, n_workers=2) == (7, 4)
+    assert pdb_reader.stream_frames("traj.pdb", "plain.pdb", 2, transforms, n_workers=2) == (7, 4)
+    assert (tmp_path / "gz.pdb").read_text() == (tmp_path / "plain.pdb").read_text()
+
+
+def test_stream_truncated_frame(tmp_path):
+    path = tmp_path / "running.xyz.gz"
+    path.write_bytes(gzip.compress(FRAMES.encode() + b"2\nE -5.0\nC 0.0"))
+    with XYZStream(path, allow_truncated=True) as stream:
+        assert stream.natoms == 2
+        assert stream.titles() == [f"E -{i}.0" for i in range(5)]
+    with pytest.raises(ValueError, match="frame 6"), XYZStream(path) as stream:
+        list(stream)
+
+
+def test_block_writer_round_trip(tmp_path, monkeypatch):
+    # Small blocks force several independently compressed gzip members
+    monkeypatch.setattr(compression, "BLOCK_BYTES", 16)
+    with compression.open_output(tmp_path / "out.xyz.gz", "w", threads=2) as f:
+        f.write(FRAMES)
+    with compression.open_input(tmp_path / "out.xyz.gz", "r") as f:
+        assert f.read() == FRAMES
@@ -0,0 +1,39 @@
+"""
+Unit tests for the frame-block parallel reductions.
+"""
+
+import numpy as np
+import pytest
+
+from pyqmmm.md.frame_reduction import RunningMoments, block_bounds, reduce_blocks
+
+FRAMES = np.random.default_rng(0).normal(loc=50.0, size=(101, 4, 3))
+
+
+def block_of_frames(scale, block, n_blocks):
+    start, stop = block_bounds(len(FRAMES), block, n_blocks)
+    moments = RunningMoments(FRAMES.shape[1:])
+    for frame in FRAMES[start:stop]:
+        moments.add(frame * scale)
+    return moments
+
+
+def test_block_bounds_cover_every_frame():
+    bounds = [block_bounds(10, block, 4) for block in range(4)]
+    assert bounds == [(0, 2), (2, 5), (5, 7), (7, 10)]
+    assert block_bounds(2, 2, 4) == (1, 1)
+
+
+@pytest.mark.parametrize("n_blocks", [1, 3, 150])
+def test_merged_blocks_match_whole_trajectory(n_blocks):
+    moments, doubled = reduce_blocks(block_of_frames, [(1.0,), (2.0,)], n_blocks=n_blocks, n_workers=1)
+    assert moments.count == len(FRAMES)
+    assert np.allclose(moments.mean, FRAMES.mean(axis=0))
+    assert np.allclose(moments.variance, FRAMES.var(axis=0))
+    assert np.allclose(doubled.variance, (2 * FRAMES).var(axis=0))
+
+
+def test_process_pool():
+    serial = reduce_blocks(block_of_frames, [(1.0,)], n_blocks=4, n_workers=1)[0]
+    parallel = reduce_blocks(block_of_frames, [(1.0,)], n_workers=2)[0]
+    assert np.allclose(parallel.m2, serial.m2)
@@ -0,0 +1,49 @@
+"""
+Unit tests for the sparse hbond time series engine.
+"""
+
+import numpy as np
+
+from pyqmmm.md import hbond_series
+from pyqmmm.tests import synthetic
+
+GROUPS = [{1, 2}, {3}, {5, 6, 7}, {99}, set()]
+
+
+def frame_loop(path, groups):
+    """Occurrences of every group counted frame by frame, as hbond_analyzer did."""
+    presence = []
+    with open(path) as f:
+        for _ in range(8):
+            next(f)
+        for frame in f.read().split("\n\n"):
+            bonds = set()
+            for line in frame.split("\n"):
+                if line == "end":
+                    break
+                arr = [int(float(x)) for x in line.split(" ") if x]
+                if arr[-1] == 1:
+                    bonds.add(arr[1])
+            presence.append([len(group & bonds) != 0 for group in groups])
+    return np.array(presence)
+
+
+def test_matches_frame_loop(tmp_path):
+    path = tmp_path / "hbond.gnu"
+    synthetic.hbond_gnu(path, 60, 8)
+    expected = frame_loop(path, GROUPS)
+
+    series = hbond_series.read_series(str(path), chunk_rows=50)
+    assert series.shape == (60, 9)
+    presence = hbond_series.group_presence(series, hbond_series.group_matrix(GROUPS, series.shape[1]))
+    assert (presence.toarray() == expected).all()
+    assert (hbond_series.occurrence_counts(presence) == expected.sum(axis=0)).all()
+
+    # Concatenated replicates and time windows
+    edges = hbond_series.window_edges(60, n_windows=4)
+    assert edges.tolist() == [0, 15, 30, 45, 60]
+    windows = hbond_series.occurrence_counts(presence, edges)
+    assert (windows == expected.reshape(4, 15, -1).sum(axis=1)).all()
+    edges = hbond_series.window_edges(60, size=25)
+    assert edges.tolist() == [0, 25, 50, 60]
+    assert (hbond_series.occurrence_counts(presence, edges)[-1] == expected[50:].sum(axis=0)).all()
@@ -0,0 +1,67 @@
+"""
+Unit tests for the AMBER ASCII trajectory transcoder.
+"""
+
+import numpy as np
+import pytest
+from scipy.io import netcdf_file
+
+from pyqmmm.io import mdcrd
+
+PRMTOP = "%VERSION  VERSION_STAMP = V0001.000\n%FLAG POINTERS\n%FORMAT(10I8)\n{:8d}       3\n"
+
+
+def write_mdcrd(path, coordinates, box=True):
+    lines = ["default_name\n"]
+    for frame in coordinates:
+        values = "".join(f"{value:8.3f}" for value in frame.ravel())
+        lines.extend(values[i:i + 80] + "\n" for i in range(0, len(values), 80))
+        if box:
+            lines.append(f"{60.0:8.3f}{61.0:8.3f}{62.0:8.3f}\n")
+    path.write_text("".join(lines))
+
+
+@pytest.fixture
+def system(tmp_path):
+    coordinates = np.random.default_rng(0).uniform(-99, 99, size=(12, 7, 3)).round(3)
+    (tmp_path / "system.prmtop").write_text(PRMTOP.format(7))
+    write_mdcrd(tmp_path / "constP_prod.mdcrd", coordinates)
+    (tmp_path / "constP_prod.out").write_text(
+        "  nstlim  =     24000, nscm    =      1000, nrespa  =         1\n"
+        "  t       =   0.00000, dt      =   0.00200, vlimit  =  -1.00000\n"
+        "  ntxo    =         2, ntpr    =      1000, ntrx    =         1, ntwr    =     24000\n"
+        "  iwrap   =         0, ntwx    =      2000, ntwv    =         0, ntwe    =         0\n"
+    )
+    return tmp_path, coordinates
+
+
+@pytest.mark.parametrize("box", [True, False])
+def test_layout(tmp_path, box):
+    write_mdcrd(tmp_path / "traj.crd", np.zeros((2, 4, 3)), box=box)
+    # Twelve values are one full line of ten and a line of two
+    assert mdcrd.frame_layout(tmp_path / "traj.crd", 4) == (13, 81 + 17 + (25 if box else 0), box)
+
+
+def test_netcdf_copy(system):
+    directory, coordinates = system
+    trajectory = str(directory / "constP_prod.mdcrd")
+    path, fmt = mdcrd.fast_trajectory(trajectory, str(directory / "system.prmtop"), n_workers=2)
+    assert fmt == "NCDF"
+    with netcdf_file(path, "r", mmap=False) as nc:
+        assert np.allclose(nc.variables["coordinates"][:], coordinates, atol=1e-3)
+        assert np.allclose(nc.variables["time"][:], np.arange(12) * 4.0)
+
+    # Reused while the trajectory is unchanged
+    assert mdcrd.fast_trajectory(trajectory, str(directory / "system.prmtop")) == (path, "NCDF")
+
+
+def test_npy_copy_and_stale_copies(system):
+    directory, coordinates = system
+    trajectory = str(directory / "constP_prod.mdcrd")
+    prmtop = str(directory / "system.prmtop")
+    path, fmt = mdcrd.fast_trajectory(trajectory, prmtop, fmt="npy", n_workers=1)
+    assert fmt == "NPY" and np.allclose(np.load(path), coordinates, atol=1e-3)
+
+    # Two fewer frames than the AMBER output expects, so the ASCII file is used
+    write_mdcrd(directory / "constP_prod.mdcrd", coordinates[:10])
+    assert mdcrd.fast_trajectory(trajectory, prmtop) == (trajectory, "TRJ")
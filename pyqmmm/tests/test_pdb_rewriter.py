@@ -0,0 +1,44 @@
+"""
+Unit tests for in-place rewriting of PDB coordinates.
+"""
+
+import numpy as np
+
+from pyqmmm.io.pdb_reader import PDBReader, translate, write_frames
+from pyqmmm.io.pdb_rewriter import rigid_transform_pdb
+
+PDB = (
+    "REMARK test\n"
+    "MODEL     1\n"
+    "ATOM      1  C   LIG A   1       1.000  -2.500   3.250  1.00  0.00           C\n"
+    "HETATM    2  O   HOH A   2      -0.001   0.000  10.125  1.00  0.00           O\n"
+    "TER\nENDMDL\n"
+    "MODEL     2\n"
+    "ATOM      1  C   LIG A   1       1.100  -2.400   3.350  1.00  0.00           C\n"
+    "HETATM    2  O   HOH A   2       0.099   0.100  10.225  1.00  0.00           O\n"
+    "TER\nENDMDL\nEND\n"
+)
+
+
+def test_in_place_matches_streaming(tmp_path):
+    source = tmp_path / "traj.pdb"
+    source.write_text(PDB)
+    vector = (-1.0005, 2.5, -3.25)
+    with PDBReader(source, cache=False) as reader:
+        write_frames(reader, tmp_path / "streamed.pdb", transforms=[translate(vector)])
+
+    assert rigid_transform_pdb(source, translation=vector, output=tmp_path / "copy.pdb") == 4
+    assert source.read_text() == PDB
+    assert (tmp_path / "copy.pdb").read_text() == (tmp_path / "streamed.pdb").read_text()
+
+    rigid_transform_pdb(source, translation=vector)
+    assert source.read_text() == (tmp_path / "streamed.pdb").read_text()
+
+
+def test_rotation(tmp_path):
+    source = tmp_path / "traj.pdb"
+    source.write_text(PDB)
+    rotation = np.array([[0.0, -1.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 1.0]])
+    rigid_transform_pdb(source, rotation=rotation)
+    first_atom = source.read_text().splitlines()[2]
+    assert first_atom[30:54] == "   2.500   1.000   3.250"
@@ -0,0 +1,29 @@
+"""
+Unit tests for the in-process PPM to PNG conversion.
+"""
+
+import zlib
+
+import numpy as np
+
+from pyqmmm.io.ppm2png_converter import ppm2png_converter
+
+
+def test_converts_only_ppm_in_sorted_order(tmp_path):
+    images = [np.full((4, 3, 3), value, dtype=np.uint8) for value in (10, 200)]
+    images[1][2] = (1, 2, 3)
+    for name, image in zip(("b.ppm", "a.ppm"), images):
+        (tmp_path / name).write_bytes(b"P6\n# VMD\n3 4\n255\n" + image.tobytes())
+    (tmp_path / "notes.txt").write_text("not an image")
+
+    ppm2png_converter(str(tmp_path), n_workers=1)
+    assert sorted(p.name for p in tmp_path.glob("*.png")) == ["0.png", "1.png"]
+
+    # 0.png comes from a.ppm; its single IDAT holds Up-filtered scanlines
+    png = (tmp_path / "0.png").read_bytes()
+    idat = png.index(b"IDAT")
+    length = int.from_bytes(png[idat - 4:idat], "big")
+    raw = np.frombuffer(zlib.decompress(png[idat + 4:idat + 4 + length]), dtype=np.uint8).reshape(4, -1)
+    assert (raw[:, 0] == 2).all()
+    pixels = np.cumsum(raw[:, 1:], axis=0, dtype=np.uint8).reshape(4, 3, 3)
+    assert np.array_equal(pixels, images[1])
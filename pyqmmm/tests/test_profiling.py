@@ -0,0 +1,43 @@
+"""
+Unit tests for the profiling spans and run reports.
+"""
+
+import builtins
+import json
+
+from pyqmmm import profiling
+from pyqmmm.cli import cli
+
+
+def test_span_without_profiler_is_a_no_op():
+    assert profiling.current() is None
+    with profiling.span("parse"):
+        pass
+
+
+def test_nested_spans_are_summed(tmp_path):
+    profiler = profiling.Profiler(tmp_path / "report.json").start()
+    for _ in range(2):
+        with profiling.span("parse"), profiling.span("titles"):
+            pass
+    with profiling.span("write"):
+        pass
+    report = profiler.stop()
+
+    assert profiling.current() is None
+    spans = {record["name"]: record["calls"] for record in report["spans"]}
+    assert spans == {"parse/titles": 2, "parse": 2, "write": 1}
+    assert report["tracemalloc"]["peak_mb"] >= 0
+    assert json.loads((tmp_path / "report.json").read_text())["status"] == "ok"
+
+
+def test_cli_profile_report(tmp_path, monkeypatch):
+    (tmp_path / "scan.xyz").write_text("1\nE -1.0\nH 0.0 0.0 0.0\n1\nE -2.0\nH 0.0 0.0 1.0\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(builtins, "input", lambda prompt="": "scan")
+
+    cli.main(["--profile_calls", "qm", "--flip_xyz"], standalone_mode=False)
+
+    report = json.loads((tmp_path / "pyqmmm_profile.json").read_text())
+    assert [record["name"] for record in report["spans"]] == ["flip_xyz/import", "flip_xyz"]
+    assert report["cprofile"]["top"] and (tmp_path / "pyqmmm_profile.prof").exists()
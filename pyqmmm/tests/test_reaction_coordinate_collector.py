@@ -0,0 +1,31 @@
+"""
+Unit tests for collecting reaction coordinates against scan energies.
+"""
+
+import builtins
+
+from pyqmmm.qm import reaction_coordinate_collector
+
+FRAME = "3\n{title}\nC 0.0 0.0 0.0\nH {x} 0.0 0.0\nO 0.0 {y} 0.0\n"
+
+
+def test_unconverged_frames_are_skipped(tmp_path, monkeypatch):
+    frames = [
+        ("Converged geometry 1 energy -100.0", 1.0, 2.0),
+        ("Unconverged geometry 2 energy -90.0", 9.0, 9.0),
+        ("Converged geometry 2 energy -100.5", 1.5, 2.5),
+        ("Converged geometry 3 energy -101.0", 2.0, 3.0),
+    ]
+    (tmp_path / "scan_optim.xyz").write_text(
+        "".join(FRAME.format(title=title, x=x, y=y) for title, x, y in frames)
+    )
+    monkeypatch.chdir(tmp_path)
+    answers = iter(["scan_optim.xyz", "1_2", "1_3"])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+
+    reaction_coordinate_collector.reaction_coordinate_collector()
+
+    rows = [line.split(",") for line in (tmp_path / "rc1_v_energy.csv").read_text().splitlines()]
+    assert [(float(x), float(y)) for x, y in rows] == [(1.0, -100.0), (1.5, -100.5), (2.0, -101.0)]
+    rows = (tmp_path / "dd_v_rc2.csv").read_text().splitlines()
+    assert [float(row.split(",")[1]) for row in rows] == [2.0, 2.5, 3.0]
@@ -0,0 +1,73 @@
+"""
+Unit tests for the content-keyed result cache.
+"""
+
+import os
+
+import pytest
+
+from pyqmmm.io import result_cache
+
+CALLS = []
+
+
+@result_cache.cached(files=("path",), ignore=("threads",))
+def line_count(path, scale=1, threads=1):
+    CALLS.append(path)
+    with open(path) as f:
+        return sum(1 for _ in f) * scale or None
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYQMMM_CACHE_DIR", str(tmp_path / "cache"))
+    CALLS.clear()
+    return tmp_path / "cache"
+
+
+def test_results_follow_file_contents(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("a\nb\n")
+    assert line_count(path) == 2
+    assert line_count(path, threads=8) == 2
+    assert len(CALLS) == 1
+
+    # A copy with the same contents shares the result, other arguments do not
+    copy = tmp_path / "copy.txt"
+    copy.write_text("a\nb\n")
+    assert line_count(copy) == 2
+    assert line_count(copy, scale=2) == 4
+    assert len(CALLS) == 2
+
+    path.write_text("a\nb\nc\n")
+    os.utime(path, ns=(0, 0))
+    assert line_count(path) == 3
+    assert len(CALLS) == 3
+
+
+def test_none_is_not_stored(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("")
+    assert line_count(path) is None
+    assert line_count(path) is None
+    assert len(CALLS) == 2
+
+
+def test_least_recently_used_are_evicted(cache_dir):
+    for index in range(3):
+        result_cache.store(f"key{index}", b"x" * 1000)
+        os.utime(cache_dir / f"key{index}.pkl", ns=(index, index))
+    assert result_cache.load("key0") is not None  # Now the most recently used
+
+    result_cache.evict(2500)
+
+    assert sorted(os.listdir(cache_dir)) == ["key0.pkl", "key2.pkl"]
+
+
+def test_disabled(tmp_path, monkeypatch, cache_dir):
+    monkeypatch.setenv("PYQMMM_RESULT_CACHE", "0")
+    path = tmp_path / "data.txt"
+    path.write_text("a\n")
+    line_count(path)
+    line_count(path)
+    assert len(CALLS) == 2 and not cache_dir.exists()
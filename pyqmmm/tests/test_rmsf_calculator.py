@@ -0,0 +1,72 @@
+"""
+Unit tests for the streaming RMSF calculation.
+"""
+
+import numpy as np
+import pytest
+
+mda = pytest.importorskip("MDAnalysis")
+from MDAnalysis.analysis import align, rms
+from MDAnalysis.coordinates.memory import MemoryReader
+
+from pyqmmm.md import rmsf_calculator
+
+
+def make_universe(coordinates):
+    """Universe of alanine backbone residues with the given frames."""
+    n_residues = coordinates.shape[1] // 4
+    u = mda.Universe.empty(coordinates.shape[1], n_residues=n_residues,
+                           atom_resindex=np.repeat(np.arange(n_residues), 4), trajectory=True)
+    u.add_TopologyAttr("name", ["N", "CA", "C", "O"] * n_residues)
+    u.add_TopologyAttr("resname", ["ALA"] * n_residues)
+    u.add_TopologyAttr("resid", np.arange(1, n_residues + 1))
+    u.load_new(coordinates.astype(np.float32), format=MemoryReader)
+    return u
+
+
+def tumbling_frames(n_frames=40, n_atoms=24, seed=0):
+    """A noisy structure randomly rotated and translated in every frame."""
+    rng = np.random.default_rng(seed)
+    structure = rng.normal(scale=5.0, size=(n_atoms, 3))
+    frames = []
+    for _ in range(n_frames):
+        rotation, _ = np.linalg.qr(rng.normal(size=(3, 3)))
+        noisy = structure + rng.normal(scale=0.3, size=structure.shape)
+        frames.append(noisy @ rotation.T + rng.normal(scale=10.0, size=3))
+    return np.array(frames)
+
+
+def test_streaming_matches_in_memory_alignment():
+    coordinates = tumbling_frames()
+    reference = make_universe(coordinates[:1])
+
+    expected_universe = make_universe(coordinates)
+    align.AlignTraj(expected_universe, reference, select="backbone", in_memory=True).run()
+    expected = rms.RMSF(expected_universe.atoms).run().results.rmsf
+
+    rmsf = rmsf_calculator.streaming_rmsf(make_universe(coordinates), reference, select="backbone")
+    assert np.allclose(rmsf, expected, atol=1e-3)
+
+
+def test_frame_blocks_merge_to_streaming():
+    u = make_universe(tumbling_frames())
+    reference = make_universe(tumbling_frames(n_frames=1, seed=1))
+    whole = rmsf_calculator.aligned_moments(u, reference, "backbone")
+    blocks = [rmsf_calculator.aligned_moments(u, reference, "backbone", start, stop)
+              for start, stop in [(0, 15), (15, 16), (16, 40)]]
+    merged = blocks[0].merge(blocks[1]).merge(blocks[2])
+    assert merged.count == whole.count
+    assert np.allclose(rmsf_calculator.rmsf_from_moments(merged), rmsf_calculator.rmsf_from_moments(whole))
+
+
+def test_residue_means():
+    u = make_universe(tumbling_frames(n_frames=1))
+    values = np.arange(u.atoms.n_atoms, dtype=float)
+    df = rmsf_calculator.residue_rmsf(u, values[:-2], "rep1")
+    # The last residue lacks RMSF values for two of its atoms
+    assert df["ResID"].tolist() == list(range(1, len(u.residues)))
+    assert np.allclose(df["rep1"], [values[res.atoms.indices].mean() for res in u.residues[:-1]])
+
+    replicas = rmsf_calculator.combine_replicas([df, df.rename(columns={"rep1": "rep2"})])
+    assert replicas.columns.tolist() == ["ResID", "ResName", "rep1", "rep2", "Avg. RMSF", "Std. Dev"]
+    assert np.allclose(replicas["Avg. RMSF"], df["rep1"]) and (replicas["Std. Dev"] == 0).all()
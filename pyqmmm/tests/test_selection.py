@@ -0,0 +1,61 @@
+"""
+Unit tests for atom selections compiled to masks.
+"""
+
+import numpy as np
+
+from pyqmmm.io import delete_pdb_trj_atoms
+from pyqmmm.io.pdb_reader import delete_atoms
+from pyqmmm.io.selection import compile_selection, parse_ranges, read_topology
+
+PDB = (
+    "MODEL     1\n"
+    "ATOM      1  N   HIS A  10       0.000   0.000   0.000  1.00  0.00           N\n"
+    "ATOM      2  CA  HIS A  10       1.000   0.000   0.000  1.00  0.00           C\n"
+    "HETATM    3 FE   HEM B  11       2.000   0.000   0.000  1.00  0.00          FE\n"
+    "HETATM    4  O   HOH B  12       3.000   0.000   0.000  1.00  0.00           O\n"
+    "TER\nENDMDL\n"
+)
+
+
+def test_ranges_keep_order():
+    assert parse_ranges("3-5,1 # comment\n9") == [3, 4, 5, 1, 9]
+    assert parse_ranges("1_2-3", separator="_") == [1, 2, 3]
+
+
+def test_selectors_resolved_against_template(tmp_path):
+    path = tmp_path / "template.pdb"
+    path.write_text(PDB)
+    topology = read_topology(path)
+    assert compile_selection("1, 9", n_atoms=4).tolist() == [True, False, False, False]
+    assert compile_selection("resid 11-12", topology=topology).tolist() == [False, False, True, True]
+    assert compile_selection("element fe, name CA", topology=topology).tolist() == [False, True, True, False]
+    assert compile_selection("chain B, resname HIS # all", topology=topology).all()
+
+    remove = np.flatnonzero(compile_selection("resname HOH, 1", topology=topology)) + 1
+    lines = delete_atoms(remove)(PDB.encode().splitlines(keepends=True))
+    assert [line[:6] for line in lines] == [b"MODEL ", b"ATOM  ", b"HETATM", b"TER\n", b"ENDMDL"]
+
+
+def test_unparsable_resids_continue_counting(tmp_path):
+    path = tmp_path / "large.pdb"
+    # Residues past 9999 written in hybrid-36 by VMD and similar tools
+    path.write_text(
+        PDB.replace("A  10", "A9999").replace("B  11", "BA000").replace("B  12", "BA001")
+    )
+    assert read_topology(path)["resid"].tolist() == [9999, 9999, 10000, 10001]
+
+
+def test_numeric_selection_skips_the_template(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "delete.in").write_text("2-3\n")
+    (tmp_path / "traj.pdb").write_text(PDB)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "")
+
+    def unreadable(template):
+        raise AssertionError("The template is only read for keyword selectors")
+
+    monkeypatch.setattr(delete_pdb_trj_atoms, "read_topology", unreadable)
+    delete_pdb_trj_atoms.main(["delete.in"], "traj.pdb", "out.pdb")
+    output = (tmp_path / "out.pdb").read_text()
+    assert "  N   HIS" in output and "HOH" in output and "CA" not in output and "HEM" not in output
@@ -0,0 +1,79 @@
+"""
+Unit tests for frame-sharded parallel processing.
+"""
+
+from pyqmmm.io import sharding
+from pyqmmm.io.delete_xyz_trj_atoms import stream_atoms_from_xyz
+from pyqmmm.io.xyz_reader import XYZReader
+
+FRAME = "3\nE {energy}\nC 0.0 0.0 {z}\nH 1.0 0.0 {z}\nO 0.0 1.0 {z}\n"
+
+
+def test_parallel_shards_keep_frame_order(tmp_path, monkeypatch):
+    path = tmp_path / "traj.xyz"
+    path.write_text("".join(FRAME.format(energy=-i, z=i) for i in range(40)))
+    monkeypatch.setattr(sharding, "PARALLEL_BYTES", 0)
+
+    with XYZReader(path, cache=False) as traj:
+        titles = traj.titles()
+        starts, ends = traj.starts, traj.ends
+    for n_workers in (1, 3):
+        results = list(sharding.map_frames(str(path), starts, ends, _title, n_workers=n_workers))
+        assert results == [(i, title) for i, title in enumerate(titles)]
+
+    stream_atoms_from_xyz(path, tmp_path / "serial.xyz", {2}, stride=7, n_workers=1)
+    stream_atoms_from_xyz(path, tmp_path / "parallel.xyz", {2}, stride=7, n_workers=3)
+    serial = (tmp_path / "serial.xyz").read_text()
+    assert serial == (tmp_path / "parallel.xyz").read_text()
+    assert serial.startswith("2\nE 0\nC 0.0 0.0 0\nO 0.0 1.0 0\n2\nE -7\n")
+
+
+def test_shards_in_flight_are_bounded(tmp_path, monkeypatch):
+    path = tmp_path / "traj.xyz"
+    path.write_text("".join(FRAME.format(energy=-i, z=i) for i in range(40)))
+    monkeypatch.setattr(sharding, "PARALLEL_BYTES", 0)
+    monkeypatch.setattr(sharding, "SHARD_BYTES", 100)
+    submitted = []
+
+    class CountingExecutor(sharding.ProcessPoolExecutor):
+        def submit(self, *args, **kwargs):
+            submitted.append(args[1])
+            return super().submit(*args, **kwargs)
+
+    monkeypatch.setattr(sharding, "ProcessPoolExecutor", CountingExecutor)
+    with XYZReader(path, cache=False) as traj:
+        starts, ends = traj.starts, traj.ends
+    results = sharding.map_frames(str(path), starts, ends, _title, n_workers=2)
+    assert next(results) == (0, "E 0")
+    assert len(submitted) == sharding.SHARDS_PER_WORKER * 2
+    assert [index for index, _ in results] == list(range(1, 40))
+    assert len(submitted) > sharding.SHARDS_PER_WORKER * 2
+
+
+def test_single_process_is_one_frame_at_a_time(tmp_path):
+    path = tmp_path / "traj.xyz"
+    path.write_text("".join(FRAME.format(energy=-i, z=i) for i in range(5)))
+    with XYZReader(path, cache=False) as traj:
+        starts, ends = traj.starts, traj.ends
+    TRANSFORMED.clear()
+    results = sharding.map_frames(str(path), starts, ends, _record, n_workers=1)
+    assert next(results) == 0 and next(results) == 1
+    assert TRANSFORMED == [0, 1]
+
+
+def test_shard_bounds_cover_every_frame():
+    bounds = sharding.shard_frames([10, 10, 50, 10, 10, 10], 3)
+    assert bounds[0][0] == 0 and bounds[-1][1] == 6
+    assert all(a[1] == b[0] for a, b in zip(bounds, bounds[1:]))
+
+
+TRANSFORMED = []
+
+
+def _record(frame, index):
+    TRANSFORMED.append(index)
+    return index
+
+
+def _title(frame, index):
+    return index, frame.split(b"\n")[1].decode()
@@ -0,0 +1,56 @@
+"""
+Unit tests for the binary trajectory sidecar cache.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from pyqmmm.io import traj_cache
+from pyqmmm.io.pdb_reader import PDBReader
+from pyqmmm.io.trajectory import Trajectory
+
+FRAME = "2\nE {energy}\nC 0.0 0.0 0.0\nO 0.0 0.0 {z}\n"
+
+
+def test_sidecar_reused_and_invalidated(tmp_path):
+    path = tmp_path / "scan.xyz"
+    path.write_text(FRAME.format(energy=-1.0, z=1.1) + FRAME.format(energy=-2.0, z=1.2))
+    first = Trajectory.from_xyz(path, cache=True)
+    assert os.path.exists(traj_cache.sidecar_path(path))
+
+    cached = Trajectory.from_xyz(path, cache=True)
+    assert cached.titles == first.titles
+    assert (cached.coordinates == first.coordinates).all()
+
+    # Appending a frame changes the size and the hashed tail, so the sidecar is stale
+    with open(path, "a") as f:
+        f.write(FRAME.format(energy=-3.0, z=1.3))
+    updated = Trajectory.from_xyz(path, cache=True)
+    assert updated.titles == ["E -1.0", "E -2.0", "E -3.0"]
+
+
+def test_storing_an_array_leaves_the_others(tmp_path):
+    path = tmp_path / "scan.xyz"
+    path.write_text(FRAME.format(energy=-1.0, z=1.1))
+    signature = traj_cache.file_signature(path)
+    traj_cache.update_sidecar(path, signature, coordinates=np.zeros((1, 2, 3)))
+    coordinates = os.path.join(traj_cache.sidecar_path(path), "coordinates.npy")
+    before = os.stat(coordinates).st_ino
+
+    traj_cache.update_sidecar(path, signature, titles=np.array(["E -1.0"]))
+    assert os.stat(coordinates).st_ino == before
+    arrays = traj_cache.load_sidecar(path, signature, ("coordinates", "titles"))
+    assert arrays["titles"].tolist() == ["E -1.0"] and arrays["coordinates"].shape == (1, 2, 3)
+    assert traj_cache.load_sidecar(path, signature, ("elements",)) is None
+
+
+def test_truncated_index_is_not_cached(tmp_path):
+    path = tmp_path / "traj.pdb"
+    model = "MODEL     {}\nATOM      1  C   LIG A   1       1.000  -2.500   3.250  1.00  0.00           C\n"
+    path.write_text(model.format(1) + "ENDMDL\n" + model.format(2))
+    with PDBReader(path, cache=True, allow_truncated=True) as reader:
+        assert len(reader) == 1
+    with pytest.raises(ValueError):
+        PDBReader(path, cache=True)
@@ -0,0 +1,37 @@
+"""
+Unit tests for the NumPy-backed Trajectory container.
+"""
+
+import numpy as np
+
+from pyqmmm.io.trajectory import Trajectory
+
+XYZ = (
+    "3\nE -1.0\nC 0.0 0.0 0.0\nH 1.0 0.0 0.0\nH 0.0 1.0 0.0\n"
+    "3\nE -2.0\nC 0.0 0.0 1.0\nH 2.0 0.0 1.0\nH 0.0 1.0 1.0\n"
+)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "traj.xyz"
+    path.write_text(XYZ)
+    traj = Trajectory.from_xyz(path)
+    assert traj.coordinates.shape == (2, 3, 3)
+    assert list(traj.elements) == ["C", "H", "H"]
+    assert traj.titles == ["E -1.0", "E -2.0"]
+
+    traj[::-1].write_xyz(tmp_path / "reversed.xyz")
+    reversed_traj = Trajectory.from_xyz(tmp_path / "reversed.xyz")
+    assert reversed_traj.titles == ["E -2.0", "E -1.0"]
+    np.testing.assert_allclose(reversed_traj.coordinates, traj.coordinates[::-1])
+
+
+def test_delete_atoms_and_distances(tmp_path):
+    path = tmp_path / "traj.xyz"
+    path.write_text(XYZ)
+    traj = Trajectory.from_xyz(path, dtype=np.float32)
+    np.testing.assert_allclose(traj.distances(0, 1), [1.0, 2.0])
+
+    stripped = traj.delete_atoms([1])
+    assert list(stripped.elements) == ["C", "H"]
+    np.testing.assert_allclose(stripped.coordinates[1, 1], [0.0, 1.0, 1.0])
@@ -0,0 +1,40 @@
+"""
+Unit tests for the xyz to PDB trajectory conversion.
+"""
+
+import numpy as np
+
+from pyqmmm.io import xyz2pdb
+from pyqmmm.io.trajectory import Trajectory
+from pyqmmm.io.xyz2pdb import xyz2pdb_traj
+from pyqmmm.io.xyz_reader import XYZReader
+from pyqmmm.tests import synthetic
+
+# 0.0025 is written as 0.003 from float64 but as 0.002 from float32
+FRAME = "4\nE -1.0\nC 0.0025 0.0 0.0\nH 1.0 0.0 0.0\nH 0.0 1.0 0.0\nO 0.0 0.0 1.0\n"
+
+
+def test_low_precision_sidecar_is_not_reused(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "traj.xyz").write_text(FRAME * 2)
+    (tmp_path / "template.pdb").write_text("".join(synthetic.pdb_atoms(4)) + "END\n")
+    xyz2pdb_traj("traj.xyz", "parsed.pdb", "template.pdb", n_workers=1)
+
+    Trajectory.from_xyz(tmp_path / "traj.xyz", dtype=np.float32, cache=True)
+    xyz2pdb_traj("traj.xyz", "cached.pdb", "template.pdb", n_workers=1)
+    assert "   0.003" in (tmp_path / "parsed.pdb").read_text()
+    assert (tmp_path / "cached.pdb").read_text() == (tmp_path / "parsed.pdb").read_text()
+
+
+def test_sidecar_chunks_match_parsed_frames(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "traj.xyz").write_text("".join(FRAME.replace("E -1.0", f"E -{i}.0") for i in range(7)))
+    (tmp_path / "template.pdb").write_text("".join(synthetic.pdb_atoms(4)) + "END\n")
+    xyz2pdb_traj("traj.xyz", "parsed.pdb", "template.pdb", n_workers=1)
+
+    Trajectory.from_xyz(tmp_path / "traj.xyz", cache=True)
+    with XYZReader(tmp_path / "traj.xyz") as traj:
+        assert isinstance(xyz2pdb.cached_coordinates(traj)["coordinates"], np.memmap)
+    monkeypatch.setattr(xyz2pdb, "FRAMES_PER_CHUNK", 2)
+    xyz2pdb_traj("traj.xyz", "cached.pdb", "template.pdb", n_workers=2)
+    assert (tmp_path / "cached.pdb").read_text() == (tmp_path / "parsed.pdb").read_text()
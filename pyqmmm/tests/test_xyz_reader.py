@@ -0,0 +1,99 @@
+"""
+Unit tests for the indexed xyz trajectory reader.
+"""
+
+import pytest
+
+from pyqmmm.io.xyz_reader import XYZReader
+
+XYZ = (
+    "3\nE -1.0\nC 0.0 0.0 0.0\nH 1.0 0.0 0.0\nH 0.0 1.0 0.0\n"
+    "3\nE -2.0\nC 0.0 0.0 1.0\nH 1.0 0.0 1.0\nH 0.0 1.0 1.0\n"
+    "3\nE -3.0\nC 0.0 0.0 2.0\nH 1.0 0.0 2.0\nH 0.0 1.0 2.0\n"
+)
+
+
+def test_random_access(tmp_path):
+    path = tmp_path / "traj.xyz"
+    path.write_text(XYZ)
+    with XYZReader(path) as traj:
+        assert len(traj) == 3
+        assert traj.titles() == ["E -1.0", "E -2.0", "E -3.0"]
+        assert traj[1].atoms[0] == "C 0.0 0.0 1.0"
+        assert traj.last().title == "E -3.0"
+        assert [frame.title for frame in traj[::2]] == ["E -1.0", "E -3.0"]
+        assert "".join(traj.frame_text(i) for i in range(len(traj))) == XYZ
+
+
+def test_allxyz_separators(tmp_path):
+    path = tmp_path / "path.allxyz"
+    path.write_text("2\nt1\nC 0 0 0\nH 1 1 1\n>\n\n2\nt2\nC 1 0 0\nH 2 1 1")
+    with XYZReader(path) as traj:
+        assert len(traj) == 2
+        assert traj[1] == (2, "t2", ["C 1 0 0", "H 2 1 1"])
+
+
+def test_truncated_frame(tmp_path):
+    path = tmp_path / "broken.xyz"
+    path.write_text(XYZ + "3\nE -4.0\nC 0.0 0.0 3.0\n")
+    with pytest.raises(ValueError):
+        XYZReader(path)
+    with XYZReader(path, allow_truncated=True) as traj:
+        assert traj.titles() == ["E -1.0", "E -2.0", "E -3.0"]
+
+    # The index of the tolerant reader is not cached for strict readers
+    with pytest.raises(ValueError):
+        XYZReader(path, cache=True)
+
+
+def test_no_trailing_newline(tmp_path):
+    path = tmp_path / "neb.allxyz"
+    path.write_text("2\nt1\nH 0 0 0\nH 0 0 1\n2\nt2\nH 0 0 0\nH 0 0 2")
+    for allow_truncated in (False, True):
+        with XYZReader(path, cache=False, allow_truncated=allow_truncated) as traj:
+            assert traj.titles() == ["t1", "t2"]
+
+    # An atom line cut off before its last coordinate is still truncated
+    path.write_text("2\nt1\nH 0 0 0\nH 0 0 1\n2\nt2\nH 0 0 0\nH 0 0")
+    with XYZReader(path, cache=False, allow_truncated=True) as traj:
+        assert traj.titles() == ["t1"]
+
+
+def test_follow_growing_file(tmp_path):
+    path = tmp_path / "optim.xyz"
+    frames = XYZ.splitlines(keepends=True)
+    # The job has written one full frame and part of an atom line of the next
+    path.write_text("".join(frames[:5]) + "".join(frames[5:8]) + "H 1.0 0.")
+    with XYZReader(path, follow=True) as traj:
+        assert len(traj) == 1
+        with open(path, "a") as f:
+            f.write("0 1.0\n" + "".join(frames[9:]))
+        new_frames = traj.refresh()
+        assert [frame.title for frame in new_frames] == ["E -2.0", "E -3.0"]
+        assert len(traj.refresh()) == 0
+        assert "".join(traj.frame_text(i) for i in range(len(traj))) == XYZ
+
+
+def test_lazy_views(tmp_path):
+    path = tmp_path / "traj.xyz"
+    path.write_text(XYZ.rstrip("\n"))
+    with XYZReader(path) as traj:
+        view = reversed(traj)
+        assert view.indices.tolist() == [2, 1, 0]
+        assert [frame.title for frame in view[::2]] == ["E -3.0", "E -1.0"]
+        assert traj.take([2, 0])[1].title == "E -1.0"
+        view.write(tmp_path / "reversed.xyz")
+    with XYZReader(tmp_path / "reversed.xyz") as flipped:
+        assert flipped.titles() == ["E -3.0", "E -2.0", "E -1.0"]
+
+
+def test_views_keep_allxyz_separators(tmp_path):
+    path = tmp_path / "traj.xyz"
+    path.write_text(XYZ)
+    with XYZReader(path) as traj:
+        traj[::2].write(tmp_path / "sampled.allxyz")
+    sampled = XYZ.split("3\n")
+    assert (tmp_path / "sampled.allxyz").read_text() == "3\n" + sampled[1] + ">\n3\n" + sampled[3]
+    with XYZReader(tmp_path / "sampled.allxyz") as sampled_traj:
+        reversed(sampled_traj).write(tmp_path / "reversed.xyz")
+    assert ">" not in (tmp_path / "reversed.xyz").read_text()
@@ -0,0 +1,23 @@
+"""
+Unit tests for the buffered xyz and allxyz writer.
+"""
+
+import numpy as np
+
+from pyqmmm.io.xyz_reader import XYZReader
+from pyqmmm.io.xyz_writer import XYZWriter
+
+
+def test_xyz_and_allxyz_from_one_buffer(tmp_path):
+    coordinates = np.arange(12, dtype=float).reshape(2, 2, 3)
+    # A tiny flush size forces frames to be split over several flushes
+    with XYZWriter(tmp_path / "path.xyz", tmp_path / "path.allxyz", flush_bytes=64) as writer:
+        writer.write_frames(coordinates, ["C", "O"], ["E -1.0 100%", "E -2.0"])
+        writer.write_raw("1\nE -3.0\nH 0.0 0.0 0.0")
+
+    xyz = (tmp_path / "path.xyz").read_text()
+    assert xyz.startswith("2\nE -1.0 100%\nC     0.0000000000    1.0000000000    2.0000000000\n")
+    allxyz = (tmp_path / "path.allxyz").read_text()
+    assert allxyz.count(">\n") == 2 and allxyz.replace(">\n", "") == xyz
+    with XYZReader(tmp_path / "path.allxyz", cache=False) as traj:
+        assert traj.titles() == ["E -1.0 100%", "E -2.0", "E -3.0"]